@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Vérification et benchmark du cluster de build (--coordinator / --worker) sur localhost.
+
+Le coordinateur tourne dans ce processus; N workers sont lancés comme de vrais
+processus `pake_gui.py --worker 127.0.0.1:PORT`, chacun dans son propre dossier
+(cache et magasin de blobs séparés). Un faux Pake écrit un installeur .deb dont
+le contenu dépend du nom de l'application, et échoue si le nom contient « fail ».
+
+Vérifie que chaque build réussi rapatrie exactement son installeur avec le bon
+SHA-256, qu'un build en échec est signalé sans installeur, que tous les workers
+ont reçu des builds et que l'icône n'est transférée qu'une fois par worker.
+Code de sortie 1 si une vérification échoue.
+
+Usage: python benchmarks/bench_cluster.py [--workers 3] [--jobs 9] [--seconds 0.5]
+"""
+
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, REPO_DIR)
+
+import pake_gui  # noqa: E402
+
+FAKE_PAKE = '''#!{python}
+import sys, time
+name = sys.argv[sys.argv.index('--name') + 1]
+for i in range(50):
+    print(f"   Compiling crate{{i}} v0.1.0")
+time.sleep({seconds})
+if 'fail' in name.lower():
+    print("error: échec simulé", file=sys.stderr)
+    sys.exit(3)
+open(name + ".deb", "wb").write(name.encode() * 100000)
+print("    Finished release")
+'''
+
+
+def expected_sha(name):
+    return hashlib.sha256(name.encode() * 100000).hexdigest()
+
+
+def wait_for_workers(coordinator, count, timeout=60):
+    deadline = time.monotonic() + timeout
+    while len(coordinator.workers) < count:
+        if time.monotonic() > deadline:
+            raise SystemExit(f"❌ {len(coordinator.workers)}/{count} worker(s) connecté(s) après {timeout} s")
+        time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérification et benchmark du cluster de build")
+    parser.add_argument('--workers', type=int, default=3, help="Workers lancés sur localhost")
+    parser.add_argument('--jobs', type=int, default=9, help="Builds soumis (dont un en échec)")
+    parser.add_argument('--seconds', type=float, default=0.5, help="Durée d'un faux build")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='pake_cluster_')
+    fake_pake = os.path.join(workdir, 'pake')
+    with open(fake_pake, 'w') as f:
+        f.write(FAKE_PAKE.format(python=sys.executable, seconds=args.seconds))
+    os.chmod(fake_pake, 0o755)
+
+    coordinator_dir = os.path.join(workdir, 'coordinator')
+    os.makedirs(coordinator_dir)
+    os.chdir(coordinator_dir)  # Cache et blobs du coordinateur dans le dossier temporaire
+    coordinator = pake_gui.ClusterCoordinator(port=0, log=lambda message: None,
+                                              blobs=pake_gui.BlobStore(os.path.join(coordinator_dir, 'blobs')))
+    port = coordinator.start()
+
+    processes = []
+    for index in range(args.workers):
+        worker_dir = os.path.join(workdir, f"worker{index}")
+        os.makedirs(worker_dir)
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join(REPO_DIR, 'pake_gui.py'), '--worker', f"127.0.0.1:{port}",
+             '--workers', '1', '--pake', fake_pake, '--no-build-cache'],
+            cwd=worker_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    failures = []
+    try:
+        wait_for_workers(coordinator, args.workers)
+
+        icon = None
+        if pake_gui.FAVICON_SUPPORT:
+            from PIL import Image
+            icon = os.path.join(workdir, 'icon.png')
+            Image.new('RGBA', (256, 256), (30, 120, 200, 255)).save(icon)
+
+        names = [f"App{index}" for index in range(args.jobs - 1)] + ["AppFail"]
+        logs = []
+
+        def build(name):
+            cmd = ['pake', f"https://{name.lower()}.example", '--name', name]
+            if icon:
+                cmd += ['--icon', icon]
+            return name, coordinator.run_build(cmd, log=logs.append, cwd=os.path.join(workdir, 'out', name),
+                                               use_cache=False)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            results = dict(executor.map(build, names))
+        wall = time.perf_counter() - start
+
+        for name, result in results.items():
+            if 'fail' in name.lower():
+                if result['returncode'] == 0 or result['artifacts']:
+                    failures.append(f"{name}: l'échec du build n'a pas été signalé")
+                continue
+            if result['returncode'] != 0:
+                failures.append(f"{name}: code {result['returncode']} ({' | '.join(result['output_tail'][-2:])})")
+                continue
+            expected = os.path.join(workdir, 'out', name, f"{name}.deb")
+            if [os.path.abspath(path) for path in result['artifacts']] != [expected]:
+                failures.append(f"{name}: installeurs inattendus {result['artifacts']}")
+                continue
+            with open(expected, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != expected_sha(name):
+                    failures.append(f"{name}: SHA-256 de l'installeur incorrect")
+
+        used = {result.get('worker') for result in results.values() if result.get('worker')}
+        if len(used) < min(args.workers, len(names)):
+            failures.append(f"{len(used)}/{args.workers} worker(s) utilisés")
+        icon_sends = sum(1 for line in logs if line.startswith("📤 Icône envoyée"))
+        if icon and icon_sends > args.workers:
+            failures.append(f"icône envoyée {icon_sends} fois pour {args.workers} worker(s)")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+        coordinator.stop()
+
+    ideal = len(names) * args.seconds / args.workers
+    print(f"📊 {len(names)} build(s) de {args.seconds:.1f}s sur {args.workers} worker(s) localhost")
+    print(f"   total {wall:.2f}s (répartition parfaite: {ideal:.2f}s, en série: {len(names) * args.seconds:.2f}s)")
+    print(f"   workers utilisés: {len(used)}, icône transférée {icon_sends} fois")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Installeurs rapatriés avec le bon SHA-256, échec signalé")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la couche réseau: requests.get (une connexion par requête)
+contre la session partagée de pake_gui (connexions keep-alive en pool).
+
+Un serveur HTTP local joue le rôle du site distant. Il compte les connexions
+ouvertes et peut simuler le coût d'une poignée de main TCP+TLS.
+
+Usage: python benchmarks/bench_http_pool.py [--requests 200] [--handshake-ms 20]
+"""
+
+import argparse
+import http.server
+import os
+import socketserver
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import requests  # noqa: E402
+import pake_gui  # noqa: E402
+
+
+class StandInServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """Serveur local qui compte les connexions et simule la poignée de main"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay):
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Nécessaire pour le keep-alive
+    disable_nagle_algorithm = True  # Comme un vrai serveur: pas d'attente d'ACK entre en-têtes et corps
+    body = b'\x00' * 4096  # Taille typique d'un favicon
+
+    def setup(self):
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake_delay)
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/x-icon')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_scenario(label, get, url, count, concurrency, server):
+    """Exécute count requêtes et retourne les statistiques du scénario"""
+    def timed_request(_):
+        start = time.perf_counter()
+        response = get(url)
+        response.content
+        return time.perf_counter() - start
+
+    server.connections = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(timed_request, range(count)))
+    total = time.perf_counter() - start
+    return {
+        'label': label,
+        'concurrency': concurrency,
+        'connections': server.connections,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'total_s': total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pool de connexions HTTP")
+    parser.add_argument('--requests', type=int, default=200, help="Requêtes par scénario")
+    parser.add_argument('--handshake-ms', type=float, default=20.0,
+                        help="Coût simulé d'une nouvelle connexion (TCP+TLS)")
+    args = parser.parse_args()
+
+    server = StandInServer(args.handshake_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/favicon.ico"
+
+    headers = {'User-Agent': pake_gui.HTTP_USER_AGENT}
+    session = pake_gui.create_http_session()
+    results = []
+    for concurrency in (1, pake_gui.HTTP_MAX_CONNECTIONS_PER_HOST):
+        results.append(run_scenario("requests.get", lambda u: requests.get(u, headers=headers, timeout=10),
+                                    url, args.requests, concurrency, server))
+        results.append(run_scenario("session partagée", lambda u: session.get(u, timeout=10),
+                                    url, args.requests, concurrency, server))
+    server.shutdown()
+
+    print(f"📊 {args.requests} requêtes par scénario, poignée de main simulée: {args.handshake_ms:.0f} ms")
+    print(f"{'client':<18} {'//':>3} {'connexions':>11} {'p50 (ms)':>9} {'p95 (ms)':>9} {'total (s)':>10}")
+    for result in results:
+        print(f"{result['label']:<18} {result['concurrency']:>3} {result['connections']:>11} "
+              f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['total_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche dans le catalogue de presets.
+
+Génère un catalogue synthétique (10 000 entrées par défaut) dans un dossier
+temporaire, puis mesure: construction de l'index, chargement de l'index en
+cache, et latence d'une recherche par frappe (préfixe et approximative).
+
+Usage: python benchmarks/bench_presets.py [--entries 10000] [--queries 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pake_gui  # noqa: E402
+
+# Syllabes consonne + voyelle (+ consonne finale): noms variés comme dans un vrai catalogue
+SYLLABLES = [c + v + e for c in 'bcdfgklmnprstvz' for v in 'aeiou' for e in ('', 'n', 'x')]
+
+
+def make_catalog(path, count, rng):
+    """Écrit un catalogue de count presets aux noms pseudo-aléatoires"""
+    names = []
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+            name = f"{name} {rng.choice(['Web', 'Mail', 'Docs', 'Cloud', 'Studio', ''])}".strip()
+            names.append(name)
+            entry = {'name': name, 'url': f"https://{name.lower().replace(' ', '')}{i}.example.com"}
+            f.write(json.dumps(entry) + "\n")
+    return names
+
+
+def percentiles(samples):
+    values = sorted(samples)
+    return {
+        'p50_us': statistics.median(values) * 1e6,
+        'p99_us': values[int(len(values) * 0.99) - 1] * 1e6,
+        'max_us': values[-1] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche de presets")
+    parser.add_argument('--entries', type=int, default=10000, help="Taille du catalogue synthétique")
+    parser.add_argument('--queries', type=int, default=2000, help="Recherches mesurées par scénario")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        catalog_path = os.path.join(workdir, 'catalog.jsonl')
+        index_path = os.path.join(workdir, 'index.json')
+        names = make_catalog(catalog_path, args.entries, rng)
+
+        start = time.perf_counter()
+        pake_gui.PresetCatalog(catalog_path, index_path).load()
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        catalog = pake_gui.PresetCatalog(catalog_path, index_path)
+        catalog.load()
+        cached = time.perf_counter() - start
+
+        scenarios = {}
+        # Frappe progressive: chaque préfixe d'un nom existant
+        prefixes = []
+        while len(prefixes) < args.queries:
+            name = rng.choice(names).lower()
+            prefixes.extend(name[:n] for n in range(1, min(len(name), 8) + 1))
+        # Fautes de frappe: deux lettres inversées
+        typos = []
+        for _ in range(args.queries):
+            name = list(rng.choice(names).lower())
+            i = rng.randrange(len(name) - 1)
+            name[i], name[i + 1] = name[i + 1], name[i]
+            typos.append(''.join(name))
+        for label, queries in (('préfixe', prefixes[:args.queries]), ('approximative', typos)):
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                catalog.search(query)
+                samples.append(time.perf_counter() - start)
+            scenarios[label] = percentiles(samples)
+
+    print(f"📊 Catalogue de {args.entries} presets")
+    print(f"   index construit en {build * 1000:.0f} ms, rechargé depuis le cache en {cached * 1000:.0f} ms")
+    print(f"{'recherche':<14} {'p50 (µs)':>10} {'p99 (µs)':>10} {'max (µs)':>10}")
+    for label, stats in scenarios.items():
+        print(f"{label:<14} {stats['p50_us']:>10.0f} {stats['p99_us']:>10.0f} {stats['max_us']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark du service HTTP de build (mode --serve) avec un faux Pake.
+
+Un script Python joue le rôle de Pake: il écrit un nombre donné de lignes
+« Compiling », puis produit un installeur .deb. Le service est lancé sur un
+port libre dans un dossier temporaire; on mesure la durée des builds sans
+abonné, puis avec de nombreux clients qui suivent le journal en SSE.
+Les abonnés ne doivent pas ralentir les builds, et chacun doit recevoir
+toutes les lignes.
+
+Avant les mesures, un build réussi et un build en échec (nom contenant
+« fail ») sont suivis en SSE jusqu'à leur événement de fin: état final,
+code de sortie et liste des installeurs sont vérifiés, ainsi que le
+téléchargement de l'installeur. Code de sortie 1 si une vérification échoue.
+
+Usage: python benchmarks/bench_service.py [--jobs 4] [--lines 20000] [--subscribers 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pake_gui  # noqa: E402
+
+FAKE_PAKE = '''#!{python}
+import sys
+name = sys.argv[sys.argv.index('--name') + 1]
+for i in range({lines}):
+    print(f"   Compiling crate{{i}} v0.1.0", flush=i % 100 == 0)
+if 'fail' in name.lower():
+    print("error: échec simulé", file=sys.stderr)
+    sys.exit(3)
+open(name + ".deb", "wb").write(b"x" * 4096)
+print("    Finished release")
+'''
+
+
+async def request(port, method, path, body=None):
+    """Requête HTTP minimale; retourne (statut, corps décodé du chunked éventuel)"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = json.dumps(body).encode('utf-8') if body is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b'\r\n\r\n')
+    if b'chunked' in head:
+        chunks = []
+        while payload:
+            size, _, payload = payload.partition(b'\r\n')
+            size = int(size, 16)
+            if not size:
+                break
+            chunks.append(payload[:size])
+            payload = payload[size + 2:]
+        payload = b''.join(chunks)
+    return int(head.split(b' ', 2)[1]), payload
+
+
+async def check_job(port, name, expected):
+    """Suit un job en SSE jusqu'à sa fin; retourne la liste des écarts avec expected"""
+    status, body = await request(port, 'POST', '/jobs', {'url': f"https://{name.lower()}.example",
+                                                         'name': name, 'auto_favicon': False})
+    if status != 202:
+        return [f"{name}: création refusée (HTTP {status})"]
+    job_id = json.loads(body)['id']
+    _, stream = await request(port, 'GET', f"/jobs/{job_id}/log?format=sse")
+    marker = b'event: end\ndata: '
+    if marker not in stream:
+        return [f"{name}: flux SSE sans événement de fin"]
+    end = json.loads(stream.split(marker, 1)[1].split(b'\n', 1)[0])
+    _, body = await request(port, 'GET', f"/jobs/{job_id}")
+    final = json.loads(body)
+
+    errors = []
+    for source, info in (('SSE', end), ('JSON', final)):
+        for key, value in expected.items():
+            actual = info.get(key)
+            if key == 'returncode' and value is None:
+                if not actual:
+                    errors.append(f"{name} ({source}): code de sortie nul pour un build en échec")
+            elif actual != value:
+                errors.append(f"{name} ({source}): {key} = {actual!r}, attendu {value!r}")
+    for artifact in expected.get('artifacts') or []:
+        status, data = await request(port, 'GET', f"/jobs/{job_id}/artifacts/{artifact}")
+        if status != 200 or len(data) != 4096:
+            errors.append(f"{name}: téléchargement de {artifact} incorrect (HTTP {status}, {len(data)} octets)")
+    return errors
+
+
+async def run_round(service, jobs, subscribers, tag):
+    """Soumet jobs builds, les suit avec subscribers clients SSE; retourne les mesures"""
+    port = service.port
+    ids = []
+    for index in range(jobs):
+        status, body = await request(port, 'POST', '/jobs', {'url': f"https://{tag}{index}.example",
+                                                             'name': f"{tag}{index}", 'auto_favicon': False})
+        assert status == 202, body
+        ids.append(json.loads(body)['id'])
+    start = time.perf_counter()
+    streams = [request(port, 'GET', f"/jobs/{ids[i % jobs]}/log?format=sse") for i in range(subscribers)]
+    received = [body.count(b'\ndata: ') + body.startswith(b'data: ') for _, body in await asyncio.gather(*streams)]
+    while any(not service.build_queue.get(job_id).done for job_id in ids):
+        await asyncio.sleep(0.05)
+    wall = time.perf_counter() - start
+    durations = [service.build_queue.get(job_id).result['duration'] for job_id in ids]
+    return {'wall': wall, 'build': statistics.median(durations), 'received': received,
+            'expected': [service.job_log(job_id).size + 1 for job_id in ids]}  # +1: événement de fin
+
+
+async def main_async(args, workdir):
+    fake_pake = os.path.join(workdir, 'pake')
+    with open(fake_pake, 'w') as f:
+        f.write(FAKE_PAKE.format(python=sys.executable, lines=args.lines))
+    os.chmod(fake_pake, 0o755)
+
+    service = pake_gui.BuildService(port=0, workers=args.jobs, output_dir=os.path.join(workdir, 'out'),
+                                    pake_executable=fake_pake, use_build_cache=False, log=lambda message: None)
+    await service.start()
+    errors = await check_job(service.port, 'Verif', {'status': 'succeeded', 'returncode': 0,
+                                                     'artifacts': ['Verif.deb']})
+    errors += await check_job(service.port, 'VerifFail', {'status': 'failed', 'returncode': None,
+                                                          'artifacts': []})
+    baseline = await run_round(service, args.jobs, 0, 'seul')
+    loaded = await run_round(service, args.jobs, args.subscribers, 'suivi')
+    service.shutdown()
+
+    print(f"📊 {args.jobs} build(s) de {args.lines} lignes, faux Pake")
+    print(f"{'scénario':<22} {'build (médiane)':>16} {'total':>9}")
+    print(f"{'sans abonné':<22} {baseline['build']:>15.2f}s {baseline['wall']:>8.2f}s")
+    print(f"{f'{args.subscribers} abonnés SSE':<22} {loaded['build']:>15.2f}s {loaded['wall']:>8.2f}s")
+    complete = sum(1 for index, count in enumerate(loaded['received'])
+                   if count >= loaded['expected'][index % args.jobs])
+    print(f"📨 {complete}/{args.subscribers} abonnés ont reçu toute la sortie")
+    if complete < args.subscribers:
+        errors.append(f"{args.subscribers - complete} abonné(s) n'ont pas reçu toute la sortie")
+    for error in errors:
+        print(f"❌ {error}")
+    if not errors:
+        print("✅ États finaux, codes de sortie et installeurs conformes (build réussi et en échec)")
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du service HTTP de build")
+    parser.add_argument('--jobs', type=int, default=4, help="Builds simultanés")
+    parser.add_argument('--lines', type=int, default=20000, help="Lignes de sortie par build")
+    parser.add_argument('--subscribers', type=int, default=200, help="Clients qui suivent les journaux")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # Caches et journaux du service dans le dossier temporaire
+        ok = asyncio.run(main_async(args, workdir))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
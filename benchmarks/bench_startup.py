@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark de démarrage de pake_gui, reproductible et suivi dans le temps.
+
+Mesures (depuis le lancement de l'interpréteur, médiane sur plusieurs runs):
+- headless: import du module + prérequis lus depuis le cache (prêt pour --batch)
+- fenêtre:  import du module + création de la fenêtre principale affichée
+
+Chaque run est exécuté dans un processus neuf, dans un dossier temporaire
+dont le cache a été préchauffé. Une décomposition de type `python -X importtime`
+liste les modules les plus coûteux.
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--json resultats.json]
+"""
+
+import argparse
+import compileall
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Scripts exécutés dans le processus mesuré; argv[1] = instant de lancement (epoch)
+HEADLESS_CHILD = '''
+import sys, time, json
+sys.path.insert(0, {repo!r})
+import pake_gui
+imported = time.time()
+pake_gui.probe_toolchain(log=lambda message: None)
+ready = time.time()
+print(json.dumps({{'import': imported - float(sys.argv[1]), 'ready': ready - float(sys.argv[1])}}))
+'''
+
+WINDOW_CHILD = '''
+import sys, time, json
+sys.path.insert(0, {repo!r})
+import pake_gui
+imported = time.time()
+try:
+    root = pake_gui.tk.Tk()
+except pake_gui.tk.TclError:
+    print(json.dumps(None))
+    sys.exit(0)
+app = pake_gui.PakeGUI(root)
+root.update()
+ready = time.time()
+app.close()
+root.destroy()
+print(json.dumps({{'import': imported - float(sys.argv[1]), 'ready': ready - float(sys.argv[1])}}))
+'''
+
+
+def run_child(script, cwd, importtime=False):
+    """Lance un processus neuf et retourne (mesures, sortie stderr)"""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', script.format(repo=REPO_DIR), repr(time.time())]
+    result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "échec du processus")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def importtime_breakdown(stderr, top=10):
+    """Extrait les modules importés par pake_gui les plus coûteux (temps cumulé)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # Ligne d'en-tête
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), self_us, cumulative_us))
+    # importtime affiche les enfants avant leur parent: les imports directs de
+    # pake_gui sont les lignes de profondeur 1 qui précèdent la sienne
+    position = next((i for i, row in enumerate(rows) if row[1] == 'pake_gui' and row[0] == 0), None)
+    if position is None:
+        return None, []
+    direct = []
+    for row in reversed(rows[:position]):
+        if row[0] == 0:
+            break
+        if row[0] == 1:
+            direct.append(row)
+    direct.sort(key=lambda row: row[3], reverse=True)
+    return rows[position], direct[:top]
+
+
+def summarize(samples):
+    values = sorted(samples)
+    return {
+        'median_ms': statistics.median(values) * 1000,
+        'min_ms': values[0] * 1000,
+        'max_ms': values[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de démarrage de pake_gui")
+    parser.add_argument('--runs', type=int, default=10, help="Nombre de runs par scénario")
+    parser.add_argument('--json', metavar='FICHIER', help="Écrit les résultats en JSON pour suivi des régressions")
+    args = parser.parse_args()
+
+    # Bytecode à jour: le coût de compilation ne doit pas fausser les mesures
+    compileall.compile_file(os.path.join(REPO_DIR, 'pake_gui.py'), quiet=1)
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': args.runs,
+        'scenarios': {},
+    }
+    try:
+        results['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                           capture_output=True, text=True).stdout.strip()
+    except OSError:
+        pass
+
+    with tempfile.TemporaryDirectory() as workdir:
+        run_child(HEADLESS_CHILD, workdir)  # Préchauffe le cache des prérequis
+        for label, script in (('headless', HEADLESS_CHILD), ('fenêtre', WINDOW_CHILD)):
+            imports, readies = [], []
+            for _ in range(args.runs):
+                sample, _ = run_child(script, workdir)
+                if sample is None:
+                    break
+                imports.append(sample['import'])
+                readies.append(sample['ready'])
+            if not readies:
+                print(f"⏭️ {label}: ignoré (aucun affichage disponible)")
+                continue
+            results['scenarios'][label] = {'import': summarize(imports), 'ready': summarize(readies)}
+        _, stderr = run_child(HEADLESS_CHILD, workdir, importtime=True)
+
+    print(f"📊 Démarrage de pake_gui ({args.runs} runs, Python {results['python']})")
+    print(f"{'scénario':<10} {'mesure':<8} {'médiane':>10} {'min':>10} {'max':>10}")
+    for label, scenario in results['scenarios'].items():
+        for metric, stats in scenario.items():
+            print(f"{label:<10} {metric:<8} {stats['median_ms']:>8.1f}ms {stats['min_ms']:>8.1f}ms "
+                  f"{stats['max_ms']:>8.1f}ms")
+
+    total, breakdown = importtime_breakdown(stderr)
+    if total:
+        print()
+        print(f"🔬 -X importtime: pake_gui {total[3] / 1000:.1f}ms cumulés ({total[2] / 1000:.1f}ms propres)")
+        for _, name, self_us, cumulative_us in breakdown:
+            print(f"   {name:<28} {cumulative_us / 1000:>7.1f}ms")
+        results['importtime'] = {name: cumulative_us for _, name, _, cumulative_us in breakdown}
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,20 +15,4540 @@ from pathlib import Path
 import re
 import shutil
 import datetime
+import time
+import io
+import hashlib
+import platform
+import importlib.util
+from urllib.parse import urljoin, urlparse
+import queue
+import codecs
+import traceback
+import functools
+from html.parser import HTMLParser
 
-# Imports optionnels pour le téléchargement de favicon
-try:
-    import requests
-    from urllib.parse import urljoin, urlparse
-    from PIL import Image
-    import tempfile
-    FAVICON_SUPPORT = True
-except ImportError:
-    FAVICON_SUPPORT = False
+# Dépendances optionnelles pour le téléchargement de favicon: détectées sans
+# être importées (requests et Pillow ne sont chargés qu'à la première utilisation)
+FAVICON_SUPPORT = all(importlib.util.find_spec(module) is not None for module in ('requests', 'PIL'))
+if not FAVICON_SUPPORT:
     print("⚠️ Modules manquants pour le téléchargement de favicon.")
     print("💡 Installez avec: pip install requests pillow")
     print("📝 Le téléchargement automatique des favicons sera désactivé.")
 
+# Paramètres du mode batch (sans interface)
+BATCH_OUTPUT_DIR = Path("generated_apps")
+CORES_PER_BUILD = 2  # cargo parallélise déjà chaque build sur plusieurs cœurs
+MEMORY_PER_BUILD = 2 * 1024 ** 3  # Empreinte mémoire typique d'un build Rust/Tauri
+
+# Service HTTP/JSON local (mode --serve)
+SERVICE_DEFAULT_HOST = '127.0.0.1'
+SERVICE_DEFAULT_PORT = 8470
+SERVICE_REQUEST_TIMEOUT = 30  # Secondes pour recevoir les en-têtes d'une requête
+SERVICE_MAX_BODY_BYTES = 1024 ** 2
+SERVICE_LOG_MAX_LINES = 20000  # Lignes de sortie gardées en mémoire par job pour les abonnés
+SERVICE_KEEPALIVE_SECONDS = 15  # Commentaire SSE envoyé pendant les silences du build
+SERVICE_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+CONFIG_FILE = Path("pake_gui_config.json")
+PROFILES_DB = Path("pake_gui_profiles.db")  # Profils d'applications enregistrés
+PROFILES_SEARCH_LIMIT = 200  # Résultats affichés au plus dans la liste des profils
+PROFILE_KEYS = ('url', 'name', 'width', 'height', 'icon_path', 'fullscreen', 'hide_title',
+                'always_on_top', 'auto_favicon', 'use_build_cache')  # Champs du formulaire
+CACHE_DIR = Path("pake_gui_cache")  # Caches persistants (chaîne de compilation, builds...)
+
+# Catalogue de presets livré avec l'application et son index de recherche
+PRESET_CATALOG = Path(__file__).resolve().parent / "presets" / "catalog.jsonl"
+PRESET_ICON_DIRNAME = "icons"  # Icônes préchargées, à côté du catalogue: <sha256>.png
+PRESET_INDEX_FILE = CACHE_DIR / "preset_index.json"
+PRESET_INDEX_VERSION = 1
+PRESET_SEARCH_LIMIT = 12
+PRESET_FUZZY_TRIGRAMS = 4  # Trigrammes les plus rares de la requête utilisés pour trouver les candidats
+PRESET_FUZZY_CANDIDATES = 150  # Candidats retenus au plus par trigramme
+PRESET_FUZZY_MIN_SCORE = 0.3  # Similarité de Jaccard minimale
+
+# Cache des installeurs produits (clé: arguments, icône, versions de Pake et Rust)
+BUILD_CACHE_DIR = CACHE_DIR / "builds"
+BUILD_CACHE_MAX_BYTES = 5 * 1024 ** 3
+ARTIFACT_EXTENSIONS = ('.deb', '.rpm', '.appimage', '.msi', '.exe', '.dmg')
+
+# Cache Rust partagé entre builds (sccache, dossiers cible cargo persistants)
+RUST_CACHE_DIR = CACHE_DIR / "rust"
+RUST_CACHE_MAX_BYTES = 20 * 1024 ** 3
+CARGO_COMPILING_RE = re.compile(r'^\s*Compiling \S+ v\S+')
+
+# Cluster de build: coordinateur (--coordinator) et workers (--worker) reliés en TCP
+CLUSTER_DEFAULT_PORT = 8471
+CLUSTER_PROTOCOL_VERSION = 1
+CLUSTER_BLOB_DIR = CACHE_DIR / "blobs"  # Icônes et installeurs adressés par leur SHA-256
+CLUSTER_BLOB_MAX_BYTES = 10 * 1024 ** 3
+CLUSTER_CHUNK_SIZE = 256 * 1024
+CLUSTER_ICON_EXTENSIONS = ('.png', '.ico', '.icns', '.svg', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+CLUSTER_MAX_MESSAGE_BYTES = 16 * 1024 ** 2  # Ligne JSON la plus longue acceptée
+CLUSTER_HELLO_TIMEOUT = 10
+CLUSTER_HEARTBEAT_SECONDS = 2  # Période des relevés de charge envoyés par les workers
+CLUSTER_POLL_SECONDS = 0.5  # Période de vérification des annulations
+CLUSTER_MAX_ATTEMPTS = 2  # Un build dont le worker disparaît est relancé ailleurs une fois
+CLUSTER_RECONNECT_SECONDS = 1
+CLUSTER_RECONNECT_MAX_SECONDS = 30
+CLUSTER_WORKER_TIMEOUT = 300  # Secondes sans aucun worker connecté avant d'abandonner les builds en attente
+CLUSTER_MAX_JOBS = 64  # Builds simultanés du service quand ils sont répartis sur le cluster
+CLUSTER_RESULT_KEYS = ('returncode', 'stopped', 'killed', 'duration', 'output_tail', 'cached', 'record',
+                       'peak_rss', 'cpu_time', 'cpu_avg')  # Champs du résultat renvoyés au coordinateur
+
+# Phases d'un build Pake: clé, libellé, part de la durée totale, motif de début
+BUILD_PHASES = (
+    ('install', "Installation des dépendances",
+     0.15, re.compile(r'npm (install|ci)|Installing (package|dependencies)|added \d+ packages|pnpm install', re.I)),
+    ('compile', "Compilation Rust", 0.70, re.compile(r'^\s*(Compiling|Building \[)')),
+    ('bundle', "Empaquetage", 0.15, re.compile(r'^\s*(Finished|Bundling|Running (light|candle|makensis|appimage))')),
+)
+CARGO_TOTAL_RE = re.compile(r'Building \[.*\]\s*(\d+)/(\d+)')  # « Building [====>  ] 123/456: crate »
+BUILD_STATS_FILE = CACHE_DIR / "build_stats.json"  # Nombre de crates du dernier build complet
+MONITOR_INTERVAL = 1.0  # Secondes entre deux relevés CPU/mémoire d'un build
+MONITOR_MAX_SAMPLES = 600  # Relevés gardés par build (sous-échantillonnés au-delà)
+
+# Noms de l'exécutable Pake par ordre de préférence (comparaison en minuscules)
+PAKE_EXECUTABLE_NAMES = ('pake.cmd', 'pake.exe', 'pake') if sys.platform == 'win32' else ('pake',)
+
+# Prérequis: libellé et délai de la sonde --version, versions minimales
+TOOLCHAIN_CACHE_FILE = CACHE_DIR / "toolchain.json"
+TOOLCHAIN_TOOLS = {
+    'node': ('Node.js', 5),
+    'npm': ('npm', 5),
+    'rustc': ('Rust', 5),
+}
+TOOLCHAIN_INSTALL_HINTS = {
+    'node': "https://nodejs.org/",
+    'rustc': "https://rustup.rs/",
+}
+MIN_TOOL_VERSIONS = {
+    'node': (18, 0, 0),
+    'rustc': (1, 70, 0),
+}
+
+# Paramètres du journal d'activité
+LOG_FLUSH_INTERVAL_MS = 100  # Période de vidage de la file vers le widget
+LOG_MAX_LINES = 2000  # Lignes conservées dans le widget (l'historique complet est sur disque)
+LOG_HISTORY_DIR = Path("logs")
+
+# Sortie des builds: lecture par blocs, fin de sortie bornée, journal complet compressé
+OUTPUT_CHUNK_SIZE = 64 * 1024
+OUTPUT_TAIL_LINES = 5  # Lignes gardées en mémoire pour les messages d'erreur
+OUTPUT_MAX_LINE_CHARS = 4000
+BUILD_LOG_DIR = LOG_HISTORY_DIR / "builds"
+BUILD_LOG_KEEP = 100  # Journaux de build compressés conservés
+
+# Historique des builds (JSONL, ajout seul) et détection des régressions
+BUILD_HISTORY_FILE = LOG_HISTORY_DIR / "build_history.jsonl"
+REGRESSION_THRESHOLD = 1.25  # Dernier build plus lent que 125 % de la médiane
+REGRESSION_MIN_SAMPLES = 3  # Builds précédents nécessaires pour établir la médiane
+HISTORY_MAX_SAMPLES = 60  # Points de la courbe CPU/mémoire enregistrés par build
+
+# Paramètres de la couche réseau partagée
+HTTP_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+HTTP_MAX_CONNECTIONS_PER_HOST = 4
+HTTP_MAX_HOSTS = 16  # Nombre d'hôtes dont les connexions keep-alive sont conservées
+HTTP_RETRIES = 2
+HTTP_BACKOFF_FACTOR = 0.3  # Attente entre tentatives: 0.3s, 0.6s, ...
+
+# Paramètres de recherche du favicon
+FAVICON_DIR = Path("favicons")
+FAVICON_CACHE_MAX_AGE = 7 * 86400  # Au-delà, le favicon est revalidé (ETag / Last-Modified)
+FAVICON_NEGATIVE_TTL = 24 * 3600  # Durée pendant laquelle un domaine sans favicon n'est pas resondé
+FAVICON_CACHE_MAX_BYTES = 20 * 1024 ** 2
+FAVICON_NEGATIVE_MAX_ENTRIES = 1000  # Domaines sans favicon mémorisés au plus
+FAVICON_FLUSH_INTERVAL = 60  # Secondes entre deux écritures de l'index pour les seuls last_used
+FAVICON_TIMEOUT = 10  # Délai maximal d'une requête
+FAVICON_DEADLINE = 15  # Délai global de la recherche, tous candidats confondus
+FAVICON_MAX_WORKERS = 6
+FAVICON_MIN_BYTES = 100
+FAVICON_MAX_BYTES = 5 * 1024 ** 2
+FAVICON_HEAD_MAX_BYTES = 256 * 1024  # Lecture maximale de la page pour trouver le <head>
+FAVICON_HEAD_CHUNK_SIZE = 16 * 1024
+FAVICON_PROBE_MAX_BYTES = 64 * 1024  # Octets lus au plus pour connaître les dimensions d'un candidat
+FAVICON_PROBE_CHUNK_SIZE = 4096
+FAVICON_GOOD_ENOUGH_SIZE = 512  # Un candidat de cette taille arrête la recherche
+FAVICON_PREFETCH_DEBOUNCE_MS = 800  # Délai sans frappe avant de précharger le favicon d'une URL
+FAVICON_PREFETCH_MAX_URLS = 32  # Résultats de préchargement gardés en mémoire
+FAVICON_WELL_KNOWN_RANK = 100  # Les icônes déclarées dans la page passent avant
+FAVICON_WELL_KNOWN_PATHS = [
+    '/favicon.ico',
+    '/apple-touch-icon.png',
+    '/apple-touch-icon-precomposed.png',
+    '/favicon.png',
+    '/favicon.svg',
+]
+
+# Jeu d'icônes généré pour chaque image source (cache par empreinte du contenu)
+ICON_DIR = CACHE_DIR / "icons"
+ICON_SIZES = (16, 24, 32, 48, 64, 128, 256, 512, 1024)
+ICON_LINUX_SIZE = 512  # Taille du PNG passé à Pake sous Linux
+
+# Traçage (--trace) et profilage (--profile) du pipeline
+TRACE_MAX_EVENTS = 500000  # Spans gardés en mémoire au plus (les suivants sont comptés comme perdus)
+PROFILE_DIR = LOG_HISTORY_DIR / "profiles"
+PROFILE_TRACEMALLOC_FRAMES = 10  # Profondeur de pile mémorisée par allocation
+PROFILE_SNAPSHOT_SECONDS = 60  # Période des instantanés mémoire
+PROFILE_REPORT_LINES = 40
+
+# Chien de garde de la boucle Tk: retard des ticks root.after et pile des gels
+WATCHDOG_INTERVAL_MS = 100  # Période des ticks mesurés
+WATCHDOG_STALL_MS = 250  # Retard à partir duquel l'interface est considérée figée
+WATCHDOG_SAMPLE_SECONDS = 0.05  # Période d'échantillonnage de la pile du thread Tk pendant un gel
+WATCHDOG_WINDOW = 3000  # Retards gardés pour les percentiles (~5 minutes de ticks)
+WATCHDOG_MAX_STALLS = 50  # Gels détaillés gardés en mémoire
+WATCHDOG_MAX_STACKS = 5  # Piles distinctes gardées par gel
+WATCHDOG_STACK_DEPTH = 40
+UI_TELEMETRY_FILE = LOG_HISTORY_DIR / "ui_telemetry.jsonl"
+
+
+def console_log(message):
+    """Affiche un message horodaté dans la console (mode sans interface)"""
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}", flush=True)
+
+
+def format_command(cmd):
+    """Formate une commande pour l'affichage (guillemets autour des espaces)"""
+    return ' '.join(f'"{arg}"' if ' ' in str(arg) else str(arg) for arg in cmd)
+
+
+class _Span:
+    """Span en cours: durée d'un bloc de code, exportée à la sortie du bloc"""
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def set(self, **args):
+        """Ajoute des attributs au span (statut HTTP, taille...)"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = f"{exc_type.__name__}: {exc}"
+        self.tracer.complete(self.name, self.start, time.perf_counter(), self.category, self.args)
+        return False
+
+
+class _NullSpan:
+    """Span inactif: coût quasi nul quand le traçage est désactivé"""
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Spans du pipeline (prérequis, favicon, commande, build) exportés au format
+    Chrome Trace Event, lisible dans chrome://tracing ou ui.perfetto.dev.
+
+    Désactivé par défaut: span() retourne alors un span inactif partagé.
+    """
+
+    def __init__(self, max_events=TRACE_MAX_EVENTS):
+        self.enabled = False
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self.threads = {}  # tid -> nom du thread
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self.origin = time.perf_counter()
+
+    def span(self, name, category='pake_gui', **args):
+        """Contexte mesurant un bloc: with TRACER.span('favicon', url=url) as span: ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def complete(self, name, start, end, category='pake_gui', args=None):
+        """Enregistre un span terminé (bornes en secondes de time.perf_counter)"""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((start - self.origin) * 1e6, 1),
+            'dur': round((end - start) * 1e6, 1),
+            'pid': os.getpid(),
+            'tid': thread.ident,
+            'args': {key: value if isinstance(value, (int, float, bool, type(None))) else str(value)
+                     for key, value in (args or {}).items()},
+        }
+        with self.lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+            self.threads[thread.ident] = thread.name
+
+    def complete_since(self, name, duration, category='pake_gui', args=None):
+        """Enregistre un span de durée connue qui se termine maintenant"""
+        end = time.perf_counter()
+        self.complete(name, end - duration, end, category, args)
+
+    def write(self, path):
+        """Écrit la trace au format Chrome/Perfetto; retourne le nombre de spans"""
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+            dropped = self.dropped
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': 'pake_gui'}}]
+        metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                     for tid, name in threads.items()]
+        path = Path(path)
+        if path.parent != Path(''):
+            path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms',
+                       'otherData': {'dropped_events': dropped}}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return len(events)
+
+
+TRACER = Tracer()
+
+
+def trace_span(name, category='pake_gui', **args):
+    """Span du traceur global (voir Tracer.span)"""
+    return TRACER.span(name, category, **args)
+
+
+def traced(name, category='pake_gui'):
+    """Décorateur: chaque appel de la fonction devient un span du traceur global"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with TRACER.span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Profiler:
+    """Mode --profile: cProfile sur tous les threads et instantanés tracemalloc.
+
+    Écrit dans directory: profile.pstats (à ouvrir avec pstats ou snakeviz),
+    profile.txt (fonctions les plus coûteuses), memory_<n>.snapshot et
+    memory.txt (allocations principales et croissance depuis le démarrage).
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.profiles = []
+        self.lock = threading.Lock()
+        self.snapshots = []  # (libellé, chemin du fichier .snapshot)
+        self.stop_event = threading.Event()
+
+    def start(self):
+        import cProfile
+        import tracemalloc
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+        self.snapshot("démarrage")
+        if sys.version_info < (3, 12):
+            # cProfile ne voit que le thread qui l'active (sys.monitoring couvre tous les
+            # threads depuis 3.12): un profileur par thread, créé à son premier événement
+            threading.setprofile(self._profile_thread)
+        profile = cProfile.Profile()
+        profile.enable()
+        self.profiles.append(profile)
+        threading.Thread(target=self._snapshot_loop, name='profiler', daemon=True).start()
+
+    def _profile_thread(self, frame, event, arg):
+        import cProfile
+
+        profile = cProfile.Profile()
+        with self.lock:
+            self.profiles.append(profile)
+        profile.enable()  # Remplace ce hook pour le thread courant
+
+    def _snapshot_loop(self):
+        while not self.stop_event.wait(PROFILE_SNAPSHOT_SECONDS):
+            self.snapshot(f"{len(self.snapshots) * PROFILE_SNAPSHOT_SECONDS}s")
+
+    def snapshot(self, label):
+        """Enregistre un instantané tracemalloc sur disque"""
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            return
+        path = self.directory / f"memory_{len(self.snapshots):03d}.snapshot"
+        tracemalloc.take_snapshot().dump(str(path))
+        self.snapshots.append((label, path))
+
+    def stop(self, log=None):
+        """Arrête le profilage et écrit les rapports"""
+        import pstats
+        import tracemalloc
+
+        log = log or console_log
+        self.stop_event.set()
+        threading.setprofile(None)
+        self.snapshot("fin")
+        tracemalloc.stop()
+        with self.lock:
+            profiles = list(self.profiles)
+        for profile in profiles:
+            profile.disable()  # Sans effet pour les profileurs des autres threads: leurs mesures restent lisibles
+        stats = None
+        for profile in profiles:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                pass  # Profileur d'un thread qui n'a rien mesuré
+        if stats is not None:
+            stats.dump_stats(str(self.directory / "profile.pstats"))
+            with open(self.directory / "profile.txt", 'w', encoding='utf-8') as f:
+                stats.stream = f
+                stats.sort_stats('cumulative').print_stats(PROFILE_REPORT_LINES)
+        self._memory_report()
+        log(f"🔬 Profil écrit dans {self.directory} (profile.pstats, profile.txt, memory.txt)")
+
+    def _memory_report(self):
+        import tracemalloc
+
+        if not self.snapshots:
+            return
+        first = tracemalloc.Snapshot.load(str(self.snapshots[0][1]))
+        last = tracemalloc.Snapshot.load(str(self.snapshots[-1][1]))
+        with open(self.directory / "memory.txt", 'w', encoding='utf-8') as f:
+            f.write("Instantanés: " + ", ".join(f"{label} ({path.name})" for label, path in self.snapshots) + "\n\n")
+            f.write(f"== Allocations principales ({self.snapshots[-1][0]}) ==\n")
+            for stat in last.statistics('lineno')[:PROFILE_REPORT_LINES]:
+                f.write(f"{stat}\n")
+            f.write(f"\n== Croissance depuis « {self.snapshots[0][0]} » ==\n")
+            for stat in last.compare_to(first, 'lineno')[:PROFILE_REPORT_LINES]:
+                f.write(f"{stat}\n")
+
+
+def start_diagnostics(trace_path=None, profile_dir=None):
+    """Active --trace et/ou --profile; les rapports sont écrits à la sortie du programme"""
+    import atexit
+
+    if trace_path:
+        TRACER.enable()
+
+        def write_trace():
+            count = TRACER.write(trace_path)
+            console_log(f"🧭 Trace écrite dans {trace_path} ({count} spans, ouvrir avec ui.perfetto.dev)")
+
+        atexit.register(write_trace)
+    if profile_dir:
+        profiler = Profiler(profile_dir)
+        profiler.start()
+        atexit.register(profiler.stop)
+
+
+class LagWatchdog:
+    """Chien de garde de la boucle d'événements Tk.
+
+    Un tick est programmé toutes les interval_ms avec schedule (root.after): son
+    retard est le temps pendant lequel la boucle n'a traité aucun événement.
+    Pendant un gel (retard >= stall_ms), un thread échantillonne la pile du
+    thread Tk; la fonction bloquante est la plus interne de ce module.
+    Chaque gel est journalisé, exporté dans la trace (--trace) et ajouté à
+    telemetry_file, suivi à l'arrêt des percentiles de la session.
+    """
+
+    def __init__(self, schedule, interval_ms=WATCHDOG_INTERVAL_MS, stall_ms=WATCHDOG_STALL_MS, log=None,
+                 telemetry_file=UI_TELEMETRY_FILE, sample_seconds=WATCHDOG_SAMPLE_SECONDS):
+        from collections import deque
+
+        self.schedule = schedule
+        self.interval_ms = int(interval_ms)
+        self.stall = stall_ms / 1000
+        self.log = log or console_log
+        self.telemetry_file = Path(telemetry_file) if telemetry_file else None
+        self.sample_seconds = sample_seconds
+        self.thread_id = threading.get_ident()  # Thread Tk: celui qui crée le chien de garde
+        self.lags = deque(maxlen=WATCHDOG_WINDOW)
+        self.stalls = deque(maxlen=WATCHDOG_MAX_STALLS)
+        self.ticks = 0
+        self.stall_count = 0
+        self.worst = 0.0
+        self.expected = None  # Instant (perf_counter) prévu du prochain tick
+        self.current = None  # Gel en cours: {'expected', 'stacks': {clé: [pile, échantillons]}}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.started = None
+
+    def start(self):
+        self.started = time.time()
+        self.expected = time.perf_counter() + self.interval_ms / 1000
+        self.schedule(self.interval_ms, self.tick)
+        threading.Thread(target=self._sample_loop, name='ui-watchdog', daemon=True).start()
+
+    def tick(self):
+        """Tick de la boucle Tk: mesure son retard puis programme le suivant"""
+        if self.stop_event.is_set():
+            return
+        expected = self.expected
+        lag = max(0.0, time.perf_counter() - expected)
+        with self.lock:
+            self.ticks += 1
+            self.lags.append(lag)
+            self.worst = max(self.worst, lag)
+            stall = self.current if self.current and self.current['expected'] == expected else None
+            self.current = None
+        if lag >= self.stall:
+            self._record_stall(lag, stall)
+        self.expected = time.perf_counter() + self.interval_ms / 1000
+        self.schedule(self.interval_ms, self.tick)
+
+    def _sample_loop(self):
+        while not self.stop_event.wait(self.sample_seconds):
+            expected = self.expected
+            if time.perf_counter() - expected < self.stall:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame, limit=WATCHDOG_STACK_DEPTH)
+            del frame
+            key = tuple((entry.filename, entry.lineno, entry.name) for entry in stack)
+            with self.lock:
+                if self.current is None or self.current['expected'] != expected:
+                    self.current = {'expected': expected, 'stacks': {}}
+                stacks = self.current['stacks']
+                if key in stacks:
+                    stacks[key][1] += 1
+                elif len(stacks) < WATCHDOG_MAX_STACKS:
+                    stacks[key] = [stack, 1]
+
+    @staticmethod
+    def culprit(stack):
+        """Fonction de ce module la plus interne d'une pile, suivie de l'appel bloquant"""
+        if not stack:
+            return None
+        innermost = stack[-1]
+
+        def describe(entry):
+            return f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+
+        own = next((entry for entry in reversed(stack) if entry.filename == __file__), None)
+        if own is None or own is innermost:
+            return describe(innermost)
+        return f"{describe(own)} → {describe(innermost)}"
+
+    def _record_stall(self, lag, stall):
+        stacks = sorted((stall or {}).get('stacks', {}).values(), key=lambda item: item[1], reverse=True)
+        culprit = self.culprit(stacks[0][0]) if stacks else None
+        record = {
+            'type': 'stall',
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'duration_ms': round(lag * 1000, 1),
+            'culprit': culprit,
+            'stacks': [{'samples': count,
+                        'frames': [f"{entry.filename}:{entry.lineno} in {entry.name}"
+                                   + (f": {entry.line}" if entry.line else "") for entry in stack]}
+                       for stack, count in stacks],
+        }
+        with self.lock:
+            self.stall_count += 1
+            self.stalls.append(record)
+        TRACER.complete_since('ui stall', lag, 'ui', {'culprit': culprit})
+        self.log(f"🐢 Interface figée {lag * 1000:.0f} ms: {culprit or 'pile non capturée'}")
+        self._write(record)
+
+    def stats(self):
+        """Percentiles des retards de la fenêtre courante (ms), nombre de ticks et de gels"""
+        with self.lock:
+            lags = list(self.lags)
+            stats = {'ticks': self.ticks, 'stalls': self.stall_count, 'max_ms': round(self.worst * 1000, 1)}
+        for q in (50, 95, 99):
+            value = percentile(lags, q)
+            stats[f"p{q}_ms"] = round(value * 1000, 1) if value is not None else None
+        stats.update(interval_ms=self.interval_ms, stall_ms=round(self.stall * 1000))
+        return stats
+
+    def recent_stalls(self):
+        """Gels gardés en mémoire, du plus ancien au plus récent"""
+        with self.lock:
+            return list(self.stalls)
+
+    def stop(self):
+        """Arrête les mesures et ajoute le résumé de la session à la télémétrie"""
+        if self.stop_event.is_set():
+            return
+        self.stop_event.set()
+        if self.ticks:
+            self._write({'type': 'session',
+                         'time': datetime.datetime.now().isoformat(timespec='seconds'),
+                         'duration_s': round(time.time() - self.started, 1), **self.stats()})
+
+    def _write(self, record):
+        if self.telemetry_file is None:
+            return
+        try:
+            self.telemetry_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.telemetry_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            self.telemetry_file = None
+            self.log(f"⚠️ Télémétrie de l'interface désactivée: {e}")
+
+
+def sanitize_app_name(name):
+    """Nettoie le nom de l'application (supprime les caractères spéciaux)"""
+    name = re.sub(r'[^\w\s-]', '', name or "MonApp").strip()
+    return re.sub(r'\s+', '_', name) or "MonApp"
+
+
+@traced('generate_command')
+def build_pake_command(config, pake_executable=None, log=None, favicon_resolver=None):
+    """Génère la commande Pake à partir d'une configuration (format de save_config).
+
+    favicon_resolver(url, log) remplace download_favicon, par exemple pour
+    réutiliser un favicon préchargé en arrière-plan.
+    """
+    log = log or console_log
+    favicon_resolver = favicon_resolver or download_favicon
+    url = str(config.get('url') or '').strip()
+    if not url:
+        return None, "URL manquante"
+
+    name = sanitize_app_name(str(config.get('name') or '').strip())
+
+    # Utiliser l'exécutable Pake détecté ou fallback
+    cmd = [pake_executable or 'pake', url, '--name', name]
+
+    # Ajouter les options
+    width = str(config.get('width') or '')
+    if width.isdigit():
+        cmd.extend(['--width', width])
+
+    height = str(config.get('height') or '')
+    if height.isdigit():
+        cmd.extend(['--height', height])
+
+    # Gestion de l'icône avec téléchargement automatique du favicon
+    icon_path = config.get('icon_path') or ''
+    if icon_path and os.path.exists(icon_path):
+        # Utiliser l'icône spécifiée par l'utilisateur (chemin absolu: le build peut tourner ailleurs)
+        cmd.extend(['--icon', os.path.abspath(prepare_icon(icon_path, log=log))])
+    elif config.get('auto_favicon', FAVICON_SUPPORT):
+        # Tenter de télécharger le favicon automatiquement si l'option est activée
+        log("🎨 Aucune icône spécifiée, tentative de téléchargement du favicon...")
+        favicon_path = favicon_resolver(url, log=log)
+        if favicon_path and os.path.exists(favicon_path):
+            cmd.extend(['--icon', os.path.abspath(prepare_icon(favicon_path, log=log))])
+            log(f"✅ Favicon utilisé comme icône: {os.path.basename(favicon_path)}")
+        else:
+            log("⚠️ Favicon non trouvé, icône par défaut de Pake utilisée")
+    else:
+        log("ℹ️ Téléchargement automatique du favicon désactivé, icône par défaut de Pake utilisée")
+
+    if config.get('fullscreen'):
+        cmd.append('--fullscreen')
+
+    if config.get('hide_title'):
+        cmd.append('--hide-title-bar')
+
+    if config.get('always_on_top'):
+        cmd.append('--always-on-top')
+
+    return cmd, None
+
+
+def build_log_path(cmd):
+    """Chemin du journal compressé d'un build: logs/builds/<date>_<nom>.log.gz"""
+    name = cmd[cmd.index('--name') + 1] if '--name' in cmd else 'pake'
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return BUILD_LOG_DIR / f"{stamp}_{sanitize_app_name(name) or 'pake'}.log.gz"
+
+
+def _prune_build_logs(keep=BUILD_LOG_KEEP):
+    """Supprime les journaux de build compressés les plus anciens"""
+    try:
+        logs = sorted(BUILD_LOG_DIR.glob('*.log.gz'))
+    except OSError:
+        return
+    for path in logs[:-keep]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+@traced('run_pake')
+def run_pake_process(cmd, log=None, cwd=None, should_stop=None, on_start=None, env=None, on_line=None,
+                     log_file=None, limits=None, on_sample=None):
+    """Exécute une commande Pake en relayant sa sortie et retourne le résultat du build.
+
+    La sortie est lue par blocs binaires et décodée de façon incrémentale (UTF-8
+    invalide remplacé): seule une fin de sortie bornée reste en mémoire, la
+    sortie complète est écrite telle quelle dans un journal gzip.
+
+    Le build tourne dans son propre groupe de processus: un arrêt, un
+    dépassement de durée ou de mémoire (limits) tue tout l'arbre. on_sample
+    reçoit les relevés CPU/mémoire de l'arbre.
+    """
+    import gzip
+    from collections import deque
+
+    log = log or console_log
+    limits = limits or get_process_limits()
+    log_file = Path(log_file or build_log_path(cmd))
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    start = time.monotonic()
+    with trace_span('spawn', command=os.path.basename(str(cmd[0]))):
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=cwd or os.getcwd(),
+            env=env,
+            **limits.popen_kwargs()
+        )
+        limits.apply(process.pid, log)
+    if on_start:
+        on_start(process)
+    killed = []  # Raison de l'arrêt forcé: 'timeout' ou 'memory'
+
+    def kill(reason):
+        if not killed:
+            killed.append(reason)
+            threading.Thread(target=kill_process_tree, args=(process, log), daemon=True).start()
+
+    def on_limit(rss):
+        log(f"🛑 Plafond mémoire dépassé ({rss / 1024 ** 3:.1f} Go), arrêt du build")
+        kill('memory')
+
+    monitor = ProcessTreeMonitor(process.pid, memory_limit=limits.memory_limit,
+                                 on_sample=on_sample, on_limit=on_limit).start()
+    timer = None
+    if limits.timeout:
+        def on_timeout():
+            log(f"⏰ Durée maximale dépassée ({format_duration(limits.timeout)}), arrêt du build")
+            kill('timeout')
+        timer = threading.Timer(limits.timeout, on_timeout)
+        timer.daemon = True
+        timer.start()
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    pending = ''
+    stopped = False
+
+    def emit(line):
+        line = line.strip()
+        if line:
+            line = line[:OUTPUT_MAX_LINE_CHARS]
+            tail.append(line)
+            log(f"📦 {line}")
+            if on_line:
+                on_line(line)
+
+    # Lire la sortie en temps réel, bloc par bloc
+    with gzip.open(log_file, 'wb', compresslevel=6) as full_log:
+        while True:
+            chunk = process.stdout.read1(OUTPUT_CHUNK_SIZE)
+            if not chunk:
+                break
+            full_log.write(chunk)
+            if should_stop and should_stop():  # Vérifier si l'arrêt a été demandé
+                stopped = True
+                break
+            # \r sépare aussi les lignes: cargo redessine sa barre de progression avec
+            lines = re.split(r'\r\n|\r|\n', pending + decoder.decode(chunk))
+            pending = lines.pop()
+            if len(pending) > OUTPUT_MAX_LINE_CHARS:  # Ligne sans fin: on la coupe
+                emit(pending)
+                pending = ''
+            for line in lines:
+                emit(line)
+        emit(pending + decoder.decode(b'', final=True))
+
+    process.stdout.close()
+    if stopped:
+        kill_process_tree(process, log)
+    process.wait()
+    if timer:
+        timer.cancel()
+    usage = monitor.stop()
+    _prune_build_logs()
+    return {
+        'returncode': process.returncode,
+        'stopped': stopped,
+        'killed': killed[0] if killed else None,
+        'duration': time.monotonic() - start,
+        'output_tail': list(tail),
+        'peak_rss': usage['peak_rss'],
+        'cpu_time': usage['cpu_time'],
+        'cpu_avg': usage['cpu_avg'],
+        'samples': usage['samples'],
+        'log_file': str(log_file),
+    }
+
+
+class BuildProgressParser:
+    """Reconnaît les phases d'un build Pake dans sa sortie et estime l'avancement.
+
+    Les phases sont décrites par BUILD_PHASES (clé, libellé, poids, motif) et ne
+    font qu'avancer. La compilation est mesurée en crates: le total vient de la
+    sortie cargo (« n/N ») ou, à défaut, du dernier build complet observé.
+    """
+
+    def __init__(self, phases=BUILD_PHASES, expected_crates=None, on_progress=None):
+        self.phases = phases
+        self.expected_crates = expected_crates
+        self.on_progress = on_progress
+        self.start = time.monotonic()
+        self.index = -1  # Avant la première phase reconnue: préparation
+        self.phase_start = self.start
+        self.timings = []
+        self.crates = 0
+        self.last_reported = None
+
+    @property
+    def phase(self):
+        return self.phases[self.index] if self.index >= 0 else None
+
+    def feed(self, line):
+        """Analyse une ligne de sortie; notifie on_progress si l'avancement a changé"""
+        for index in range(max(self.index, 0), len(self.phases)):
+            if self.phases[index][3].search(line):
+                if index != self.index:
+                    self._enter(index)
+                break
+        if self.phase and self.phase[0] == 'compile':
+            total = CARGO_TOTAL_RE.search(line)
+            if total:
+                self.crates = int(total.group(1))
+                self.expected_crates = int(total.group(2))
+            elif CARGO_COMPILING_RE.match(line):
+                self.crates += 1
+        self._notify()
+
+    def _enter(self, index):
+        now = time.monotonic()
+        self._record(now)
+        self.index = index
+        self.phase_start = now
+
+    def _record(self, now):
+        key, label = (self.phase[0], self.phase[1]) if self.phase else ('prepare', "Préparation")
+        self.timings.append({'phase': key, 'label': label, 'duration': round(now - self.phase_start, 3)})
+        TRACER.complete_since(f"phase {key}", now - self.phase_start, args={'label': label, 'crates': self.crates})
+
+    def fraction(self):
+        """Avancement global estimé entre 0 et 1"""
+        if self.index < 0:
+            return 0.0
+        done = sum(phase[2] for phase in self.phases[:self.index])
+        within = 0.0
+        if self.phase[0] == 'compile' and self.expected_crates:
+            within = min(self.crates / self.expected_crates, 0.99)
+        return min(done + self.phase[2] * within, 0.99)
+
+    def eta(self):
+        """Secondes restantes estimées, ou None tant que l'avancement est trop faible"""
+        fraction = self.fraction()
+        if fraction < 0.05:
+            return None
+        elapsed = time.monotonic() - self.start
+        return elapsed * (1 - fraction) / fraction
+
+    def _notify(self):
+        if not self.on_progress:
+            return
+        state = (self.index, int(self.fraction() * 100))
+        if state != self.last_reported:
+            self.last_reported = state
+            self.on_progress(self.snapshot())
+
+    def snapshot(self):
+        """État courant: {'phase', 'label', 'fraction', 'eta', 'crates', 'expected_crates'}"""
+        return {
+            'phase': self.phase[0] if self.phase else 'prepare',
+            'label': self.phase[1] if self.phase else "Préparation",
+            'fraction': self.fraction(),
+            'eta': self.eta(),
+            'crates': self.crates,
+            'expected_crates': self.expected_crates,
+        }
+
+    def finish(self):
+        """Clôt la phase en cours et retourne le relevé des phases du build"""
+        now = time.monotonic()
+        self._record(now)
+        return {'phases': self.timings, 'crates': self.crates, 'duration': round(now - self.start, 3)}
+
+
+def format_duration(seconds):
+    """Formate une durée en « 1 min 05 s » ou « 12.3 s »"""
+    if seconds >= 60:
+        return f"{int(seconds // 60)} min {int(seconds % 60):02d} s"
+    return f"{seconds:.1f} s"
+
+
+def _read_build_stats():
+    try:
+        with open(BUILD_STATS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_build_stats(stats):
+    try:
+        BUILD_STATS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = BUILD_STATS_FILE.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp_path, BUILD_STATS_FILE)
+    except OSError:
+        pass
+
+
+def _linux_process_tree_usage(root_pid):
+    """Mémoire (octets) et temps CPU (secondes) d'un processus et de ses descendants, d'après /proc"""
+    children, usage = {}, {}
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    ticks = os.sysconf('SC_CLK_TCK')
+    for entry in os.scandir('/proc'):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat", 'rb') as f:
+                stat = f.read()
+        except OSError:
+            continue  # Processus terminé entre-temps
+        # Le nom du processus peut contenir des espaces: les champs suivent la dernière parenthèse
+        fields = stat[stat.rfind(b')') + 2:].split()
+        pid = int(entry.name)
+        children.setdefault(int(fields[1]), []).append(pid)
+        # utime + stime + cutime + cstime: inclut les enfants terminés déjà attendus
+        cpu = sum(int(field) for field in fields[11:15]) / ticks
+        usage[pid] = (int(fields[21]) * page_size, cpu)
+    rss, cpu, pending = 0, 0.0, [root_pid]
+    while pending:
+        pid = pending.pop()
+        process_rss, process_cpu = usage.get(pid, (0, 0.0))
+        rss += process_rss
+        cpu += process_cpu
+        pending.extend(children.get(pid, ()))
+    return rss, cpu
+
+
+class ProcessLimits:
+    """Contraintes appliquées aux builds: priorité, cœurs, plafond mémoire et durée maximale"""
+
+    def __init__(self, nice=0, cpu_affinity=None, memory_limit=None, timeout=None):
+        self.nice = nice
+        self.cpu_affinity = cpu_affinity
+        self.memory_limit = memory_limit
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Crée les contraintes à partir des réglages de pake_gui_config.json"""
+        memory_gb = settings.get('build_memory_limit_gb')
+        timeout_minutes = settings.get('build_timeout_minutes')
+        return cls(nice=int(settings.get('build_nice', 0)),
+                   cpu_affinity=settings.get('build_cpu_affinity') or None,
+                   memory_limit=int(float(memory_gb) * 1024 ** 3) if memory_gb else None,
+                   timeout=float(timeout_minutes) * 60 if timeout_minutes else None)
+
+    def popen_kwargs(self):
+        """Options de Popen: nouvelle session (POSIX) ou nouveau groupe de processus (Windows)"""
+        if sys.platform == 'win32':
+            flags = subprocess.CREATE_NEW_PROCESS_GROUP
+            if self.nice >= 15:
+                flags |= subprocess.IDLE_PRIORITY_CLASS
+            elif self.nice > 0:
+                flags |= subprocess.BELOW_NORMAL_PRIORITY_CLASS
+            return {'creationflags': flags}
+        return {'start_new_session': True}
+
+    def apply(self, pid, log):
+        """Applique priorité et affinité au processus lancé; ses enfants en héritent"""
+        if sys.platform == 'win32':
+            return
+        try:
+            if self.nice:
+                os.setpriority(os.PRIO_PROCESS, pid, self.nice)
+            if self.cpu_affinity and hasattr(os, 'sched_setaffinity'):
+                os.sched_setaffinity(pid, [int(cpu) for cpu in self.cpu_affinity])
+        except (OSError, ValueError) as e:
+            log(f"⚠️ Contraintes de processus non appliquées: {e}")
+
+
+_process_limits = None
+
+
+def get_process_limits():
+    """Retourne les contraintes de build, configurées depuis pake_gui_config.json"""
+    global _process_limits
+    if _process_limits is None:
+        _process_limits = ProcessLimits.from_settings(read_config_file())
+    return _process_limits
+
+
+def kill_process_tree(process, log=None, grace=3):
+    """Arrête un build et tous ses descendants (npm, cargo, rustc...).
+
+    Le build tourne dans sa propre session (POSIX) ou son propre groupe
+    (Windows): on demande l'arrêt au groupe entier, puis on le tue s'il ne
+    s'est pas arrêté après grace secondes.
+    """
+    import signal
+
+    log = log or console_log
+    log("⏹️ Arrêt de l'arbre de processus demandé...")
+    try:
+        if sys.platform == 'win32':
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+    except OSError:
+        pass  # Déjà terminé
+    try:
+        process.wait(timeout=grace)
+        log("✅ Processus arrêté proprement")
+    except subprocess.TimeoutExpired:
+        log("🛑 Processus forcé à s'arrêter")
+    # Des descendants peuvent survivre au processus principal: on nettoie le groupe entier
+    try:
+        if sys.platform == 'win32':
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)],
+                           capture_output=True, timeout=10)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        pass
+
+
+class ProcessTreeMonitor:
+    """Échantillonne CPU et mémoire de l'arbre de processus d'un build.
+
+    Chaque relevé {'t', 'cpu_percent', 'rss'} est transmis à on_sample et
+    conservé (sous-échantillonné au-delà de MONITOR_MAX_SAMPLES). Si
+    memory_limit est dépassé, on_limit est appelé une fois.
+    """
+
+    def __init__(self, pid, interval=MONITOR_INTERVAL, memory_limit=None, on_sample=None, on_limit=None):
+        self.pid = pid
+        self.interval = interval
+        self.memory_limit = memory_limit
+        self.on_sample = on_sample
+        self.on_limit = on_limit
+        self.peak = None
+        self.cpu_time = 0.0
+        self.samples = []
+        self.start_time = time.monotonic()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if sys.platform.startswith('linux'):
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        last_cpu, last_time = 0.0, self.start_time
+        limit_reported = False
+        while not self.stop_event.wait(self.interval):
+            try:
+                rss, cpu = _linux_process_tree_usage(self.pid)
+            except OSError:
+                continue
+            now = time.monotonic()
+            cpu = max(cpu, self.cpu_time)  # Un enfant non attendu qui se termine sort du décompte
+            sample = {'t': round(now - self.start_time, 1),
+                      'cpu_percent': round(100 * (cpu - last_cpu) / max(now - last_time, 1e-6), 1),
+                      'rss': rss}
+            last_cpu, last_time = cpu, now
+            self.cpu_time = cpu
+            self.peak = max(self.peak or 0, rss)
+            self.samples.append(sample)
+            if len(self.samples) > MONITOR_MAX_SAMPLES:
+                self.samples = self.samples[::2]  # Mémoire bornée quelle que soit la durée du build
+            if self.on_sample:
+                self.on_sample(sample)
+            if self.memory_limit and rss > self.memory_limit and not limit_reported and self.on_limit:
+                limit_reported = True
+                self.on_limit(rss)
+
+    def stop(self):
+        """Arrête l'échantillonnage et retourne le résumé {'peak_rss', 'cpu_time', 'cpu_avg', 'samples'}"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        elif sys.platform != 'win32':
+            # Hors Linux: pic du plus gros processus enfant terminé (Ko sauf sur macOS)
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            self.peak = peak if sys.platform == 'darwin' else peak * 1024
+        elapsed = time.monotonic() - self.start_time
+        return {
+            'peak_rss': self.peak,
+            'cpu_time': round(self.cpu_time, 2) if self.thread else None,
+            'cpu_avg': round(100 * self.cpu_time / elapsed, 1) if self.thread and elapsed else None,
+            'samples': self.samples,
+        }
+
+
+def _try_lock_file(handle):
+    """Verrouille un fichier ouvert sans attendre; retourne False s'il est déjà verrouillé"""
+    try:
+        if sys.platform == 'win32':
+            import msvcrt
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def directory_size(path):
+    """Taille totale des fichiers d'un dossier, en octets"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _sccache_stats(sccache_path, env):
+    """Retourne (hits, misses) cumulés du serveur sccache, ou None"""
+    try:
+        result = subprocess.run([sccache_path, '--show-stats'], capture_output=True, text=True,
+                                timeout=10, env=env)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    hits = re.search(r'^Cache hits\s+(\d+)', result.stdout, re.MULTILINE)
+    misses = re.search(r'^Cache misses\s+(\d+)', result.stdout, re.MULTILINE)
+    if not (hits and misses):
+        return None
+    return int(hits.group(1)), int(misses.group(1))
+
+
+class RustBuildCache:
+    """Cache Rust partagé entre les builds: sccache et dossiers cible cargo verrouillés.
+
+    Chaque build en cours verrouille son propre dossier cible (« slot »): des
+    builds parallèles n'écrivent jamais dans le même dossier, et chaque slot
+    est réutilisé par les builds suivants.
+    """
+
+    def __init__(self, directory=RUST_CACHE_DIR, shared_target=False, use_sccache=True,
+                 max_bytes=RUST_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.shared_target = shared_target
+        self.sccache = shutil.which('sccache') if use_sccache else None
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Crée le cache à partir des réglages de pake_gui_config.json"""
+        max_gb = float(settings.get('rust_cache_max_gb', RUST_CACHE_MAX_BYTES / 1024 ** 3))
+        return cls(shared_target=bool(settings.get('shared_cargo_target', False)),
+                   use_sccache=bool(settings.get('use_sccache', True)),
+                   max_bytes=int(max_gb * 1024 ** 3))
+
+    @property
+    def enabled(self):
+        return bool(self.shared_target or self.sccache)
+
+    def acquire(self, log=None):
+        """Réserve un slot et retourne le bail à utiliser pour un build"""
+        return RustCacheLease(self, log or console_log)
+
+    def _lock_slot(self):
+        """Verrouille le premier slot libre (en crée un nouveau si tous sont occupés)"""
+        slots_dir = self.directory / "targets"
+        slots_dir.mkdir(parents=True, exist_ok=True)
+        index = 0
+        while True:
+            slot = slots_dir / f"slot-{index}"
+            handle = open(slots_dir / f"slot-{index}.lock", 'a+')
+            if _try_lock_file(handle):
+                slot.mkdir(exist_ok=True)
+                return slot, handle
+            handle.close()
+            index += 1
+
+    def _read_slot_meta(self, slot):
+        try:
+            with open(slot.with_suffix('.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_slot_meta(self, slot, meta):
+        with open(slot.with_suffix('.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    def usage(self):
+        """Retourne l'occupation disque: {'slots': {nom: octets}, 'sccache': octets, 'total': octets}"""
+        slots = {}
+        slots_dir = self.directory / "targets"
+        if slots_dir.is_dir():
+            for slot in sorted(slots_dir.iterdir()):
+                if slot.is_dir():
+                    slots[slot.name] = directory_size(slot)
+        sccache_size = directory_size(self.directory / "sccache")
+        return {'slots': slots, 'sccache': sccache_size, 'total': sum(slots.values()) + sccache_size}
+
+    def prune(self, max_bytes=None, log=None):
+        """Supprime les slots inutilisés les plus anciens jusqu'à passer sous max_bytes"""
+        log = log or console_log
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        slots_dir = self.directory / "targets"
+        if not slots_dir.is_dir():
+            return 0
+        slots = []
+        for slot in slots_dir.iterdir():
+            if slot.is_dir():
+                meta = self._read_slot_meta(slot)
+                slots.append((meta.get('last_used', 0), slot))
+        total = self.usage()['total']
+        freed = 0
+        for _, slot in sorted(slots, key=lambda item: item[0]):
+            if total <= max_bytes:
+                break
+            with open(slot.with_suffix('.lock'), 'a+') as handle:
+                if not _try_lock_file(handle):
+                    continue  # Slot utilisé par un build en cours
+                size = directory_size(slot)
+                shutil.rmtree(slot, ignore_errors=True)
+                try:
+                    slot.with_suffix('.json').unlink()
+                except OSError:
+                    pass
+            total -= size
+            freed += size
+            log(f"🧹 Slot Rust supprimé: {slot.name} ({size / 1024 ** 2:.0f} Mo)")
+        return freed
+
+
+class RustCacheLease:
+    """Slot réservé pour un build: environnement cargo, comptage des crates et taux de succès"""
+
+    def __init__(self, cache, log):
+        self.cache = cache
+        self.log = log
+        self.slot = None
+        self.lock_handle = None
+        self.compiled = 0
+        self.sccache_before = None
+        self.env = os.environ.copy()
+
+    def __enter__(self):
+        cache = self.cache
+        if cache.shared_target:
+            self.slot, self.lock_handle = cache._lock_slot()
+            self.env['CARGO_TARGET_DIR'] = str(self.slot.absolute())
+        if cache.sccache:
+            self.env['RUSTC_WRAPPER'] = cache.sccache
+            self.env.setdefault('SCCACHE_DIR', str((cache.directory / "sccache").absolute()))
+            self.env.setdefault('SCCACHE_CACHE_SIZE', f"{max(1, cache.max_bytes // 1024 ** 3)}G")
+            self.env['CARGO_INCREMENTAL'] = '0'  # sccache ne met pas en cache la compilation incrémentale
+            self.sccache_before = _sccache_stats(cache.sccache, self.env)
+        return self
+
+    def on_line(self, line):
+        """Compte les crates réellement recompilées d'après la sortie cargo"""
+        if CARGO_COMPILING_RE.match(line):
+            self.compiled += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.stats = self._finish()
+        finally:
+            if self.lock_handle:
+                self.lock_handle.close()
+        return False
+
+    def _finish(self):
+        stats = {'slot': self.slot.name if self.slot else None, 'compiled': self.compiled, 'hit_rate': None}
+        if self.cache.sccache and self.sccache_before:
+            after = _sccache_stats(self.cache.sccache, self.env)
+            if after:
+                hits, misses = after[0] - self.sccache_before[0], after[1] - self.sccache_before[1]
+                stats.update(sccache_hits=hits, sccache_misses=misses)
+                if hits + misses:
+                    stats['hit_rate'] = hits / (hits + misses)
+        if self.slot:
+            meta = self.cache._read_slot_meta(self.slot)
+            # Le build le plus complet observé dans ce slot sert de référence
+            known = max(meta.get('crates', 0), self.compiled)
+            if stats['hit_rate'] is None and known:
+                stats['hit_rate'] = 1 - self.compiled / known
+            meta.update(crates=known, last_used=time.time())
+            self.cache._write_slot_meta(self.slot, meta)
+        return stats
+
+
+_rust_cache = None
+
+
+def get_rust_cache():
+    """Retourne le cache Rust partagé, configuré depuis pake_gui_config.json"""
+    global _rust_cache
+    if _rust_cache is None:
+        _rust_cache = RustBuildCache.from_settings(read_config_file())
+    return _rust_cache
+
+
+def report_rust_cache(prune=False):
+    """Affiche l'occupation disque du cache Rust (mode ligne de commande)"""
+    cache = get_rust_cache()
+    if prune:
+        freed = cache.prune()
+        console_log(f"🧹 {freed / 1024 ** 2:.0f} Mo libérés")
+    usage = cache.usage()
+    print(f"🦀 Cache Rust: {cache.directory.absolute()}")
+    print(f"   sccache: {'actif (' + cache.sccache + ')' if cache.sccache else 'non installé ou désactivé'}")
+    print(f"   Dossiers cible partagés: {'activés' if cache.shared_target else 'désactivés'}")
+    for name, size in usage['slots'].items():
+        print(f"   {name:<12} {size / 1024 ** 2:>10.1f} Mo")
+    print(f"   {'sccache':<12} {usage['sccache'] / 1024 ** 2:>10.1f} Mo")
+    print(f"   {'total':<12} {usage['total'] / 1024 ** 2:>10.1f} Mo (max {cache.max_bytes / 1024 ** 3:.0f} Go)")
+    return 0
+
+
+def file_sha256(path):
+    """Calcule l'empreinte SHA-256 d'un fichier par blocs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _snapshot_artifacts(directory):
+    """Retourne {chemin absolu: mtime} des installeurs présents dans un dossier"""
+    try:
+        with os.scandir(directory) as entries:
+            return {os.path.abspath(entry.path): entry.stat().st_mtime for entry in entries
+                    if entry.is_file() and entry.name.lower().endswith(ARTIFACT_EXTENSIONS)}
+    except OSError:
+        return {}
+
+
+def _unshare_hardlink(path):
+    """Remplace un fichier partagé par lien physique par une copie indépendante"""
+    try:
+        if os.stat(path).st_nlink > 1:
+            tmp_path = f"{path}.tmp-{os.getpid()}"
+            shutil.copy2(path, tmp_path)
+            os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+class BuildCache:
+    """Cache des installeurs produits, adressé par le contenu des entrées du build"""
+
+    def __init__(self, directory=BUILD_CACHE_DIR, max_bytes=BUILD_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Crée le cache à partir des réglages de pake_gui_config.json"""
+        max_gb = float(settings.get('build_cache_max_gb', BUILD_CACHE_MAX_BYTES / 1024 ** 3))
+        return cls(max_bytes=int(max_gb * 1024 ** 3))
+
+    def key_for(self, cmd, toolchain):
+        """Calcule la clé d'un build: arguments normalisés, contenu de l'icône, versions"""
+        material = {
+            'args': _normalized_args(cmd),
+            'pake': (toolchain.get('pake') or {}).get('version'),
+            'rustc': (toolchain.get('rustc') or {}).get('version'),
+            'platform': [sys.platform, platform.machine()],
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _read_manifest(self, entry_dir):
+        try:
+            with open(entry_dir / "manifest.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def restore(self, key, dest_dir):
+        """Restaure les installeurs d'un build en cache; retourne leurs chemins ou None.
+
+        Les chemins sont absolus, comme ceux d'un build exécuté dans dest_dir
+        ou rapatrié d'un worker. Le verrou empêche une
+        éviction concurrente de supprimer l'entrée pendant la restauration.
+        """
+        entry_dir = self.directory / key
+        with self._lock:
+            manifest = self._read_manifest(entry_dir)
+            if not manifest:
+                return None
+            restored = []
+            for name in manifest['files']:
+                source, target = entry_dir / name, os.path.join(dest_dir, name)
+                if not source.exists():
+                    return None
+                if os.path.exists(target):
+                    os.unlink(target)
+                try:
+                    os.link(source, target)  # Lien physique: instantané, sans copie
+                except OSError:
+                    shutil.copy2(source, target)
+                restored.append(os.path.abspath(target))
+            manifest['last_used'] = time.time()
+            self._write_manifest(entry_dir, manifest)
+        return restored
+
+    def store(self, key, cmd, artifacts):
+        """Enregistre les installeurs produits par un build réussi"""
+        entry_dir = self.directory / key
+        tmp_dir = self.directory / f"{key}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for artifact in artifacts:
+            shutil.copy2(artifact, tmp_dir / os.path.basename(artifact))
+        now = time.time()
+        self._write_manifest(tmp_dir, {
+            'command': [os.path.basename(str(cmd[0]))] + list(cmd[1:]),
+            'files': [os.path.basename(artifact) for artifact in artifacts],
+            'size': sum(os.path.getsize(artifact) for artifact in artifacts),
+            'created': now,
+            'last_used': now,
+        })
+        with self._lock:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+            self._evict(keep=key)
+
+    def _write_manifest(self, entry_dir, manifest):
+        with open(entry_dir / "manifest.json", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    def _evict(self, keep=None):
+        """Supprime les builds les moins récemment utilisés au-delà de max_bytes"""
+        entries = []
+        for entry_dir in self.directory.iterdir():
+            manifest = self._read_manifest(entry_dir) if entry_dir.is_dir() else None
+            if manifest:
+                entries.append((manifest.get('last_used', 0), manifest.get('size', 0), entry_dir))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if entry_dir.name != keep:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+
+
+def _normalized_args(cmd):
+    """Arguments d'un build sans l'exécutable, l'icône étant remplacée par son empreinte"""
+    args = list(cmd[1:])  # Le chemin de l'exécutable n'influence pas le résultat
+    if '--icon' in args:
+        position = args.index('--icon') + 1
+        args[position] = 'sha256:' + file_sha256(args[position])
+    return args
+
+
+def command_hash(cmd):
+    """Empreinte d'une commande Pake, indépendante de l'emplacement de Pake"""
+    material = json.dumps(_normalized_args(cmd)).encode('utf-8')
+    return hashlib.sha256(material).hexdigest()[:16]
+
+
+def _compact_samples(samples, limit=HISTORY_MAX_SAMPLES):
+    """Courbe [secondes, % CPU, Mo] d'au plus limit points pour l'historique"""
+    step = max(1, -(-len(samples) // limit))  # Division arrondie au supérieur
+    return [[sample['t'], sample['cpu_percent'], round(sample['rss'] / 1024 ** 2)]
+            for sample in samples[::step]]
+
+
+_history_lock = threading.Lock()
+
+
+def record_build(cmd, toolchain, result, history_file=None, log=None):
+    """Ajoute l'enregistrement d'un build à l'historique JSONL (ajout seul)"""
+    log = log or console_log
+    history_file = Path(history_file or BUILD_HISTORY_FILE)
+    name = cmd[cmd.index('--name') + 1] if '--name' in cmd else None
+    record = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'app': name,
+        'url': cmd[1] if len(cmd) > 1 else None,
+        'command_hash': command_hash(cmd),
+        'toolchain': {tool: info.get('version') for tool, info in toolchain.items()},
+        'platform': [sys.platform, platform.machine()],
+        'returncode': result['returncode'],
+        'stopped': result['stopped'],
+        'cached': result.get('cached', False),
+        'duration': round(result['duration'], 3),
+        'phases': {timing['phase']: timing['duration'] for timing in result.get('record', {}).get('phases', [])},
+        'crates': result.get('record', {}).get('crates'),
+        'artifacts': {},
+        'peak_rss': result.get('peak_rss'),
+        'cpu_time': result.get('cpu_time'),
+        'cpu_avg': result.get('cpu_avg'),
+        'killed': result.get('killed'),
+        'samples': _compact_samples(result.get('samples') or []),
+        'log_file': result.get('log_file'),
+    }
+    for artifact in result.get('artifacts', []):
+        try:
+            record['artifacts'][os.path.basename(artifact)] = os.path.getsize(artifact)
+        except OSError:
+            pass
+    if result.get('rust_cache'):
+        record['rust_cache_hit_rate'] = result['rust_cache'].get('hit_rate')
+    try:
+        history_file.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with _history_lock, open(history_file, 'a', encoding='utf-8') as f:
+            f.write(line)
+    except OSError as e:
+        log(f"⚠️ Historique des builds non enregistré: {e}")
+    return record
+
+
+def read_build_history(history_file=None):
+    """Lit l'historique des builds en ignorant les lignes corrompues (écriture interrompue)"""
+    records = []
+    try:
+        with open(history_file or BUILD_HISTORY_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return records
+
+
+def percentile(values, q):
+    """Percentile par rang le plus proche (q entre 0 et 100)"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * q // 100))  # Arrondi supérieur
+    return ordered[int(rank) - 1]
+
+
+def find_regressions(records, threshold=REGRESSION_THRESHOLD, min_samples=REGRESSION_MIN_SAMPLES):
+    """Compare le dernier build de chaque app à la médiane des précédents.
+
+    Retourne {app: {'last', 'baseline', 'ratio', 'phase'}} pour les builds plus
+    lents que baseline * threshold; 'phase' est la phase qui a le plus ralenti.
+    """
+    by_app = {}
+    for record in records:
+        if record.get('returncode') == 0 and not record.get('cached') and not record.get('stopped'):
+            by_app.setdefault(record.get('app'), []).append(record)
+    regressions = {}
+    for app, builds in by_app.items():
+        if len(builds) <= min_samples:
+            continue
+        last, previous = builds[-1], builds[:-1]
+        baseline = percentile([build['duration'] for build in previous], 50)
+        if not baseline or last['duration'] <= baseline * threshold:
+            continue
+        slowest_phase, worst_delta = None, 0.0
+        for phase, duration in last.get('phases', {}).items():
+            samples = [build['phases'][phase] for build in previous if phase in build.get('phases', {})]
+            if samples and duration - percentile(samples, 50) > worst_delta:
+                slowest_phase, worst_delta = phase, duration - percentile(samples, 50)
+        regressions[app] = {'last': last['duration'], 'baseline': baseline,
+                            'ratio': last['duration'] / baseline, 'phase': slowest_phase}
+    return regressions
+
+
+def report_build_history(history_file=None):
+    """Affiche p50/p95 des durées de build par app et signale les régressions"""
+    records = read_build_history(history_file)
+    if not records:
+        console_log("ℹ️ Aucun build dans l'historique")
+        return 0
+    by_app = {}
+    for record in records:
+        by_app.setdefault(record.get('app') or '?', []).append(record)
+    regressions = find_regressions(records)
+
+    print(f"📊 === Historique des builds ({len(records)} enregistrement(s)) ===")
+    print(f"  {'application':<24} {'builds':>6} {'échecs':>6} {'cache':>6} {'p50':>10} {'p95':>10} "
+          f"{'dernier':>10} {'RSS max':>9}")
+    for app, builds in sorted(by_app.items()):
+        compiled = [build for build in builds
+                    if build.get('returncode') == 0 and not build.get('cached') and not build.get('stopped')]
+        durations = [build['duration'] for build in compiled]
+        failures = sum(1 for build in builds if build.get('returncode') != 0 and not build.get('stopped'))
+        cached = sum(1 for build in builds if build.get('cached'))
+        peaks = [build['peak_rss'] for build in compiled if build.get('peak_rss')]
+        cells = [format_duration(percentile(durations, q)) if durations else '-' for q in (50, 95)]
+        cells.append(format_duration(durations[-1]) if durations else '-')
+        rss = f"{max(peaks) / 1024 ** 2:.0f} Mo" if peaks else '-'
+        print(f"  {app:<24} {len(builds):>6} {failures:>6} {cached:>6} {cells[0]:>10} {cells[1]:>10} "
+              f"{cells[2]:>10} {rss:>9}")
+    for app, regression in sorted(regressions.items()):
+        phase = f", surtout en phase « {regression['phase']} »" if regression['phase'] else ""
+        print(f"  ⚠️ Régression {app}: {format_duration(regression['last'])} contre "
+              f"{format_duration(regression['baseline'])} en médiane (x{regression['ratio']:.2f}){phase}")
+    return 0
+
+
+_build_cache = None
+
+
+def get_build_cache():
+    """Retourne le cache de builds partagé, configuré depuis pake_gui_config.json"""
+    global _build_cache
+    if _build_cache is None:
+        _build_cache = BuildCache.from_settings(read_config_file())
+    return _build_cache
+
+
+@traced('build')
+def run_cached_build(cmd, toolchain, log=None, cwd=None, use_cache=True, on_progress=None, **kwargs):
+    """Exécute un build Pake, ou restaure ses installeurs si un build identique est en cache.
+
+    on_progress reçoit l'état de BuildProgressParser.snapshot() à chaque changement
+    de phase ou de pourcentage; le relevé des phases est retourné dans result['record'].
+    """
+    log = log or console_log
+    cwd = cwd or os.getcwd()
+    cache = get_build_cache() if use_cache else None
+    key = None
+    if cache:
+        start = time.monotonic()
+        key = cache.key_for(cmd, toolchain)
+        restored = cache.restore(key, cwd)
+        if restored is not None:
+            log(f"♻️ Build identique trouvé en cache ({key[:12]}), {len(restored)} fichier(s) restauré(s)")
+            for artifact in restored:
+                log(f"📦 {artifact}")
+            duration = time.monotonic() - start
+            result = {'returncode': 0, 'stopped': False, 'duration': duration,
+                      'output_tail': [], 'cached': True, 'artifacts': restored,
+                      'record': {'phases': [{'phase': 'restore', 'label': "Restauration du cache",
+                                             'duration': round(duration, 3)}],
+                                 'crates': 0, 'duration': round(duration, 3)}}
+            record_build(cmd, toolchain, result, log=log)
+            return result
+
+    before = _snapshot_artifacts(cwd)
+    for path in before:
+        _unshare_hardlink(path)  # Un build qui réécrit l'installeur ne doit pas altérer le cache
+    stats = _read_build_stats()
+    parser = BuildProgressParser(expected_crates=stats.get('crates'), on_progress=on_progress)
+    rust_cache = get_rust_cache()
+    if rust_cache.enabled:
+        with rust_cache.acquire(log) as lease:
+            if lease.slot:
+                log(f"🦀 Dossier cible Rust partagé: {lease.slot}")
+
+            def on_line(line):
+                lease.on_line(line)
+                parser.feed(line)
+
+            result = run_pake_process(cmd, log=log, cwd=cwd, env=lease.env, on_line=on_line, **kwargs)
+        result['rust_cache'] = lease.stats
+        hit_rate = lease.stats['hit_rate']
+        log(f"🦀 Cache Rust: {lease.stats['compiled']} crate(s) compilée(s), taux de succès "
+            + (f"{hit_rate:.0%}" if hit_rate is not None else "inconnu (premier build)"))
+    else:
+        result = run_pake_process(cmd, log=log, cwd=cwd, on_line=parser.feed, **kwargs)
+    result['record'] = parser.finish()
+    log("⏱️ Phases: " + ", ".join(f"{timing['label']} {format_duration(timing['duration'])}"
+                                 for timing in result['record']['phases']))
+    if result['returncode'] == 0 and not result['stopped'] and parser.crates:
+        # Sans cache Rust tous les crates sont recompilés: c'est le total attendu au prochain build
+        if parser.crates >= stats.get('crates', 0) or not rust_cache.enabled:
+            stats['crates'] = parser.crates
+            _write_build_stats(stats)
+    result['cached'] = False
+    result['artifacts'] = [path for path, mtime in _snapshot_artifacts(cwd).items()
+                           if before.get(path) != mtime]
+    if cache and result['returncode'] == 0 and not result['stopped'] and result['artifacts']:
+        try:
+            cache.store(key, cmd, result['artifacts'])
+            log(f"💾 Installeurs mis en cache ({key[:12]})")
+        except OSError as e:
+            log(f"⚠️ Mise en cache du build impossible: {e}")
+    record_build(cmd, toolchain, result, log=log)
+    return result
+
+
+def get_available_memory():
+    """Retourne la mémoire disponible en octets, ou None si indéterminable"""
+    try:
+        if sys.platform.startswith('linux'):
+            with open('/proc/meminfo', 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        return int(line.split()[1]) * 1024
+        elif sys.platform == 'win32':
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ('dwLength', ctypes.c_ulong),
+                    ('dwMemoryLoad', ctypes.c_ulong),
+                    ('ullTotalPhys', ctypes.c_ulonglong),
+                    ('ullAvailPhys', ctypes.c_ulonglong),
+                    ('ullTotalPageFile', ctypes.c_ulonglong),
+                    ('ullAvailPageFile', ctypes.c_ulonglong),
+                    ('ullTotalVirtual', ctypes.c_ulonglong),
+                    ('ullAvailVirtual', ctypes.c_ulonglong),
+                    ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+                ]
+
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullAvailPhys
+        else:
+            return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES')
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def compute_worker_count(requested=None):
+    """Calcule le nombre de builds parallèles selon les cœurs et la mémoire libre"""
+    if requested:
+        return max(1, int(requested))
+    by_cpu = max(1, (os.cpu_count() or 1) // CORES_PER_BUILD)
+    available = get_available_memory()
+    by_memory = max(1, available // MEMORY_PER_BUILD) if available else by_cpu
+    return min(by_cpu, by_memory)
+
+
+def load_batch_manifest(manifest_path):
+    """Charge un manifeste batch: liste de configurations ou {"defaults": ..., "apps": [...]}"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {'apps': manifest}
+    defaults = manifest.get('defaults', {})
+    return [dict(defaults, **app) for app in manifest.get('apps', [])]
+
+
+def run_batch(manifest_path, workers=None, output_dir=None, pake_executable=None, use_build_cache=True,
+              coordinator=None):
+    """Construit toutes les applications d'un manifeste en parallèle, sans interface.
+
+    Avec un ClusterCoordinator, les builds sont répartis sur les workers du cluster.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        apps = load_batch_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        console_log(f"❌ Manifeste illisible: {e}")
+        return 2
+    if not apps:
+        console_log("⚠️ Aucune application dans le manifeste")
+        return 0
+
+    toolchain = probe_toolchain(log=console_log)
+    if not report_toolchain(toolchain, log=console_log):
+        console_log("⚠️ === Certains prérequis manquent ou sont trop anciens ===")
+    if not pake_executable and not coordinator:  # Les workers du cluster utilisent leur propre Pake
+        if toolchain['pake']['status'] != 'ok':
+            return 2
+        pake_executable = toolchain['pake']['path']
+
+    output_dir = Path(output_dir or BATCH_OUTPUT_DIR)
+    if coordinator:
+        workers = len(apps)  # Le coordinateur attribue les builds selon la capacité des workers
+        builder = coordinator.run_build
+        console_log(f"🚀 === Batch: {len(apps)} application(s), réparties sur le cluster ===")
+    else:
+        workers = min(compute_worker_count(workers), len(apps))
+        builder = run_cached_build
+        console_log(f"🚀 === Batch: {len(apps)} application(s), {workers} build(s) en parallèle ===")
+
+    # Les builds tournent dans leur propre session: Ctrl+C ne les atteint pas, on les arrête nous-mêmes
+    stop_event = threading.Event()
+    processes = []
+
+    def build(config):
+        name = sanitize_app_name(str(config.get('name') or '').strip())
+        log = lambda message: console_log(f"[{name}] {message}")
+        start = time.monotonic()
+        if stop_event.is_set():
+            return {'name': name, 'ok': False, 'duration': 0.0, 'error': "interrompu"}
+
+        def on_start(process):
+            processes.append(process)
+            if stop_event.is_set():  # Interrompu pendant le démarrage
+                kill_process_tree(process, log)
+
+        try:
+            cmd, error = build_pake_command(config, pake_executable, log=log)
+            if error:
+                return {'name': name, 'ok': False, 'duration': 0.0, 'error': error}
+            cwd = output_dir / name
+            cwd.mkdir(parents=True, exist_ok=True)
+            log(f"📝 Commande: {format_command(cmd)}")
+            result = builder(cmd, toolchain, log=log, cwd=str(cwd),
+                             use_cache=use_build_cache and config.get('use_build_cache', True),
+                             should_stop=stop_event.is_set, on_start=on_start)
+            ok = result['returncode'] == 0
+            error = None if ok else (KILL_REASONS.get(result.get('killed'), f"code {result['returncode']}")
+                                     + ": " + " | ".join(result['output_tail'][-2:]))
+            log("🎉 Build terminé" if ok else f"❌ Build échoué ({error})")
+            return {'name': name, 'ok': ok, 'duration': time.monotonic() - start, 'error': error,
+                    'cached': result['cached']}
+        except Exception as e:
+            log(f"❌ Exception: {e}")
+            return {'name': name, 'ok': False, 'duration': time.monotonic() - start, 'error': str(e)}
+
+    batch_start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        results = list(executor.map(build, apps))
+    except KeyboardInterrupt:
+        console_log("⏹️ Interruption: arrêt des builds en cours...")
+        stop_event.set()
+        threads = [threading.Thread(target=kill_process_tree, args=(process, console_log), daemon=True)
+                   for process in list(processes) if process.poll() is None]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        raise
+    finally:
+        executor.shutdown(wait=True)  # Les builds restants voient stop_event et s'arrêtent aussitôt
+
+    # Rapport final
+    print()
+    print("📊 === Rapport du batch ===")
+    for result in results:
+        status = "✅ succès" if result['ok'] else "❌ échec "
+        line = f"  {status}  {result['name']:<30} {result['duration']:8.1f}s"
+        if result.get('cached'):
+            line += "  ♻️ cache"
+        if result['error']:
+            line += f"  {result['error']}"
+        print(line)
+    failures = sum(1 for result in results if not result['ok'])
+    print(f"🏁 {len(results) - failures} succès, {failures} échec(s) en {time.monotonic() - batch_start:.1f}s")
+    return 1 if failures else 0
+
+
+JOB_STATUS_LABELS = {
+    'pending': "⏳ En attente",
+    'running': "🔨 En cours",
+    'succeeded': "✅ Réussi",
+    'cached': "♻️ Cache",
+    'failed': "❌ Échec",
+    'cancelled': "⏹️ Annulé",
+}
+
+
+KILL_REASONS = {
+    'timeout': "durée maximale dépassée",
+    'memory': "plafond mémoire dépassé",
+    'worker_lost': "worker du cluster perdu",
+    'no_worker': "aucun worker du cluster connecté",
+}
+
+
+class BuildJob:
+    """Build placé dans la file: configuration, priorité, état et résultat"""
+
+    def __init__(self, job_id, config, cmd, priority=0):
+        self.id = job_id
+        self.config = config
+        self.cmd = cmd
+        self.priority = priority
+        self.name = sanitize_app_name(str(config.get('name') or '').strip())
+        self.status = 'pending'
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.progress = None  # Dernier état de BuildProgressParser.snapshot()
+        self.resources = None  # Dernier relevé de ProcessTreeMonitor
+        self.process = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def done(self):
+        return self.status not in ('pending', 'running')
+
+    def elapsed(self):
+        """Durée d'exécution en secondes (0 tant que le job attend)"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+class BuildQueue:
+    """File de builds à priorités exécutée par un nombre limité de threads.
+
+    runner(job) exécute le build et retourne le résultat de run_cached_build;
+    on_change(job) est appelé (depuis n'importe quel thread) à chaque
+    changement d'état d'un job.
+    """
+
+    def __init__(self, runner, max_workers=None, on_change=None):
+        self.runner = runner
+        self.max_workers = compute_worker_count(max_workers)
+        self.on_change = on_change or (lambda job: None)
+        self.jobs = []  # Ordre d'affichage; les jobs en attente partent dans cet ordre
+        self.lock = threading.Lock()
+        self.next_id = 1
+
+    def submit(self, config, cmd, priority=0):
+        """Ajoute un job, placé après les jobs en attente de priorité supérieure ou égale"""
+        with self.lock:
+            job = BuildJob(self.next_id, config, cmd, priority)
+            self.next_id += 1
+            position = len(self.jobs)
+            for index, other in enumerate(self.jobs):
+                if other.status == 'pending' and other.priority < priority:
+                    position = index
+                    break
+            self.jobs.insert(position, job)
+            started = self._dispatch()
+        self._notify([job] + started)
+        return job
+
+    def get(self, job_id):
+        return next((job for job in self.jobs if job.id == job_id), None)
+
+    def active(self):
+        """Retourne les jobs en attente ou en cours"""
+        return [job for job in self.jobs if not job.done]
+
+    def _dispatch(self):
+        """Démarre des jobs en attente dans la limite de concurrence (sous self.lock)"""
+        running = sum(1 for job in self.jobs if job.status == 'running')
+        started = []
+        for job in self.jobs:
+            if running >= self.max_workers:
+                break
+            if job.status == 'pending':
+                job.status = 'running'
+                job.started = time.monotonic()
+                threading.Thread(target=self._run, args=(job,), daemon=True).start()
+                started.append(job)
+                running += 1
+        return started
+
+    def _run(self, job):
+        try:
+            job.result = self.runner(job)
+            if job.cancel_event.is_set():
+                job.status = 'cancelled'
+            elif job.result['returncode'] == 0:
+                job.status = 'cached' if job.result.get('cached') else 'succeeded'
+            else:
+                job.status = 'failed'
+                job.error = KILL_REASONS.get(job.result.get('killed'), f"code {job.result['returncode']}")
+        except Exception as e:
+            job.status = 'cancelled' if job.cancel_event.is_set() else 'failed'
+            job.error = str(e)
+        finally:
+            job.finished = time.monotonic()
+            job.process = None
+            with self.lock:
+                started = self._dispatch()
+            self._notify([job] + started)
+
+    def cancel(self, job_id, log=None):
+        """Annule un job en attente, ou arrête le processus d'un job en cours"""
+        with self.lock:
+            job = self.get(job_id)
+            if job is None or job.done:
+                return False
+            job.cancel_event.set()
+            if job.status == 'pending':
+                job.status = 'cancelled'
+                job.finished = time.monotonic()
+            process = job.process
+        if process is not None:
+            threading.Thread(target=kill_process_tree, args=(process, log), daemon=True).start()
+        self._notify([job])
+        return True
+
+    def shutdown(self, log=None):
+        """Annule tous les jobs et attend l'arrêt des arbres de processus en cours.
+
+        Les builds tournent dans leur propre session: ni la fermeture de la
+        fenêtre ni Ctrl+C ne les atteignent, il faut les arrêter explicitement.
+        """
+        with self.lock:
+            jobs = [job for job in self.jobs if not job.done]
+            for job in jobs:
+                job.cancel_event.set()
+                if job.status == 'pending':
+                    job.status = 'cancelled'
+                    job.finished = time.monotonic()
+            processes = [job.process for job in jobs if job.process is not None]
+        threads = [threading.Thread(target=kill_process_tree, args=(process, log), daemon=True)
+                   for process in processes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._notify(jobs)
+        return len(jobs)
+
+    def move(self, job_id, offset):
+        """Déplace un job en attente d'un cran parmi les jobs en attente (offset -1 ou +1)"""
+        with self.lock:
+            job = self.get(job_id)
+            if job is None or job.status != 'pending':
+                return False
+            pending = [index for index, other in enumerate(self.jobs) if other.status == 'pending']
+            position = pending.index(self.jobs.index(job)) + offset
+            if not 0 <= position < len(pending):
+                return False
+            a, b = self.jobs.index(job), pending[position]
+            self.jobs[a], self.jobs[b] = self.jobs[b], self.jobs[a]
+        self._notify([job])
+        return True
+
+    def clear_finished(self):
+        """Retire de la file les jobs terminés"""
+        with self.lock:
+            self.jobs = [job for job in self.jobs if not job.done]
+        self._notify([])
+
+    def _notify(self, jobs):
+        for job in jobs or [None]:
+            self.on_change(job)
+
+
+def _pake_candidate_dirs():
+    """Construit l'index ordonné et dédoublonné des dossiers où Pake peut être installé"""
+    dirs = os.environ.get('PATH', '').split(os.pathsep)
+
+    # Dossiers globaux npm déduits sans lancer npm
+    if os.environ.get('NPM_CONFIG_PREFIX'):
+        prefix = os.environ['NPM_CONFIG_PREFIX']
+        dirs += [prefix, os.path.join(prefix, 'bin')]
+    node_path = shutil.which('node')
+    if node_path:
+        dirs.append(os.path.dirname(os.path.realpath(node_path)))
+    dirs.append(os.path.expanduser(os.path.join('~', '.npm-global', 'bin')))
+    if sys.platform == 'win32':
+        appdata = os.environ.get('APPDATA') or os.path.expanduser('~\\AppData\\Roaming')
+        dirs += [
+            os.path.join(appdata, 'npm'),
+            'C:\\Program Files\\nodejs',
+            'C:\\Program Files (x86)\\nodejs',
+        ]
+
+    index, seen = [], set()
+    for directory in dirs:
+        directory = directory.strip()
+        key = os.path.normcase(os.path.abspath(directory)) if directory else None
+        if key and key not in seen:
+            seen.add(key)
+            index.append(directory)
+    return index
+
+
+def _scan_pake_dirs(dirs):
+    """Liste chaque dossier une seule fois et retourne le premier exécutable Pake trouvé"""
+    for directory in dirs:
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name.lower(): entry.path for entry in entries if entry.is_file()}
+        except OSError:
+            continue
+        for exe_name in PAKE_EXECUTABLE_NAMES:
+            if exe_name in names:
+                return names[exe_name]
+    return None
+
+
+def _npm_global_pake_dirs(log):
+    """Dernier recours: interroge npm pour connaître son dossier global (lent)"""
+    try:
+        result = subprocess.run(['npm', 'root', '-g'], capture_output=True, text=True, timeout=10,
+                                shell=sys.platform == 'win32')
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        log("⚠️ npm non trouvé ou timeout")
+        return []
+    if result.returncode != 0:
+        return []
+    npm_global = result.stdout.strip()
+    log(f"📂 Dossier npm global: {npm_global}")
+    prefix = os.path.dirname(npm_global)
+    return [
+        os.path.join(npm_global, '.bin'),
+        prefix,  # Windows: <prefix>\node_modules
+        os.path.join(os.path.dirname(prefix), 'bin'),  # Unix: <prefix>/lib/node_modules
+    ]
+
+
+@traced('find_pake_executable')
+def resolve_pake_executable(log=None, use_cache=True):
+    """Résout l'exécutable Pake et retourne {'path', 'version', 'mtime'}, ou None.
+
+    La résolution est mémorisée dans pake_gui_config.json et réutilisée tant
+    que le binaire existe avec la même date de modification.
+    """
+    log = log or console_log
+    with trace_span('pake probe: cache'):
+        cached = read_config_file().get('pake_executable')
+        fresh = (use_cache and isinstance(cached, dict) and cached.get('path')
+                 and _binary_mtime(cached['path']) == cached.get('mtime'))
+    if fresh:
+        log(f"⚡ Pake (cache): {cached['path']}")
+        return cached
+
+    log("🔍 Recherche de l'exécutable Pake...")
+    with trace_span('pake probe: PATH et dossiers connus'):
+        pake_path = _scan_pake_dirs(_pake_candidate_dirs())
+    if not pake_path:
+        with trace_span('pake probe: npm prefix -g'):
+            pake_path = _scan_pake_dirs(_npm_global_pake_dirs(log))
+    if not pake_path:
+        log("❌ Pake non trouvé sur le système")
+        return None
+    log(f"✅ Pake trouvé: {pake_path}")
+
+    with trace_span('pake probe: --version', path=pake_path):
+        probe = _run_version_command(pake_path, 10)
+    entry = {'path': pake_path, 'version': probe.get('version'), 'mtime': _binary_mtime(pake_path)}
+    if probe['status'] == 'ok':
+        update_config_file('pake_executable', entry)
+    else:
+        entry.update(error=probe.get('error'), returncode=probe.get('returncode'))
+    return entry
+
+
+def find_pake_executable(log=None, use_cache=True):
+    """Trouve l'exécutable Pake sur le système avec détection avancée"""
+    entry = resolve_pake_executable(log=log, use_cache=use_cache)
+    return entry['path'] if entry else None
+
+
+def parse_version(text):
+    """Extrait un tuple de version (majeur, mineur, correctif) d'une sortie --version"""
+    match = re.search(r'(\d+)\.(\d+)(?:\.(\d+))?', text or '')
+    if not match:
+        return None
+    return tuple(int(part or 0) for part in match.groups())
+
+
+def _binary_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except (OSError, TypeError):
+        return None
+
+
+def _run_version_command(path, timeout):
+    """Exécute `path --version` et retourne le résultat de la sonde"""
+    try:
+        result = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=timeout)
+    except (FileNotFoundError, PermissionError):
+        return {'status': 'missing', 'path': path}
+    except subprocess.TimeoutExpired:
+        return {'status': 'failed', 'path': path, 'error': f"timeout après {timeout}s"}
+    if result.returncode != 0:
+        return {'status': 'failed', 'path': path, 'error': (result.stderr or '').strip(),
+                'returncode': result.returncode}
+    return {'status': 'ok', 'path': path, 'version': result.stdout.strip()}
+
+
+def _probe_tool(tool, path):
+    """Sonde un outil de la chaîne de compilation et vérifie sa version minimale"""
+    label, timeout = TOOLCHAIN_TOOLS[tool]
+    if not path:
+        return dict(label=label, status='missing', path=None)
+    with trace_span(f"probe {tool}", path=path):
+        probe = dict(_run_version_command(path, timeout), label=label)
+    minimum = MIN_TOOL_VERSIONS.get(tool)
+    version = parse_version(probe.get('version'))
+    if probe['status'] == 'ok' and minimum and version and version < minimum:
+        probe['status'] = 'too_old'
+        probe['minimum'] = '.'.join(map(str, minimum))
+    return probe
+
+
+def _read_toolchain_cache(which):
+    """Retourne les résultats en cache s'ils correspondent encore au PATH et aux binaires"""
+    try:
+        with open(TOOLCHAIN_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get('PATH') != os.environ.get('PATH', '') or cache.get('which') != which:
+        return None
+    for path, mtime in cache.get('mtimes', {}).items():
+        if _binary_mtime(path) != mtime:
+            return None
+    return cache.get('results')
+
+
+def _write_toolchain_cache(which, results):
+    paths = set(p for p in which.values() if p) | set(r['path'] for r in results.values() if r.get('path'))
+    cache = {
+        'PATH': os.environ.get('PATH', ''),
+        'which': which,
+        'mtimes': {path: _binary_mtime(path) for path in paths},
+        'results': results,
+    }
+    try:
+        TOOLCHAIN_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = TOOLCHAIN_CACHE_FILE.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, TOOLCHAIN_CACHE_FILE)
+    except OSError:
+        pass
+
+
+@traced('probe_toolchain')
+def probe_toolchain(log=None, use_cache=True):
+    """Sonde Node.js, npm, Rust et Pake en parallèle.
+
+    Les résultats sont mis en cache, indexés par le PATH et la date de
+    modification des binaires résolus: un démarrage à chaud ne lance aucun
+    sous-processus. Un Pake absent est toujours recherché à nouveau: il peut
+    avoir été installé dans un dossier hors du PATH.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    log = log or console_log
+    which = {tool: shutil.which(tool) for tool in list(TOOLCHAIN_TOOLS) + ['pake']}
+
+    def probe_pake():
+        entry = resolve_pake_executable(log=log, use_cache=use_cache)
+        if not entry:
+            return {'label': 'Pake', 'status': 'missing', 'path': None}
+        if not entry.get('version'):
+            return {'label': 'Pake', 'status': 'failed', 'path': entry['path'],
+                    'error': entry.get('error'), 'returncode': entry.get('returncode')}
+        return {'label': 'Pake', 'status': 'ok', 'path': entry['path'], 'version': entry['version']}
+
+    if use_cache:
+        results = _read_toolchain_cache(which)
+        if results and results['pake']['status'] != 'missing':
+            log("⚡ Prérequis lus depuis le cache (aucun changement détecté)")
+            return results
+        if results:
+            results['pake'] = probe_pake()
+            if results['pake']['status'] == 'ok':
+                _write_toolchain_cache(which, results)
+            return results
+
+    with ThreadPoolExecutor(max_workers=len(TOOLCHAIN_TOOLS) + 1) as executor:
+        futures = {tool: executor.submit(_probe_tool, tool, which[tool]) for tool in TOOLCHAIN_TOOLS}
+        futures['pake'] = executor.submit(probe_pake)
+        results = {tool: future.result() for tool, future in futures.items()}
+
+    # Ne pas mémoriser un échec transitoire (timeout, erreur d'exécution)
+    if not any(result['status'] == 'failed' for result in results.values()):
+        _write_toolchain_cache(which, results)
+    return results
+
+
+def report_toolchain(results, log=None):
+    """Journalise le résultat des sondes et retourne True si tous les prérequis sont satisfaits"""
+    log = log or console_log
+    all_ok = True
+    for tool, result in results.items():
+        label, status = result['label'], result['status']
+        if status == 'ok':
+            log(f"✅ {label} installé: {result['version']}")
+            if tool == 'pake':
+                log(f"📍 Chemin utilisé: {result['path']}")
+            continue
+        all_ok = False
+        if status == 'too_old':
+            log(f"❌ {label} trop ancien: {result['version']} (minimum requis: {result['minimum']})")
+            log(f"💡 Mettez à jour {label} avant de lancer un build")
+        elif status == 'failed':
+            code = f" (code: {result['returncode']})" if 'returncode' in result else ""
+            log(f"❌ {label}: commande échouée{code}")
+            if result.get('error'):
+                log(f"❌ Erreur: {result['error']}")
+        elif tool == 'pake':
+            log("❌ Pake non installé ou non trouvé")
+            log("💡 Installez Pake avec: npm install -g pake-cli")
+            log("💡 Ou redémarrez ce programme après installation")
+            log("💡 Assurez-vous que le PATH npm global est configuré")
+        else:
+            log(f"❌ {label} non installé ou non accessible")
+            if tool in TOOLCHAIN_INSTALL_HINTS:
+                log(f"💡 Installez {label} depuis: {TOOLCHAIN_INSTALL_HINTS[tool]}")
+    return all_ok
+
+
+def create_http_session(max_connections_per_host=HTTP_MAX_CONNECTIONS_PER_HOST, retries=HTTP_RETRIES,
+                        backoff_factor=HTTP_BACKOFF_FACTOR):
+    """Crée une session HTTP keep-alive avec pool de connexions par hôte et retries"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        read=0,  # Ne pas relancer une lecture déjà commencée (téléchargements en streaming)
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        raise_on_status=False,
+    )
+    # pool_block: au-delà de la limite par hôte, les requêtes attendent une connexion libre
+    adapter = HTTPAdapter(pool_connections=HTTP_MAX_HOSTS, pool_maxsize=max_connections_per_host,
+                          pool_block=True, max_retries=retry)
+    session = requests.Session()
+    session.headers['User-Agent'] = HTTP_USER_AGENT
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Retourne la session HTTP partagée par toutes les requêtes réseau"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = create_http_session()
+        return _http_session
+
+
+class FaviconCache:
+    """Cache persistant des favicons indexé par domaine, avec éviction LRU"""
+
+    def __init__(self, directory=FAVICON_DIR, max_age=FAVICON_CACHE_MAX_AGE,
+                 negative_ttl=FAVICON_NEGATIVE_TTL, max_bytes=FAVICON_CACHE_MAX_BYTES,
+                 max_negative=FAVICON_NEGATIVE_MAX_ENTRIES):
+        self.directory = Path(directory)
+        self.index_file = self.directory / "favicon_index.json"
+        self.max_age = max_age
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.max_negative = max_negative
+        self._lock = threading.Lock()
+        self._index = None
+        self._dirty_since = None  # last_used modifiés mais pas encore écrits
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Crée le cache à partir des réglages de pake_gui_config.json"""
+        return cls(
+            max_age=float(settings.get('favicon_cache_max_age_days', FAVICON_CACHE_MAX_AGE / 86400)) * 86400,
+            negative_ttl=float(settings.get('favicon_negative_ttl_hours', FAVICON_NEGATIVE_TTL / 3600)) * 3600,
+            max_bytes=int(float(settings.get('favicon_cache_max_mb', FAVICON_CACHE_MAX_BYTES / 1024 ** 2)) * 1024 ** 2),
+        )
+
+    def _load(self):
+        if self._index is None:
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save(self):
+        # Écriture atomique: un crash ne laisse jamais un index tronqué
+        self._dirty_since = None
+        self.directory.mkdir(exist_ok=True)
+        tmp_file = self.index_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
+
+    def lookup(self, domain):
+        """Retourne l'entrée du domaine, ou None si absente, expirée ou si le fichier a disparu"""
+        with self._lock:
+            entry = self._load().get(domain)
+            if not entry:
+                return None
+            now = time.time()
+            if entry.get('missing_until'):
+                if entry['missing_until'] > now:
+                    return dict(entry)
+            elif (self.directory / entry['file']).exists():
+                # last_used n'est écrit qu'avec la prochaine modification, au plus tard
+                # après FAVICON_FLUSH_INTERVAL ou à la sortie (flush)
+                entry['last_used'] = now
+                if self._dirty_since is None:
+                    self._dirty_since = now
+                elif now - self._dirty_since >= FAVICON_FLUSH_INTERVAL:
+                    self._save()
+                return dict(entry, path=str((self.directory / entry['file']).absolute()),
+                            fresh=now - entry['fetched_at'] < self.max_age)
+            del self._index[domain]
+            self._save()
+            return None
+
+    def touch(self, domain):
+        """Marque une entrée comme revalidée (réponse 304)"""
+        with self._lock:
+            entry = self._load().get(domain)
+            if entry:
+                entry['fetched_at'] = entry['last_used'] = time.time()
+                self._save()
+
+    def store(self, domain, favicon):
+        """Enregistre un favicon téléchargé et retourne son chemin absolu"""
+        favicon_path = self.directory / f"{domain.replace(':', '_')}_favicon{favicon['ext']}"
+        with self._lock:
+            self.directory.mkdir(exist_ok=True)
+            favicon_path.write_bytes(favicon['content'])
+            now = time.time()
+            self._load()[domain] = {
+                'file': favicon_path.name,
+                'source_url': favicon['url'],
+                'etag': favicon.get('etag'),
+                'last_modified': favicon.get('last_modified'),
+                'size': len(favicon['content']),
+                'fetched_at': now,
+                'last_used': now,
+            }
+            self._evict(keep=domain)
+            self._save()
+        return str(favicon_path.absolute())
+
+    def store_missing(self, domain):
+        """Mémorise qu'un domaine n'a pas de favicon pendant negative_ttl secondes"""
+        with self._lock:
+            self._load()[domain] = {'missing_until': time.time() + self.negative_ttl}
+            self._evict(keep=domain)
+            self._save()
+
+    def flush(self):
+        """Écrit les last_used en attente (appelé à la sortie du programme)"""
+        with self._lock:
+            if self._dirty_since is not None:
+                self._save()
+
+    def _evict(self, keep=None):
+        """Supprime les entrées négatives expirées ou en surnombre (max_negative), puis
+        les entrées les moins récemment utilisées au-delà de max_bytes"""
+        now = time.time()
+        entries = self._index
+        for domain in [d for d, e in entries.items() if e.get('missing_until', now + 1) <= now]:
+            del entries[domain]
+        negative = sorted((e['missing_until'], d) for d, e in entries.items() if 'missing_until' in e)
+        excess = len(negative) - self.max_negative
+        for _, domain in negative:
+            if excess <= 0:
+                break
+            if domain != keep:
+                del entries[domain]
+                excess -= 1
+        total = sum(e.get('size', 0) for e in entries.values())
+        for domain, entry in sorted(entries.items(), key=lambda item: item[1].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            if domain == keep or 'file' not in entry:
+                continue
+            try:
+                (self.directory / entry['file']).unlink()
+            except OSError:
+                pass
+            total -= entry.get('size', 0)
+            del entries[domain]
+
+
+_favicon_cache = None
+
+
+def get_favicon_cache():
+    """Retourne le cache de favicons partagé, configuré depuis pake_gui_config.json"""
+    global _favicon_cache
+    if _favicon_cache is None:
+        import atexit
+
+        _favicon_cache = FaviconCache.from_settings(read_config_file())
+        atexit.register(_favicon_cache.flush)
+    return _favicon_cache
+
+
+def read_config_file(config_file=CONFIG_FILE):
+    """Lit pake_gui_config.json et retourne un dictionnaire (vide si absent ou invalide)"""
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return config if isinstance(config, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+_config_lock = threading.Lock()
+
+
+def write_config_file(config, config_file=CONFIG_FILE):
+    """Écrit pake_gui_config.json de façon atomique (fichier temporaire puis remplacement)"""
+    config_file = Path(config_file)
+    tmp_file = config_file.with_name(config_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, config_file)
+
+
+def update_config_file(key, value, config_file=CONFIG_FILE):
+    """Met à jour une seule clé de pake_gui_config.json en préservant les autres"""
+    with _config_lock:
+        config = read_config_file(config_file)
+        config[key] = value
+        try:
+            write_config_file(config, config_file)
+        except OSError:
+            pass
+
+
+def profile_domain(url):
+    """Domaine d'une URL de profil, sans « www. » (clé de recherche par domaine)"""
+    url = str(url or '').strip()
+    if url and not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return urlparse(url).netloc.lower().replace('www.', '')
+
+
+class ProfileStore:
+    """Profils d'applications (configurations du formulaire) dans une base SQLite.
+
+    Chaque enregistrement est une transaction indépendante: enregistrer un
+    profil ne réécrit pas les autres, et une interruption ne laisse jamais
+    de fichier à moitié écrit. Les profils sont indexés par nom et par domaine.
+    """
+
+    def __init__(self, path=PROFILES_DB):
+        import sqlite3
+
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        # Une seule connexion partagée entre threads, protégée par self.lock
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("""CREATE TABLE IF NOT EXISTS profiles (
+                name TEXT PRIMARY KEY COLLATE NOCASE,
+                domain TEXT NOT NULL,
+                config TEXT NOT NULL,
+                updated REAL NOT NULL,
+                last_used REAL
+            )""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS profiles_domain ON profiles (domain)")
+
+    def save(self, config, used=False):
+        """Enregistre (ou remplace) le profil portant le nom de config['name']"""
+        name = str(config.get('name') or '').strip()
+        if not name:
+            raise ValueError("nom d'application manquant")
+        now = time.time()
+        with self.lock, self.db:
+            previous = self.db.execute("SELECT last_used FROM profiles WHERE name = ?", (name,)).fetchone()
+            last_used = now if used else (previous['last_used'] if previous else None)
+            self.db.execute("INSERT OR REPLACE INTO profiles (name, domain, config, updated, last_used) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (name, profile_domain(config.get('url')), json.dumps(config, ensure_ascii=False),
+                             now, last_used))
+
+    def get(self, name):
+        """Retourne la configuration d'un profil, ou None"""
+        with self.lock:
+            row = self.db.execute("SELECT config FROM profiles WHERE name = ?", (name,)).fetchone()
+        return json.loads(row['config']) if row else None
+
+    def find_by_domain(self, domain):
+        """Retourne les noms des profils d'un domaine"""
+        with self.lock:
+            rows = self.db.execute("SELECT name FROM profiles WHERE domain = ? ORDER BY name",
+                                   (profile_domain(domain) or domain,)).fetchall()
+        return [row['name'] for row in rows]
+
+    def delete(self, name):
+        with self.lock, self.db:
+            return self.db.execute("DELETE FROM profiles WHERE name = ?", (name,)).rowcount > 0
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def search(self, text='', limit=PROFILES_SEARCH_LIMIT):
+        """Profils dont le nom ou le domaine contient text: [(nom, domaine)].
+
+        Les correspondances en début de nom ou de domaine passent en premier,
+        puis les profils les plus récemment utilisés.
+        """
+        text = text.strip().lower()
+        pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        prefix = pattern[1:]
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT name, domain FROM profiles "
+                "WHERE name LIKE :pattern ESCAPE '\\' OR domain LIKE :pattern ESCAPE '\\' "
+                "ORDER BY (name LIKE :prefix ESCAPE '\\' OR domain LIKE :prefix ESCAPE '\\') DESC, "
+                "last_used IS NULL, last_used DESC, name "
+                "LIMIT :limit",
+                {'pattern': pattern, 'prefix': prefix, 'limit': limit}).fetchall()
+        return [(row['name'], row['domain']) for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+_profile_store = None
+
+
+def get_profile_store():
+    """Retourne le magasin de profils partagé"""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore()
+    return _profile_store
+
+
+def normalize_search_text(text):
+    """Minuscules sans accents ni ponctuation, pour l'index de recherche des presets"""
+    import unicodedata
+
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+def _trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PresetCatalog:
+    """Catalogue de presets (un objet JSON par ligne) avec index de recherche préconstruit.
+
+    L'index (noms, domaines, positions des lignes, clés triées pour la
+    recherche par préfixe, trigrammes pour la recherche approximative) est
+    construit une fois puis mis en cache tant que le catalogue ne change pas.
+    Les entrées complètes sont lues à la demande dans le fichier projeté en
+    mémoire (mmap).
+    """
+
+    def __init__(self, path=PRESET_CATALOG, index_file=PRESET_INDEX_FILE):
+        self.path = Path(path)
+        self.index_file = Path(index_file)
+        self.index = None
+        self.name_trigrams = None  # Trigrammes de chaque nom, pour le score approximatif
+        self.map = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Charge l'index (en le reconstruisant si le catalogue a changé); idempotent"""
+        with self.lock:
+            if self.index is not None:
+                return self.index
+            stat = self.path.stat()
+            source = [stat.st_size, stat.st_mtime_ns]
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get('source') != source or index.get('version') != PRESET_INDEX_VERSION:
+                    index = None
+            except (OSError, ValueError):
+                index = None
+            if index is None:
+                index = self._build_index(source)
+                try:
+                    self.index_file.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_file = self.index_file.with_suffix('.tmp')
+                    with open(tmp_file, 'w', encoding='utf-8') as f:
+                        json.dump(index, f, ensure_ascii=False)
+                    os.replace(tmp_file, self.index_file)
+                except OSError:
+                    pass
+            index['domain_ids'] = {domain: i for i, domain in enumerate(index['domains'])}
+            self.name_trigrams = [_trigrams(name) for name in index['normalized']]
+            self.index = index
+            return index
+
+    def try_load(self):
+        """Index sans attendre (thread Tk): None si un autre thread est en train de le construire"""
+        if not self.lock.acquire(blocking=False):
+            return None
+        self.lock.release()
+        return self.load()
+
+    def _build_index(self, source):
+        names, normalized_names, domains, offsets, featured = [], [], [], [], []
+        keys = []  # (clé normalisée, identifiant): nom complet, chaque mot, domaine
+        trigrams = {}
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    name, url = str(entry['name']), str(entry['url'])
+                except (ValueError, KeyError, TypeError):
+                    offset += len(line)
+                    continue  # Ligne vide ou invalide
+                entry_id = len(names)
+                names.append(name)
+                domains.append(profile_domain(url))
+                offsets.append(offset)
+                if entry.get('featured'):
+                    featured.append(entry_id)
+                normalized = normalize_search_text(name)
+                normalized_names.append(normalized)
+                entry_keys = {normalized, normalize_search_text(domains[-1])}
+                entry_keys.update(normalized.split())
+                keys.extend((key, entry_id) for key in entry_keys if key)
+                for trigram in _trigrams(normalized):
+                    trigrams.setdefault(trigram, []).append(entry_id)
+                offset += len(line)
+        keys.sort()
+        return {'version': PRESET_INDEX_VERSION, 'source': source, 'names': names,
+                'normalized': normalized_names, 'domains': domains,
+                'offsets': offsets, 'featured': featured,
+                'keys': [key for key, _ in keys], 'key_ids': [entry_id for _, entry_id in keys],
+                'trigrams': trigrams}
+
+    def search(self, text, limit=PRESET_SEARCH_LIMIT):
+        """Identifiants des presets correspondant à text: préfixes d'abord, puis approximatifs"""
+        import bisect
+
+        index = self.load()
+        query = normalize_search_text(text)
+        if not query:
+            return []
+        results, seen = [], set()
+        keys, key_ids = index['keys'], index['key_ids']
+        position = bisect.bisect_left(keys, query)
+        while position < len(keys) and keys[position].startswith(query) and len(results) < limit:
+            entry_id = key_ids[position]
+            if entry_id not in seen:
+                seen.add(entry_id)
+                results.append(entry_id)
+            position += 1
+        if len(results) < limit and len(query) >= 3:
+            results.extend(self._fuzzy_search(index, query, seen, limit - len(results)))
+        return results
+
+    def _fuzzy_search(self, index, query, seen, limit):
+        """Recherche approximative par trigrammes (tolère fautes de frappe et inversions).
+
+        Les candidats viennent des trigrammes les plus rares de la requête
+        (listes courtes), puis sont classés par similarité de Jaccard: le
+        coût ne dépend pas de la taille du catalogue.
+        """
+        query_trigrams = [trigram for trigram in _trigrams(query) if trigram in index['trigrams']]
+        query_trigrams.sort(key=lambda trigram: len(index['trigrams'][trigram]))
+        rare = query_trigrams[:PRESET_FUZZY_TRIGRAMS]
+        hits = {}
+        for trigram in rare:
+            for entry_id in index['trigrams'][trigram][:PRESET_FUZZY_CANDIDATES]:
+                hits[entry_id] = hits.get(entry_id, 0) + 1
+        # Seuls les candidats partageant plusieurs trigrammes rares sont comparés en détail
+        needed = min(2, len(rare))
+        candidates = [entry_id for entry_id, count in hits.items() if count >= needed and entry_id not in seen]
+        query_set = _trigrams(query)
+        scored = []
+        for entry_id in candidates:
+            name_set = self.name_trigrams[entry_id]
+            score = len(query_set & name_set) / len(query_set | name_set)
+            if score >= PRESET_FUZZY_MIN_SCORE:
+                scored.append((-score, index['names'][entry_id], entry_id))
+        scored.sort()
+        return [entry_id for _, _, entry_id in scored[:limit]]
+
+    def featured(self):
+        """Identifiants des presets mis en avant (boutons de l'interface), dans l'ordre du catalogue"""
+        return list(self.load()['featured'])
+
+    def name(self, entry_id):
+        return self.load()['names'][entry_id]
+
+    def domain(self, entry_id):
+        return self.load()['domains'][entry_id]
+
+    def find_domain(self, url):
+        """Identifiant du preset d'un domaine, ou None"""
+        return self.load()['domain_ids'].get(profile_domain(url))
+
+    def entry(self, entry_id):
+        """Entrée complète d'un preset, lue dans le catalogue projeté en mémoire"""
+        import mmap
+
+        index = self.load()
+        with self.lock:
+            if self.map is None:
+                with open(self.path, 'rb') as f:
+                    self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            start = index['offsets'][entry_id]
+            end = self.map.find(b'\n', start)
+            return json.loads(self.map[start:end if end != -1 else len(self.map)])
+
+    def icon_path(self, entry):
+        """Icône préchargée d'un preset (favicon_sha256) si présente et intègre, sinon None"""
+        digest = entry.get('favicon_sha256')
+        if not digest:
+            return None
+        path = self.path.parent / PRESET_ICON_DIRNAME / f"{digest}.png"
+        if path.exists() and file_sha256(path) == digest:
+            return str(path)
+        return None
+
+
+_preset_catalog = None
+
+
+def get_preset_catalog():
+    """Retourne le catalogue de presets (pake_gui_config.json: preset_catalog pour un autre fichier)"""
+    global _preset_catalog
+    if _preset_catalog is None:
+        _preset_catalog = PresetCatalog(read_config_file().get('preset_catalog') or PRESET_CATALOG)
+    return _preset_catalog
+
+
+def prefetch_preset_icons(catalog_path=None, log=None):
+    """Télécharge le favicon des presets qui n'en ont pas et l'inscrit dans le catalogue.
+
+    Les icônes sont rangées par empreinte dans presets/icons/; choisir ensuite
+    un de ces presets ne demande plus aucun accès réseau.
+    """
+    log = log or console_log
+    catalog_path = Path(catalog_path or PRESET_CATALOG)
+    icon_dir = catalog_path.parent / PRESET_ICON_DIRNAME
+    icon_dir.mkdir(parents=True, exist_ok=True)
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    added = 0
+    for i, line in enumerate(lines):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        digest = entry.get('favicon_sha256')
+        if digest and (icon_dir / f"{digest}.png").exists():
+            continue
+        favicon_path = download_favicon(entry['url'], log=log)
+        if not favicon_path or not favicon_path.endswith('.png'):
+            continue
+        digest = file_sha256(favicon_path)
+        shutil.copyfile(favicon_path, icon_dir / f"{digest}.png")
+        entry['favicon_sha256'] = digest
+        lines[i] = json.dumps(entry, ensure_ascii=False) + "\n"
+        added += 1
+    tmp_path = catalog_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    os.replace(tmp_path, catalog_path)
+    log(f"✅ {added} icône(s) de preset ajoutée(s) au catalogue")
+    return 0
+
+
+def _favicon_extension(content_type):
+    """Détermine l'extension du fichier selon le Content-Type"""
+    content_type = (content_type or '').lower()
+    if 'png' in content_type:
+        return '.png'
+    elif 'svg' in content_type:
+        return '.svg'
+    elif 'jpeg' in content_type or 'jpg' in content_type:
+        return '.jpg'
+    elif 'gif' in content_type:
+        return '.gif'
+    return '.ico'
+
+
+class _IconLinkParser(HTMLParser):
+    """Parseur HTML incrémental qui collecte les icônes <link> jusqu'à la fin du <head>"""
+
+    ICON_RELS = {'icon', 'apple-touch-icon', 'apple-touch-icon-precomposed'}
+
+    def __init__(self, page_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = page_url
+        self.links = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = {name: value or '' for name, value in attrs}
+        if tag == 'base' and attrs.get('href'):
+            self.base_url = urljoin(self.base_url, attrs['href'])
+        elif tag == 'link' and attrs.get('href'):
+            rels = set(attrs.get('rel', '').lower().split())
+            if rels & self.ICON_RELS:
+                self.links.append({
+                    'url': urljoin(self.base_url, attrs['href'].strip()),
+                    'rel': ' '.join(sorted(rels)),
+                    'sizes': attrs.get('sizes', '').lower(),
+                    'type': attrs.get('type', '').lower(),
+                })
+        elif tag == 'body':
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.done = True
+
+
+def _declared_icon_size(link):
+    """Retourne la plus grande dimension déclarée par l'attribut sizes (0 si inconnue)"""
+    sizes = [int(w) for w, h in re.findall(r'(\d+)x(\d+)', link['sizes'])]
+    if sizes:
+        return max(sizes)
+    if 'apple-touch-icon' in link['rel']:
+        return 180  # Taille implicite des icônes iOS
+    return 0
+
+
+def _rank_icon_links(links):
+    """Trie les icônes déclarées: images matricielles d'abord, puis par taille décroissante"""
+    def sort_key(indexed_link):
+        index, link = indexed_link
+        is_svg = 'svg' in link['type'] or link['url'].lower().split('?')[0].endswith('.svg')
+        return (is_svg, -_declared_icon_size(link), index)
+    return [link for _, link in sorted(enumerate(links), key=sort_key)]
+
+
+def _discover_favicon_links(page_url, deadline):
+    """Lit la page HTML en streaming et retourne les icônes déclarées, classées par préférence.
+
+    La lecture s'arrête à la fin du <head> ou après FAVICON_HEAD_MAX_BYTES octets.
+    Lève requests.HTTPError si la page ne répond pas 200.
+    """
+    import requests
+
+    timeout = min(FAVICON_TIMEOUT, max(0.1, deadline - time.monotonic()))
+    with trace_span('http page', 'http', url=page_url) as span, \
+            get_http_session().get(page_url, timeout=timeout, stream=True) as response:
+        span.set(status=response.status_code)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        parser = _IconLinkParser(response.url)
+        decoder = codecs.getincrementaldecoder(_html_encoding(response))(errors='replace')
+        received = 0
+        for chunk in response.iter_content(FAVICON_HEAD_CHUNK_SIZE):
+            received += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done or received >= FAVICON_HEAD_MAX_BYTES or time.monotonic() > deadline:
+                break
+    return _rank_icon_links(parser.links)
+
+
+def _html_encoding(response):
+    """Retourne l'encodage annoncé par le serveur, UTF-8 par défaut"""
+    # Sans charset explicite, requests suppose ISO-8859-1: préférer UTF-8
+    if 'charset' not in response.headers.get('content-type', '').lower():
+        return 'utf-8'
+    try:
+        return codecs.lookup(response.encoding).name
+    except (LookupError, TypeError):
+        return 'utf-8'
+
+
+def _fetch_favicon_candidate(favicon_url, cancel_event, deadline):
+    """Télécharge un candidat favicon et vérifie qu'il s'agit d'une image valide"""
+    import requests
+
+    timeout = min(FAVICON_TIMEOUT, max(0.1, deadline - time.monotonic()))
+    with trace_span('http favicon', 'http', url=favicon_url) as span, \
+            get_http_session().get(favicon_url, timeout=timeout, stream=True) as response:
+        span.set(status=response.status_code)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        return _read_favicon_response(response, favicon_url, cancel_event, deadline)
+
+
+def _read_favicon_response(response, favicon_url, cancel_event, deadline):
+    """Lit le corps d'une réponse 200 en streaming et vérifie qu'il s'agit d'une image valide"""
+    import requests
+    from PIL import Image
+
+    content = bytearray()
+    for chunk in response.iter_content(8192):
+        # Abandonner dès qu'un meilleur candidat a gagné ou que le délai est dépassé
+        if cancel_event.is_set():
+            raise requests.RequestException("annulé")
+        if time.monotonic() > deadline:
+            raise requests.Timeout("délai global dépassé")
+        content.extend(chunk)
+        if len(content) > FAVICON_MAX_BYTES:
+            raise ValueError("fichier trop volumineux")
+    headers = response.headers
+
+    if len(content) <= FAVICON_MIN_BYTES:
+        raise ValueError("contenu trop petit")
+    ext = _favicon_extension(headers.get('content-type'))
+    if ext != '.svg':  # SVG n'est pas supporté par PIL
+        with Image.open(io.BytesIO(content)) as img:
+            img.verify()
+    return {
+        'url': favicon_url,
+        'content': bytes(content),
+        'ext': ext,
+        'etag': headers.get('etag'),
+        'last_modified': headers.get('last-modified'),
+    }
+
+
+def _revalidate_favicon(entry, deadline):
+    """Revalide un favicon en cache par requête conditionnelle.
+
+    Retourne None si le favicon n'a pas changé (304), le nouveau favicon si
+    le serveur en renvoie un (lu depuis cette même réponse, sans second
+    téléchargement), ou lève une exception si l'entrée est invalide.
+    """
+    import requests
+
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    timeout = min(FAVICON_TIMEOUT, max(0.1, deadline - time.monotonic()))
+    with trace_span('http revalidate', 'http', url=entry['source_url']) as span, \
+            get_http_session().get(entry['source_url'], headers=headers, timeout=timeout,
+                                   stream=True) as response:
+        span.set(status=response.status_code)
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        return _read_favicon_response(response, entry['source_url'], threading.Event(), deadline)
+
+
+def _image_header_size(data):
+    """Dimensions (largeur, hauteur) lues dans l'en-tête d'une image, ou None s'il manque des octets.
+
+    Les fichiers ICO sont lus depuis leur répertoire d'images (plus grande
+    entrée); les autres formats via l'ouverture paresseuse de PIL, qui ne
+    décode pas les pixels.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    if data[:4] == b'\x00\x00\x01\x00':  # Répertoire ICO: 6 octets + 16 par image
+        if len(data) < 6:
+            return None
+        count = int.from_bytes(data[4:6], 'little')
+        if len(data) < 6 + 16 * count:
+            return None
+        sizes = [(data[6 + 16 * i] or 256, data[7 + 16 * i] or 256) for i in range(count)]
+        if not sizes:
+            raise ValueError("fichier ICO vide")
+        return max(sizes, key=lambda size: size[0] * size[1])
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return img.size
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError, EOFError):
+        return None  # En-tête incomplet (ou pas une image: décidé par l'appelant)
+
+
+def _probe_favicon_size(favicon_url, cancel_event, deadline):
+    """Lit seulement l'en-tête d'un candidat favicon pour connaître ses dimensions.
+
+    Demande les premiers octets (Range) et interrompt la lecture dès que les
+    dimensions sont connues. Si le fichier entier a été reçu, son contenu est
+    conservé pour éviter un second téléchargement.
+    """
+    import requests
+
+    timeout = min(FAVICON_TIMEOUT, max(0.1, deadline - time.monotonic()))
+    headers = {'Range': f"bytes=0-{FAVICON_PROBE_MAX_BYTES - 1}"}
+    with trace_span('http probe', 'http', url=favicon_url) as span, \
+            get_http_session().get(favicon_url, headers=headers, timeout=timeout, stream=True) as response:
+        span.set(status=response.status_code)
+        if response.status_code not in (200, 206):
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        ext = _favicon_extension(response.headers.get('content-type'))
+        total = response.headers.get('content-length')
+        if response.status_code == 206:
+            total = response.headers.get('content-range', '').rpartition('/')[2]
+        total = int(total) if total and total.isdigit() else None
+        data = bytearray()
+        size = None
+        for chunk in response.iter_content(FAVICON_PROBE_CHUNK_SIZE):
+            if cancel_event.is_set():
+                raise requests.RequestException("annulé")
+            if time.monotonic() > deadline:
+                raise requests.Timeout("délai global dépassé")
+            data.extend(chunk)
+            if ext == '.svg' or len(data) >= FAVICON_PROBE_MAX_BYTES:
+                break
+            size = _image_header_size(bytes(data))
+            if size:
+                break
+        complete = total is not None and len(data) >= total
+
+    if ext == '.svg':
+        size = (0, 0)  # Vectoriel: non redimensionnable par PIL, gardé en dernier recours
+    elif size is None:
+        size = _image_header_size(bytes(data))
+        if size is None:
+            raise ValueError("en-tête d'image illisible")
+    if complete and len(data) <= FAVICON_MIN_BYTES:
+        raise ValueError("contenu trop petit")
+    return {
+        'url': favicon_url,
+        'width': size[0],
+        'height': size[1],
+        'ext': ext,
+        'received': len(data),
+        'content': bytes(data) if complete else None,
+        'etag': response.headers.get('etag'),
+        'last_modified': response.headers.get('last-modified'),
+    }
+
+
+def _complete_favicon(probe, deadline):
+    """Retourne le favicon complet d'un candidat sondé (téléchargé seulement si nécessaire)"""
+    from PIL import Image
+
+    if probe['content'] is None:
+        return _fetch_favicon_candidate(probe['url'], threading.Event(), deadline)
+    if probe['ext'] != '.svg':
+        with Image.open(io.BytesIO(probe['content'])) as img:
+            img.verify()
+    return {key: probe[key] for key in ('url', 'content', 'ext', 'etag', 'last_modified')}
+
+
+def _is_definitive_miss(error):
+    """Vrai si l'échec d'un candidat est une réponse définitive (404/410, contenu qui n'est
+    pas une image) et non un incident réseau (refus de connexion, DNS, délai dépassé)"""
+    import requests
+
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in (404, 410)
+    return not isinstance(error, requests.RequestException)
+
+
+def _probe_favicon_candidates(page_url, base_url, log, deadline):
+    """Sonde l'en-tête de tous les candidats en parallèle et télécharge le plus grand favicon valide.
+
+    Retourne (favicon ou None, définitif): définitif est faux si un candidat a
+    échoué pour une raison réseau ou si le délai global a interrompu la recherche,
+    auquel cas l'absence de favicon ne doit pas être mise en cache.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    import requests
+
+    definitive = True
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=FAVICON_MAX_WORKERS)
+    futures = {}  # future -> (rang, url); à taille égale, un rang plus petit est prioritaire
+    probes = []  # (rang, en-tête sondé)
+
+    def submit(rank, favicon_url):
+        log(f"🔗 Tentative: {favicon_url}")
+        future = executor.submit(_probe_favicon_size, favicon_url, cancel_event, deadline)
+        futures[future] = (rank, favicon_url)
+        return future
+
+    # La page HTML déclare souvent les plus grandes icônes (apple-touch-icon, manifest...)
+    discovery = executor.submit(_discover_favicon_links, page_url, deadline)
+    futures[discovery] = (-1, page_url)
+    pending = {discovery}
+    pending.update(submit(FAVICON_WELL_KNOWN_RANK + i, urljoin(base_url, path))
+                   for i, path in enumerate(FAVICON_WELL_KNOWN_PATHS))
+    submitted = {futures[future][1] for future in pending}
+
+    try:
+        while pending:
+            if any(min(probe['width'], probe['height']) >= FAVICON_GOOD_ENOUGH_SIZE for _, probe in probes):
+                break  # Assez grand pour toutes les tailles d'icône: inutile d'attendre les autres
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                log("⏱️ Délai global de recherche du favicon dépassé")
+                definitive = False
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                rank, favicon_url = futures[future]
+                if future is discovery:
+                    try:
+                        links = future.result()
+                    except Exception as e:
+                        links = []
+                        definitive = definitive and _is_definitive_miss(e)
+                    for i, link in enumerate(links):
+                        if link['url'] not in submitted:
+                            submitted.add(link['url'])
+                            pending.add(submit(i, link['url']))
+                    continue
+                try:
+                    probe = future.result()
+                    probes.append((rank, probe))
+                    log(f"📐 {favicon_url}: " + (f"{probe['width']}x{probe['height']}"
+                                                if probe['width'] else "SVG"))
+                except requests.RequestException as e:
+                    log(f"⚠️ Échec {favicon_url}: {e}")
+                    definitive = definitive and _is_definitive_miss(e)
+                except Exception as e:
+                    log(f"⚠️ Erreur de validation image ({favicon_url}): {e}")
+    finally:
+        # Annuler les sondes restantes sans attendre leur fin
+        cancel_event.set()
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+    # Plus grande image matricielle d'abord, SVG en dernier recours
+    probes.sort(key=lambda item: (item[1]['ext'] == '.svg',
+                                  -min(item[1]['width'], item[1]['height']), item[0]))
+    received = sum(probe['received'] for _, probe in probes)
+    for _, probe in probes:
+        try:
+            favicon = _complete_favicon(probe, deadline)
+        except requests.RequestException as e:
+            log(f"⚠️ Échec {probe['url']}: {e}")
+            definitive = definitive and _is_definitive_miss(e)
+            continue
+        except Exception as e:
+            log(f"⚠️ Erreur de validation image ({probe['url']}): {e}")
+            continue
+        if probe['content'] is None:
+            received += len(favicon['content'])
+        log(f"🏆 Meilleur candidat: {probe['url']} ({probe['width']}x{probe['height']}, "
+            f"{received / 1024:.0f} Ko reçus au total)")
+        return favicon, True
+    return None, definitive
+
+
+@traced('download_favicon')
+def download_favicon(url, log=None, cache=None):
+    """Télécharge automatiquement le favicon d'un site web"""
+    log = log or console_log
+    if not FAVICON_SUPPORT:
+        log("❌ Téléchargement de favicon non disponible - modules manquants")
+        log("💡 Installez avec: pip install requests pillow")
+        return None
+
+    try:
+        log(f"🔍 Recherche du favicon pour {url}")
+
+        # Nettoyer et valider l'URL
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        parsed_url = urlparse(url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        domain = parsed_url.netloc.replace('www.', '')
+        deadline = time.monotonic() + FAVICON_DEADLINE
+
+        # Consulter le cache avant toute requête réseau
+        cache = cache or get_favicon_cache()
+        entry = cache.lookup(domain)
+        if entry and entry.get('missing_until'):
+            log(f"ℹ️ Aucun favicon connu pour {domain} (cache négatif)")
+            return None
+        if entry and entry['fresh']:
+            log(f"⚡ Favicon en cache: {entry['path']}")
+            return entry['path']
+        if entry:
+            try:
+                favicon = _revalidate_favicon(entry, deadline)
+                if favicon is None:
+                    cache.touch(domain)
+                    log(f"⚡ Favicon en cache revalidé: {entry['path']}")
+                    return entry['path']
+                return _store_favicon(cache, domain, favicon, log)
+            except Exception as e:
+                log(f"⚠️ Revalidation impossible ({e}), nouvelle recherche...")
+
+        # Sonder en parallèle la page HTML et les emplacements classiques
+        favicon, definitive = _probe_favicon_candidates(url, base_url, log, deadline)
+        if not favicon:
+            if definitive:
+                cache.store_missing(domain)
+                log("❌ Aucun favicon trouvé")
+            else:
+                log("❌ Aucun favicon trouvé (erreur réseau: nouvel essai au prochain build)")
+            return None
+        return _store_favicon(cache, domain, favicon, log)
+
+    except Exception as e:
+        log(f"❌ Erreur lors du téléchargement du favicon: {e}")
+        return None
+
+
+class FaviconPrefetcher:
+    """Résout les favicons en arrière-plan, avant même que le build soit demandé.
+
+    prefetch(url) lance la résolution (téléchargement puis préparation des
+    tailles d'icône) sans attendre; resolve(url) réutilise le résultat en
+    cours ou déjà obtenu pour cette URL. Les derniers résultats sont gardés
+    en mémoire (FAVICON_PREFETCH_MAX_URLS).
+    """
+
+    def __init__(self, log=None, max_workers=2):
+        from collections import OrderedDict
+
+        self.log = log or console_log
+        self.max_workers = max_workers
+        self.executor = None
+        self.futures = OrderedDict()  # URL normalisée -> Future du chemin de l'icône
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def normalize(url):
+        url = str(url or '').strip()
+        if url and not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        return url
+
+    def prefetch(self, url, log=None):
+        """Lance (si nécessaire) la résolution du favicon de url et retourne son Future"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        key = self.normalize(url)
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                self.futures.move_to_end(key)
+                return future
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix='favicon')
+            future = self.executor.submit(self._resolve, key, log or self.log)
+            self.futures[key] = future
+            while len(self.futures) > FAVICON_PREFETCH_MAX_URLS:
+                self.futures.popitem(last=False)
+            return future
+
+    def _resolve(self, url, log):
+        favicon_path = download_favicon(url, log=log)
+        if favicon_path and os.path.exists(favicon_path):
+            prepare_icon(favicon_path, log=log)  # Le build trouvera les tailles en cache
+        return favicon_path
+
+    def resolve(self, url, log=None):
+        """Chemin du favicon de url: attend la résolution en cours ou la lance"""
+        key = self.normalize(url)
+        future = self.prefetch(key, log)
+        try:
+            favicon_path = future.result(timeout=FAVICON_DEADLINE + FAVICON_TIMEOUT)
+        except Exception:
+            favicon_path = None
+        if not favicon_path:
+            with self.lock:  # Échec (réseau...): une prochaine demande réessaiera
+                if self.futures.get(key) is future:
+                    del self.futures[key]
+        return favicon_path
+
+
+def _store_favicon(cache, domain, favicon, log):
+    """Convertit le favicon en PNG si nécessaire et l'enregistre dans le cache"""
+    from PIL import Image
+
+    if favicon['ext'] not in ('.png', '.svg'):
+        buffer = io.BytesIO()
+        with Image.open(io.BytesIO(favicon['content'])) as img:
+            img.save(buffer, 'PNG')
+        favicon = dict(favicon, content=buffer.getvalue(), ext='.png')
+    favicon_path = cache.store(domain, favicon)
+    log(f"✅ Favicon téléchargé: {favicon_path} (depuis {favicon['url']})")
+    return favicon_path
+
+
+def _square_icon_source(img):
+    """Convertit la source en RGBA carré, centrée sur un fond transparent si besoin"""
+    from PIL import Image
+
+    img = img.convert('RGBA')
+    side = max(img.size)
+    if img.size != (side, side):
+        square = Image.new('RGBA', (side, side), (0, 0, 0, 0))
+        square.paste(img, ((side - img.width) // 2, (side - img.height) // 2))
+        img = square
+    return img
+
+
+@traced('prepare_icon')
+def prepare_icon(source_path, log=None, directory=ICON_DIR):
+    """Prépare le jeu complet d'icônes (16 à 1024 px) d'une image source, une seule fois.
+
+    La source est décodée une seule fois et redimensionnée dans ce processus;
+    les mêmes images servent aux PNG, au .ico (Windows) et au .icns (macOS),
+    sans second redimensionnement par Pillow. Le résultat est mis en
+    cache par empreinte du contenu source: un nouveau build ne redimensionne
+    plus rien. Retourne le fichier d'icône adapté à la plateforme, ou la
+    source elle-même si elle ne peut pas être traitée (SVG, Pillow absent).
+    """
+    log = log or console_log
+    if not FAVICON_SUPPORT or str(source_path).lower().endswith('.svg'):
+        return source_path
+    digest = file_sha256(source_path)[:16]
+    entry_dir = Path(directory) / digest
+    manifest_path = entry_dir / "manifest.json"
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if os.path.exists(manifest['icon']):
+            log(f"⚡ Icônes déjà préparées ({digest})")
+            return manifest['icon']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    from PIL import Image
+
+    start = time.monotonic()
+    tmp_dir = entry_dir.with_name(f"{digest}.tmp-{os.getpid()}-{threading.get_ident()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    try:
+        # Pillow décode par défaut la plus grande résolution d'un fichier ICO ou ICNS
+        with Image.open(source_path) as img:
+            source_size = img.size
+            square = _square_icon_source(img)
+        frames = {size: square.resize((size, size), Image.LANCZOS) for size in ICON_SIZES}
+        for size, frame in frames.items():
+            frame.save(tmp_dir / f"icon_{size}.png", 'PNG')
+
+        ico_sizes = [size for size in ICON_SIZES if size <= 256]
+        frames[max(ico_sizes)].save(tmp_dir / "icon.ico", sizes=[(size, size) for size in ico_sizes],
+                                    append_images=[frames[size] for size in ico_sizes])
+        try:
+            frames[max(ICON_SIZES)].save(tmp_dir / "icon.icns", append_images=list(frames.values()))
+        except (OSError, ValueError, KeyError):
+            pass  # Écriture ICNS non prise en charge par cette version de Pillow
+        if sys.platform == 'win32':
+            icon_name = "icon.ico"
+        elif sys.platform == 'darwin' and (tmp_dir / "icon.icns").exists():
+            icon_name = "icon.icns"
+        else:
+            icon_name = f"icon_{ICON_LINUX_SIZE}.png"
+        manifest = {'source': os.path.abspath(source_path), 'source_size': list(source_size),
+                    'icon': str((entry_dir / icon_name).absolute()), 'sizes': list(ICON_SIZES)}
+        with open(tmp_dir / "manifest.json", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)  # Préparé en parallèle par un autre build
+    except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        log(f"⚠️ Préparation des icônes impossible ({e}), icône utilisée telle quelle")
+        return source_path
+
+    if max(source_size) < ICON_LINUX_SIZE:
+        log(f"⚠️ Source {source_size[0]}x{source_size[1]}: les grandes tailles seront floues")
+    log(f"🖼️ {len(ICON_SIZES)} tailles d'icône générées en {time.monotonic() - start:.1f}s ({digest})")
+    return manifest['icon']
+
+
+class JobLog:
+    """Journal d'un job partagé entre son thread de build et les abonnés HTTP.
+
+    Le thread de build ne fait qu'ajouter la ligne sous verrou; chaque abonné
+    lit à son rythme depuis sa propre position. Un abonné lent ne ralentit donc
+    ni le build ni les autres abonnés: s'il prend trop de retard, il saute les
+    lignes sorties de la fenêtre (SERVICE_LOG_MAX_LINES).
+    """
+
+    def __init__(self, loop, max_lines=SERVICE_LOG_MAX_LINES):
+        self.loop = loop
+        self.max_lines = max_lines
+        self.lines = []
+        self.first = 0  # Position absolue de self.lines[0]
+        self.lock = threading.Lock()
+        self.event = None  # asyncio.Event des abonnés en attente (boucle asyncio uniquement)
+        self.wake_pending = False
+
+    def append(self, line):
+        """Ajoute une ligne (n'importe quel thread)"""
+        with self.lock:
+            self.lines.append(line)
+            if len(self.lines) >= 2 * self.max_lines:
+                self.first += len(self.lines) - self.max_lines
+                del self.lines[:len(self.lines) - self.max_lines]
+            if self.wake_pending:
+                return  # Un réveil est déjà programmé: il couvrira cette ligne
+            self.wake_pending = True
+        try:
+            self.loop.call_soon_threadsafe(self.wake)
+        except RuntimeError:
+            pass  # Boucle fermée (arrêt du service): plus personne à réveiller
+
+    def waiter(self):
+        """Événement déclenché à la prochaine ligne ou fin du job (boucle asyncio)"""
+        import asyncio
+
+        if self.event is None:
+            self.event = asyncio.Event()
+        return self.event
+
+    def wake(self):
+        """Réveille les abonnés en attente (boucle asyncio)"""
+        with self.lock:
+            self.wake_pending = False
+        event, self.event = self.event, None
+        if event is not None:
+            event.set()
+
+    def read(self, position):
+        """Retourne (lignes, position suivante, lignes sautées) à partir de position"""
+        with self.lock:
+            start = max(position, self.first)
+            lines = self.lines[start - self.first:]
+            return lines, start + len(lines), start - position
+
+    @property
+    def size(self):
+        with self.lock:
+            return self.first + len(self.lines)
+
+
+class BuildService:
+    """Service HTTP/JSON local (asyncio) pour piloter les builds sans l'interface.
+
+    POST   /jobs                      ajoute un job (configuration au format de save_config,
+                                      clé optionnelle "priority")
+    GET    /jobs                      liste des jobs
+    GET    /jobs/<id>                 état d'un job (phase, progression, ressources, résultat)
+    DELETE /jobs/<id>                 annule un job
+    GET    /jobs/<id>/log             sortie du build en flux (text/plain chunked, ou
+                                      Server-Sent Events si Accept: text/event-stream ou
+                                      ?format=sse; ?follow=0 pour ne lire que l'existant)
+    GET    /jobs/<id>/artifacts/<nom> téléchargement d'un installeur produit
+    GET    /health                    état du service
+
+    Les builds tournent dans une BuildQueue (threads); la boucle asyncio ne
+    fait que servir les requêtes et relayer les journaux.
+    """
+
+    def __init__(self, host=SERVICE_DEFAULT_HOST, port=SERVICE_DEFAULT_PORT, workers=None,
+                 output_dir=None, pake_executable=None, toolchain=None, use_build_cache=True, log=None,
+                 coordinator=None):
+        self.host = host
+        self.port = port
+        self.output_dir = Path(output_dir or BATCH_OUTPUT_DIR)
+        self.pake_executable = pake_executable
+        self.toolchain = toolchain or {}
+        self.use_build_cache = use_build_cache
+        self.log = log or console_log
+        self.coordinator = coordinator  # ClusterCoordinator: builds exécutés par les workers du cluster
+        if coordinator:
+            workers = workers or CLUSTER_MAX_JOBS
+        self.build_queue = BuildQueue(self.run_job, max_workers=workers, on_change=self.on_job_change)
+        self.favicon_prefetcher = FaviconPrefetcher(log=self.log)
+        self.logs = {}  # id du job -> JobLog
+        self.loop = None
+        self.server = None
+
+    async def start(self):
+        """Ouvre le port d'écoute; retourne le port effectif (utile avec port=0)"""
+        import asyncio
+
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        await self.start()
+        self.log(f"🌐 Service de build à l'écoute sur http://{self.host}:{self.port}/ "
+                 f"({self.build_queue.max_workers} build(s) en parallèle)")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def shutdown(self):
+        """Annule les jobs restants (arrête les arbres de processus en cours)"""
+        self.build_queue.shutdown(log=self.log)
+
+    # --- Jobs (threads de la file) ---
+
+    def job_log(self, job_id):
+        """Journal d'un job, créé au premier accès (thread de build ou abonné)"""
+        job_log = self.logs.get(job_id)
+        if job_log is None:
+            job_log = self.logs.setdefault(job_id, JobLog(self.loop))
+        return job_log
+
+    def run_job(self, job):
+        """Génère la commande puis exécute le build d'un job (thread de la file)"""
+        job_log = self.job_log(job.id)
+
+        def log(message):
+            job_log.append(message)
+
+        cwd = self.output_dir / job.name
+        cwd.mkdir(parents=True, exist_ok=True)
+        log("🚀 === Démarrage de la création ===")
+        job.cmd, error = build_pake_command(job.config, self.pake_executable, log=log,
+                                            favicon_resolver=self.favicon_prefetcher.resolve)
+        if error:
+            log(f"❌ {error}")
+            raise ValueError(error)
+        log(f"📝 Commande: {format_command(job.cmd)}")
+
+        def on_start(process):
+            job.process = process
+            if job.cancel_event.is_set():  # Annulé pendant le démarrage
+                threading.Thread(target=kill_process_tree, args=(process, log), daemon=True).start()
+
+        def on_progress(state):
+            job.progress = state
+
+        def on_sample(sample):
+            job.resources = sample
+
+        if self.coordinator:
+            builder, extra = self.coordinator.run_build, {'priority': job.priority}
+        else:
+            builder, extra = run_cached_build, {}
+        result = builder(job.cmd, self.toolchain, log=log, cwd=str(cwd),
+                         use_cache=self.use_build_cache and job.config.get('use_build_cache', True),
+                         should_stop=job.cancel_event.is_set, on_start=on_start,
+                         on_progress=on_progress, on_sample=on_sample, **extra)
+        log(f"🏁 Processus terminé avec le code: {result['returncode']}")
+        return result
+
+    def on_job_change(self, job):
+        """Relaie un changement d'état vers la boucle asyncio (n'importe quel thread)"""
+        if job is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(self.job_changed, job)
+
+    def job_changed(self, job):
+        job_log = self.logs.get(job.id)
+        if job_log is not None:
+            job_log.wake()  # Les abonnés d'un job terminé ferment leur flux
+        if job.done:
+            detail = f" ({job.error})" if job.error else ""
+            self.log(f"{JOB_STATUS_LABELS[job.status]} [{job.name}] en {format_duration(job.elapsed())}{detail}")
+
+    def job_info(self, job):
+        """Représentation JSON d'un job"""
+        info = {
+            'id': job.id,
+            'name': job.name,
+            'status': job.status,
+            'priority': job.priority,
+            'elapsed': round(job.elapsed(), 3),
+            'progress': job.progress,
+            'resources': job.resources,
+            'error': job.error,
+            'log_lines': self.job_log(job.id).size,
+        }
+        if job.result:
+            info['returncode'] = job.result['returncode']
+            info['cached'] = job.result.get('cached', False)
+            info['artifacts'] = [os.path.basename(path) for path in job.result.get('artifacts', [])]
+            info['phases'] = (job.result.get('record') or {}).get('phases')
+        return info
+
+    # --- HTTP (boucle asyncio) ---
+
+    async def handle(self, reader, writer):
+        """Traite une requête HTTP/1.1 (une requête par connexion)"""
+        import asyncio
+
+        try:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), SERVICE_REQUEST_TIMEOUT)
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                method, target, _ = request_line.split(' ', 2)
+                headers = {}
+                for line in header_lines:
+                    if ':' in line:
+                        key, value = line.split(':', 1)
+                        headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ValueError):
+                return
+            if length > SERVICE_MAX_BODY_BYTES:
+                await self.send_json(writer, 413, {'error': "Requête trop volumineuse"})
+                return
+            body = await reader.readexactly(length) if length else b''
+            await self.route(writer, method.upper(), target, headers, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client parti
+        except Exception as e:
+            self.log(f"❌ Service: erreur interne: {e}")
+            try:
+                await self.send_json(writer, 500, {'error': str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def route(self, writer, method, target, headers, body):
+        from urllib.parse import urlsplit, parse_qsl, unquote
+
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+
+        if parts == ['health'] and method == 'GET':
+            jobs = self.build_queue.jobs
+            await self.send_json(writer, 200, {
+                'status': 'ok',
+                'workers': self.build_queue.max_workers,
+                'pending': sum(1 for job in jobs if job.status == 'pending'),
+                'running': sum(1 for job in jobs if job.status == 'running'),
+                'pake': self.pake_executable,
+            })
+            return
+        if parts == ['jobs'] and method == 'GET':
+            await self.send_json(writer, 200, {'jobs': [self.job_info(job) for job in list(self.build_queue.jobs)]})
+            return
+        if parts == ['jobs'] and method == 'POST':
+            await self.create_job(writer, body)
+            return
+        if len(parts) < 2 or parts[0] != 'jobs' or not parts[1].isdigit():
+            await self.send_json(writer, 404, {'error': "Ressource inconnue"})
+            return
+        job = self.build_queue.get(int(parts[1]))
+        if job is None:
+            await self.send_json(writer, 404, {'error': f"Job {parts[1]} inconnu"})
+        elif len(parts) == 2 and method == 'GET':
+            await self.send_json(writer, 200, self.job_info(job))
+        elif len(parts) == 2 and method == 'DELETE':
+            cancelled = self.build_queue.cancel(job.id, log=self.job_log(job.id).append)
+            await self.send_json(writer, 200 if cancelled else 409, self.job_info(job))
+        elif parts[2:] == ['log'] and method == 'GET':
+            await self.stream_log(writer, job, query, headers)
+        elif len(parts) == 4 and parts[2] == 'artifacts' and method == 'GET':
+            await self.send_artifact(writer, job, parts[3])
+        else:
+            await self.send_json(writer, 404, {'error': "Ressource inconnue"})
+
+    async def create_job(self, writer, body):
+        try:
+            payload = json.loads(body.decode('utf-8') or '{}')
+            if not isinstance(payload, dict):
+                raise ValueError("objet JSON attendu")
+            priority = int(payload.get('priority', 0))
+        except (UnicodeDecodeError, ValueError, TypeError) as e:
+            await self.send_json(writer, 400, {'error': f"JSON invalide: {e}"})
+            return
+        config = {key: payload[key] for key in PROFILE_KEYS if key in payload}
+        if not str(config.get('url') or '').strip():
+            await self.send_json(writer, 400, {'error': "URL manquante"})
+            return
+        name = sanitize_app_name(str(config.get('name') or '').strip())
+        if any(job.name == name for job in self.build_queue.active()):
+            await self.send_json(writer, 409, {'error': f"« {name} » est déjà dans la file de builds"})
+            return
+        job = self.build_queue.submit(config, None, priority)
+        self.log(f"📋 [{job.name}] ajouté à la file (job {job.id}, priorité {priority})")
+        await self.send_json(writer, 202, self.job_info(job), {'Location': f"/jobs/{job.id}"})
+
+    async def stream_log(self, writer, job, query, headers):
+        """Diffuse la sortie d'un job jusqu'à sa fin (ou jusqu'à l'existant si follow=0)"""
+        import asyncio
+
+        job_log = self.job_log(job.id)
+        sse = query.get('format') == 'sse' or 'text/event-stream' in headers.get('accept', '')
+        follow = query.get('follow', '1') != '0'
+        try:
+            position = int(headers.get('last-event-id') or query.get('from') or 0)
+        except ValueError:
+            position = 0
+        content_type = 'text/event-stream; charset=utf-8' if sse else 'text/plain; charset=utf-8'
+        await self.send_head(writer, 200, {'Content-Type': content_type, 'Cache-Control': 'no-cache',
+                                           'Transfer-Encoding': 'chunked'})
+        while True:
+            event = job_log.waiter()
+            done = job.done
+            lines, position, skipped = job_log.read(position)
+            if skipped:
+                lines = [f"… {skipped} ligne(s) omise(s)"] + lines
+            if lines:
+                if sse:
+                    # id = position suivante: un client reconnecté reprend avec Last-Event-ID
+                    data = ''.join(f"data: {line}\n" for line in lines) + f"id: {position}\n\n"
+                else:
+                    data = '\n'.join(lines) + '\n'
+                await self.write_chunk(writer, data.encode('utf-8'))
+            elif done or not follow:
+                break
+            else:
+                try:
+                    await asyncio.wait_for(event.wait(), SERVICE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if sse:
+                        await self.write_chunk(writer, b': keepalive\n\n')
+        if sse:
+            info = json.dumps(self.job_info(job), ensure_ascii=False)
+            await self.write_chunk(writer, f"event: end\ndata: {info}\n\n".encode('utf-8'))
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    async def send_artifact(self, writer, job, name):
+        """Envoie un installeur produit par le job (lecture du fichier hors de la boucle)"""
+        artifacts = {os.path.basename(path): path for path in ((job.result or {}).get('artifacts') or [])}
+        path = artifacts.get(name)
+        if path is None or not os.path.isfile(path):
+            await self.send_json(writer, 404, {'error': f"Installeur {name} introuvable"})
+            return
+        loop = self.loop
+        with open(path, 'rb') as f:
+            await self.send_head(writer, 200, {
+                'Content-Type': 'application/octet-stream',
+                'Content-Length': str(os.fstat(f.fileno()).st_size),
+                'Content-Disposition': f'attachment; filename="{name}"',
+            })
+            while True:
+                data = await loop.run_in_executor(None, f.read, SERVICE_DOWNLOAD_CHUNK_SIZE)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+
+    async def send_head(self, writer, status, headers):
+        from http import HTTPStatus
+
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", "Connection: close"]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+    async def write_chunk(self, writer, data):
+        writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+        await writer.drain()
+
+    async def send_json(self, writer, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        await self.send_head(writer, status, dict(headers or {}, **{
+            'Content-Type': 'application/json; charset=utf-8', 'Content-Length': str(len(body))}))
+        writer.write(body)
+        await writer.drain()
+
+
+def run_service(address=None, workers=None, output_dir=None, pake_executable=None, use_build_cache=True,
+                coordinator=None):
+    """Lance le service HTTP de build jusqu'à Ctrl+C"""
+    import asyncio
+
+    try:
+        host, port = parse_address(address, SERVICE_DEFAULT_HOST, SERVICE_DEFAULT_PORT)
+    except ValueError:
+        console_log(f"❌ Adresse d'écoute invalide: {address} (attendu: [HÔTE:]PORT)")
+        return 2
+
+    toolchain = probe_toolchain(log=console_log)
+    if not report_toolchain(toolchain, log=console_log):
+        console_log("⚠️ === Certains prérequis manquent ou sont trop anciens ===")
+    if not pake_executable and not coordinator:
+        if toolchain['pake']['status'] != 'ok':
+            return 2
+        pake_executable = toolchain['pake']['path']
+    if host not in ('127.0.0.1', 'localhost', '::1'):
+        console_log(f"⚠️ Service exposé sur {host}: aucune authentification, réservez-le à un réseau de confiance")
+
+    service = BuildService(host, port, workers=workers, output_dir=output_dir, pake_executable=pake_executable,
+                           toolchain=toolchain, use_build_cache=use_build_cache, coordinator=coordinator)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        console_log("👋 Arrêt du service demandé")
+    except OSError as e:
+        console_log(f"❌ Impossible d'ouvrir {host}:{port}: {e}")
+        return 2
+    finally:
+        service.shutdown()
+    return 0
+
+
+def parse_address(address, default_host, default_port):
+    """Analyse « [HÔTE:]PORT » (ou « HÔTE: ») et retourne (hôte, port); ValueError si invalide"""
+    host, _, port = str(address or '').rpartition(':')
+    if not host and port and not port.isdigit():
+        host, port = port, ''  # « HÔTE » seul
+    return host or default_host, int(port or default_port)
+
+
+class BlobStore:
+    """Fichiers adressés par leur SHA-256 (icônes, installeurs) échangés dans le cluster.
+
+    Un blob déjà présent n'est jamais retransféré; au-delà de max_bytes les
+    blobs les moins récemment utilisés sont supprimés.
+    """
+
+    def __init__(self, directory=CLUSTER_BLOB_DIR, max_bytes=CLUSTER_BLOB_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def valid(sha):
+        """Vrai si sha est une empreinte SHA-256 hexadécimale (jamais un chemin venu du réseau)"""
+        return isinstance(sha, str) and re.fullmatch(r'[0-9a-f]{64}', sha) is not None
+
+    def path(self, sha):
+        if not self.valid(sha):
+            raise ValueError(f"empreinte de blob invalide: {str(sha)[:80]!r}")
+        return self.directory / sha[:2] / sha
+
+    def has(self, sha):
+        return self.valid(sha) and self.path(sha).exists()
+
+    def inventory(self):
+        """Empreintes des blobs présents"""
+        return [path.name for path in self.directory.glob('??/*') if len(path.name) == 64]
+
+    def add_file(self, source):
+        """Ajoute un fichier au magasin (lien physique si possible) et retourne son empreinte"""
+        sha = file_sha256(source)
+        target = self.path(sha)
+        if target.exists():
+            os.utime(target)
+            return sha
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{sha}.tmp-{os.getpid()}-{threading.get_ident()}")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, target)
+        self.prune()
+        return sha
+
+    async def receive(self, reader, sha, size):
+        """Lit size octets du flux dans le blob sha, en vérifiant l'empreinte"""
+        target = self.path(sha)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{sha}.tmp-{os.getpid()}-{id(reader)}")
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, 'wb') as f:
+                remaining = size
+                while remaining:
+                    data = await reader.readexactly(min(CLUSTER_CHUNK_SIZE, remaining))
+                    digest.update(data)
+                    f.write(data)
+                    remaining -= len(data)
+            if digest.hexdigest() != sha:
+                raise ValueError(f"empreinte du blob {sha[:12]} invalide")
+            os.replace(tmp_path, target)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        self.prune()
+
+    def materialize(self, sha, dest):
+        """Place le blob sha au chemin dest (lien physique, copie à défaut)"""
+        source = self.path(sha)
+        dest = Path(dest)
+        if dest.exists():
+            dest.unlink()
+        try:
+            os.link(source, dest)
+        except OSError:
+            shutil.copy2(source, dest)
+        os.utime(source)
+        return dest
+
+    def prune(self):
+        """Supprime les blobs les moins récemment utilisés au-delà de max_bytes"""
+        entries = []
+        for path in self.directory.glob('??/*'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+
+class ClusterConnection:
+    """Connexion coordinateur/worker: un message JSON par ligne, les octets d'un
+    blob suivant immédiatement son en-tête {"type": "blob", "sha", "size"}.
+
+    Tous les envois passent par une file vidée par une seule tâche: un blob
+    n'est jamais entrecoupé d'un autre message. Après une erreur d'écriture,
+    la connexion est fermée et send() retourne False.
+    """
+
+    def __init__(self, reader, writer, blobs, log=None):
+        import asyncio
+
+        self.reader = reader
+        self.writer = writer
+        self.blobs = blobs
+        self.log = log or console_log
+        self.closed = False
+        self.loop = asyncio.get_running_loop()
+        self.outbox = asyncio.Queue()
+        self.sender = self.loop.create_task(self._send_loop())
+
+    def send(self, message, blob=None):
+        """Programme l'envoi d'un message, suivi du contenu du fichier blob (boucle asyncio).
+
+        Retourne False si la connexion est fermée: le message ne partira jamais.
+        """
+        if self.closed:
+            return False
+        self.outbox.put_nowait((message, blob))
+        return True
+
+    def send_threadsafe(self, message):
+        """Programme l'envoi d'un message depuis un thread de build"""
+        if self.closed:
+            return False
+        try:
+            self.loop.call_soon_threadsafe(self.send, message)
+        except RuntimeError:
+            return False  # Boucle fermée: la connexion n'existe plus
+        return True
+
+    async def _send_loop(self):
+        try:
+            while True:
+                message, blob = await self.outbox.get()
+                if blob is not None:
+                    with open(blob, 'rb') as f:
+                        size = os.fstat(f.fileno()).st_size
+                        self.writer.write(json.dumps(dict(message, size=size)).encode('utf-8') + b'\n')
+                        for data in iter(lambda: f.read(CLUSTER_CHUNK_SIZE), b''):
+                            self.writer.write(data)
+                            await self.writer.drain()
+                else:
+                    self.writer.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+                await self.writer.drain()
+        except (OSError, ConnectionError) as e:
+            # Fermer le transport: la lecture en cours échoue aussi et la session est nettoyée
+            self.log(f"⚠️ Envoi impossible vers {self.writer.get_extra_info('peername')}: {e}")
+            self.closed = True
+            self.writer.close()
+
+    async def receive(self):
+        """Lit le message suivant; le contenu d'un blob est rangé dans le magasin"""
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("connexion fermée")
+        message = json.loads(line)
+        if message.get('type') == 'blob':
+            await self.blobs.receive(self.reader, message['sha'], int(message['size']))
+        return message
+
+    def close(self):
+        self.closed = True
+        self.sender.cancel()
+        self.writer.close()
+
+
+class RemoteWorker:
+    """Worker connecté au coordinateur: capacité, charge déclarée, blobs détenus"""
+
+    def __init__(self, worker_id, connection, hello):
+        self.id = worker_id
+        self.connection = connection
+        self.name = str(hello.get('name') or f"worker-{worker_id}")
+        self.capacity = max(1, int(hello.get('capacity') or 1))
+        self.platform = hello.get('platform')
+        self.blobs = set(hello.get('blobs') or [])
+        self.load = {}  # Dernier relevé {'loadavg', 'cpus', 'memory'}
+        self.builds = {}  # id du build -> RemoteBuild
+        self.blob_waiters = {}  # empreinte -> Future de la réception du blob
+
+    def score(self, icon_sha=None):
+        """Coût d'un build de plus sur ce worker (plus bas = préféré)"""
+        score = len(self.builds) / self.capacity
+        loadavg, cpus = self.load.get('loadavg'), self.load.get('cpus') or 1
+        if loadavg is not None:
+            score += 0.5 * min(loadavg / cpus, 2.0)  # Machine chargée par ailleurs
+        memory = self.load.get('memory')
+        if memory is not None and memory < MEMORY_PER_BUILD:
+            score += 1.0
+        if icon_sha and icon_sha not in self.blobs:
+            score += 0.01  # À charge égale, éviter un transfert
+        return score
+
+
+class RemoteBuild:
+    """Build confié à un worker: relais du journal et résultat attendu"""
+
+    def __init__(self, build_id, loop, log, on_progress=None, on_sample=None):
+        self.id = build_id
+        self.log = log
+        self.on_progress = on_progress
+        self.on_sample = on_sample
+        self.result = loop.create_future()  # Message « result », ou None si le worker est perdu
+
+
+class ClusterCoordinator:
+    """Répartit les builds sur des workers connectés en TCP (mode --coordinator).
+
+    run_build() a la même interface que run_cached_build: le mode batch et le
+    service l'utilisent à sa place. Chaque build va au worker libre le moins
+    chargé (builds en cours, charge système, mémoire libre); l'icône et les
+    installeurs circulent comme blobs adressés par leur contenu, jamais
+    transférés deux fois.
+    """
+
+    def __init__(self, host=SERVICE_DEFAULT_HOST, port=CLUSTER_DEFAULT_PORT, token=None, blobs=None, log=None,
+                 worker_timeout=CLUSTER_WORKER_TIMEOUT):
+        import itertools
+
+        self.host = host
+        self.port = port
+        self.token = token
+        self.worker_timeout = worker_timeout  # <= 0: attendre indéfiniment un worker
+        self.idle_since = time.monotonic()  # Depuis quand aucun worker n'est connecté
+        self.blobs = blobs or BlobStore()
+        self.log = log or console_log
+        self.workers = {}  # id -> RemoteWorker
+        self.pending = []  # [(-priorité, ordre, RemoteBuild, empreinte de l'icône, Future)] en attente
+        self.sequence = itertools.count(1)
+        self.loop = None
+        self.server = None
+
+    @classmethod
+    def from_settings(cls, settings, address=None, log=None):
+        """Crée le coordinateur à partir des réglages de pake_gui_config.json"""
+        host, port = parse_address(address, SERVICE_DEFAULT_HOST, CLUSTER_DEFAULT_PORT)
+        return cls(host, port, token=settings.get('cluster_token'), log=log,
+                   worker_timeout=float(settings.get('cluster_worker_timeout_seconds', CLUSTER_WORKER_TIMEOUT)))
+
+    def start(self):
+        """Démarre la boucle du coordinateur dans un thread; retourne le port d'écoute"""
+        import asyncio
+
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name='cluster', daemon=True).start()
+        self.port = asyncio.run_coroutine_threadsafe(self._listen(), self.loop).result()
+        self.log(f"🖧 Coordinateur à l'écoute des workers sur {self.host}:{self.port}")
+        return self.port
+
+    async def _listen(self):
+        import asyncio
+
+        self.server = await asyncio.start_server(self.handle_worker, self.host, self.port,
+                                                 limit=CLUSTER_MAX_MESSAGE_BYTES)
+        return self.server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def handle_worker(self, reader, writer):
+        """Session d'un worker: enregistrement, puis messages jusqu'à la déconnexion"""
+        import asyncio
+        import hmac
+
+        connection = ClusterConnection(reader, writer, self.blobs, log=self.log)
+        worker = None
+        try:
+            hello = await asyncio.wait_for(connection.receive(), CLUSTER_HELLO_TIMEOUT)
+            if hello.get('type') != 'hello' or hello.get('protocol') != CLUSTER_PROTOCOL_VERSION:
+                raise ValueError("protocole incompatible")
+            if self.token and not hmac.compare_digest(str(hello.get('token') or ''), str(self.token)):
+                raise ValueError("jeton du cluster invalide")
+            worker = RemoteWorker(next(self.sequence), connection, hello)
+            self.workers[worker.id] = worker
+            connection.send({'type': 'welcome', 'worker': worker.id})
+            self.log(f"🖧 Worker {worker.name} connecté ({worker.capacity} build(s), {worker.platform})")
+            self._schedule()
+            while True:
+                self._handle_message(worker, await connection.receive())
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            if worker is None:
+                self.log(f"⚠️ Worker refusé: {e or 'délai dépassé'}")
+        except ValueError as e:
+            self.log(f"⚠️ Worker {worker.name if worker else 'inconnu'} déconnecté: {e}")
+            if worker is None:
+                connection.send({'type': 'error', 'error': str(e)})
+                await asyncio.sleep(0.1)  # Laisser partir le message d'erreur
+        finally:
+            connection.close()
+            if worker is not None:
+                del self.workers[worker.id]
+                if not self.workers:
+                    self.idle_since = time.monotonic()
+                self.log(f"🖧 Worker {worker.name} déconnecté")
+                for build in worker.builds.values():
+                    if not build.result.done():
+                        build.result.set_result(None)
+                for waiter in worker.blob_waiters.values():
+                    if not waiter.done():
+                        waiter.set_exception(ConnectionError(f"worker {worker.name} perdu"))
+                self._schedule()
+
+    def _handle_message(self, worker, message):
+        kind = message.get('type')
+        build = worker.builds.get(message.get('job'))
+        if kind == 'load':
+            worker.load = message
+            self._schedule()
+        elif kind == 'log' and build:
+            build.log(message.get('line', ''))
+        elif kind == 'progress' and build and build.on_progress:
+            build.on_progress(message.get('state'))
+        elif kind == 'sample' and build and build.on_sample:
+            build.on_sample(message.get('sample'))
+        elif kind == 'result' and build and not build.result.done():
+            build.result.set_result(message)
+        elif kind in ('blob', 'missing'):
+            waiter = worker.blob_waiters.pop(message.get('sha'), None)
+            if waiter is not None and not waiter.done():
+                if kind == 'blob':
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(FileNotFoundError(f"blob {message.get('sha', '')[:12]} absent du worker"))
+
+    def _schedule(self):
+        """Attribue les builds en attente, par priorité, aux workers libres les moins chargés"""
+        while self.pending:
+            _, _, build, icon_sha, waiter = self.pending[0]
+            if waiter.done():  # Demande abandonnée
+                self.pending.pop(0)
+                continue
+            free = [worker for worker in self.workers.values() if len(worker.builds) < worker.capacity]
+            if not free:
+                return
+            self.pending.pop(0)
+            worker = min(free, key=lambda worker: worker.score(icon_sha))
+            worker.builds[build.id] = build  # Place réservée dès l'attribution
+            waiter.set_result(worker)
+
+    async def _acquire(self, build, priority, icon_sha, should_stop, log):
+        """Attend un worker libre pour build; None si le build est annulé entre-temps ou si
+        aucun worker n'est connecté depuis worker_timeout secondes"""
+        import asyncio
+
+        waiter = self.loop.create_future()
+        self.pending.append((-priority, next(self.sequence), build, icon_sha, waiter))
+        self.pending.sort(key=lambda entry: entry[:2])
+        self._schedule()
+        if not waiter.done():
+            log(f"⏳ En attente d'un worker libre ({len(self.workers)} connecté(s))")
+        while True:
+            try:
+                return await asyncio.wait_for(asyncio.shield(waiter), CLUSTER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                if should_stop() or self._workers_timed_out():
+                    waiter.cancel()
+                    return None
+
+    def _workers_timed_out(self):
+        return (not self.workers and self.worker_timeout > 0
+                and time.monotonic() - self.idle_since > self.worker_timeout)
+
+    def run_build(self, cmd, toolchain=None, log=None, cwd=None, use_cache=True, on_progress=None,
+                  should_stop=None, on_sample=None, priority=0, **kwargs):
+        """Exécute un build sur un worker du cluster (appel bloquant, depuis un thread de build)"""
+        import asyncio
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_build(cmd, log or console_log, cwd or os.getcwd(), use_cache, on_progress,
+                            should_stop or (lambda: False), on_sample, priority), self.loop)
+        return future.result()
+
+    async def _run_build(self, cmd, log, cwd, use_cache, on_progress, should_stop, on_sample, priority):
+        start = time.monotonic()
+        args = list(cmd[1:])  # L'exécutable Pake est celui du worker
+        icon = None
+        if '--icon' in args:
+            position = args.index('--icon') + 1
+            sha = await self.loop.run_in_executor(None, self.blobs.add_file, args[position])
+            icon = {'position': position, 'sha': sha, 'ext': os.path.splitext(args[position])[1]}
+        for attempt in range(1, CLUSTER_MAX_ATTEMPTS + 1):
+            build = RemoteBuild(next(self.sequence), self.loop, log, on_progress, on_sample)
+            worker = await self._acquire(build, priority, icon and icon['sha'], should_stop, log)
+            if worker is None:
+                if should_stop():
+                    return self._failed_result(start, None, "annulé avant l'attribution d'un worker", stopped=True)
+                log(f"❌ Aucun worker connecté depuis {self.worker_timeout:.0f} s: build abandonné")
+                return self._failed_result(start, 'no_worker', f"aucun worker depuis {self.worker_timeout:.0f} s")
+            try:
+                message = await self._execute(worker, build, args, icon, use_cache, should_stop, log)
+                if message is not None:
+                    return await self._collect(worker, message, cwd, log, start)
+            finally:
+                worker.builds.pop(build.id, None)
+                self._schedule()
+            retry = attempt < CLUSTER_MAX_ATTEMPTS and not should_stop()
+            log(f"⚠️ Worker {worker.name} perdu pendant le build" + (", nouvelle tentative" if retry else ""))
+            if not retry:
+                break
+        return self._failed_result(start, 'worker_lost', f"worker perdu ({CLUSTER_MAX_ATTEMPTS} tentative(s))",
+                                   stopped=should_stop())
+
+    async def _execute(self, worker, build, args, icon, use_cache, should_stop, log):
+        """Envoie l'icône (si le worker ne l'a pas) et le build; attend le message « result »"""
+        import asyncio
+
+        connection = worker.connection
+        if icon and icon['sha'] not in worker.blobs:
+            if not connection.send({'type': 'blob', 'sha': icon['sha']}, blob=self.blobs.path(icon['sha'])):
+                return None  # Connexion perdue: le build sera confié à un autre worker
+            worker.blobs.add(icon['sha'])
+            log(f"📤 Icône envoyée à {worker.name} ({icon['sha'][:12]})")
+        if not connection.send({'type': 'job', 'job': build.id, 'args': args, 'icon': icon,
+                                'use_cache': use_cache}):
+            return None
+        log(f"🖧 Build confié à {worker.name}")
+        cancelled = False
+        while True:
+            try:
+                return await asyncio.wait_for(asyncio.shield(build.result), CLUSTER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                if not cancelled and should_stop():
+                    connection.send({'type': 'cancel', 'job': build.id})
+                    cancelled = True
+
+    async def _collect(self, worker, message, cwd, log, start):
+        """Rapatrie les installeurs absents du magasin local et les place dans cwd"""
+        result = dict(message.get('result') or {})
+        artifacts = []
+        Path(cwd).mkdir(parents=True, exist_ok=True)
+        for artifact in message.get('artifacts') or []:
+            sha, name = artifact['sha'], os.path.basename(artifact['name'])
+            if not BlobStore.valid(sha) or not name.lower().endswith(ARTIFACT_EXTENSIONS):
+                log(f"❌ Installeur refusé (empreinte ou nom invalide): {name!r}")
+                result['returncode'] = result.get('returncode') or -1
+                continue
+            if self.blobs.has(sha):
+                log(f"♻️ {name}: déjà présent localement, pas de transfert")
+            else:
+                waiter = worker.blob_waiters.get(sha)
+                if waiter is None:
+                    waiter = worker.blob_waiters[sha] = self.loop.create_future()
+                    if not worker.connection.send({'type': 'get', 'sha': sha}):
+                        del worker.blob_waiters[sha]
+                        waiter.set_exception(ConnectionError(f"worker {worker.name} perdu"))
+                try:
+                    await waiter
+                except (ConnectionError, FileNotFoundError) as e:
+                    log(f"❌ {name} non rapatrié: {e}")
+                    result['returncode'] = result.get('returncode') or -1
+                    continue
+                log(f"📥 {name} reçu de {worker.name} ({artifact.get('size', 0) / 1024 ** 2:.1f} Mo)")
+            artifacts.append(str(self.blobs.materialize(sha, Path(cwd) / name).absolute()))
+        result.update(artifacts=artifacts, worker=worker.name, duration=time.monotonic() - start)
+        return result
+
+    @staticmethod
+    def _failed_result(start, killed, error, stopped=False):
+        return {'returncode': -1, 'stopped': stopped, 'killed': killed, 'duration': time.monotonic() - start,
+                'output_tail': [error], 'cached': False, 'artifacts': [], 'record': {}}
+
+
+class ClusterWorker:
+    """Worker du cluster (mode --worker): se connecte au coordinateur, exécute les
+    builds reçus avec le Pake local et renvoie les installeurs comme blobs."""
+
+    def __init__(self, host, port, capacity=None, pake_executable=None, toolchain=None, work_dir=None,
+                 use_build_cache=True, token=None, blobs=None, log=None):
+        self.host = host
+        self.port = port
+        self.capacity = compute_worker_count(capacity)
+        self.pake_executable = pake_executable or 'pake'
+        self.toolchain = toolchain or {}
+        self.work_dir = Path(work_dir or BATCH_OUTPUT_DIR)
+        self.use_build_cache = use_build_cache
+        self.token = token
+        self.blobs = blobs or BlobStore()
+        self.log = log or console_log
+        self.name = f"{platform.node() or 'worker'}:{os.getpid()}"
+        self.builds = {}  # id du build -> (Event d'annulation, [processus])
+
+    async def run(self):
+        """Se connecte au coordinateur et se reconnecte après une coupure"""
+        import asyncio
+
+        delay = CLUSTER_RECONNECT_SECONDS
+        while True:
+            try:
+                await self.session()
+                delay = CLUSTER_RECONNECT_SECONDS
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                self.log(f"⚠️ Coordinateur {self.host}:{self.port} injoignable: {e or 'délai dépassé'}")
+            except ValueError as e:
+                self.log(f"❌ Connexion refusée par le coordinateur: {e}")
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CLUSTER_RECONNECT_MAX_SECONDS)
+
+    async def session(self):
+        import asyncio
+
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=CLUSTER_MAX_MESSAGE_BYTES)
+        connection = ClusterConnection(reader, writer, self.blobs, log=self.log)
+        heartbeat = None
+        try:
+            connection.send({
+                'type': 'hello',
+                'protocol': CLUSTER_PROTOCOL_VERSION,
+                'token': self.token,
+                'name': self.name,
+                'capacity': self.capacity,
+                'platform': f"{sys.platform}/{platform.machine()}",
+                'blobs': self.blobs.inventory(),
+            })
+            welcome = await asyncio.wait_for(connection.receive(), CLUSTER_HELLO_TIMEOUT)
+            if welcome.get('type') != 'welcome':
+                raise ValueError(welcome.get('error') or "réponse inattendue")
+            self.log(f"🖧 Connecté au coordinateur {self.host}:{self.port} ({self.capacity} build(s) en parallèle)")
+            heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(connection))
+            while True:
+                message = await connection.receive()
+                kind = message.get('type')
+                if kind == 'job':
+                    cancel_event = threading.Event()
+                    self.builds[message['job']] = (cancel_event, [])
+                    threading.Thread(target=self.run_job, args=(connection, message, cancel_event),
+                                     daemon=True).start()
+                elif kind == 'cancel' and message.get('job') in self.builds:
+                    self._cancel(message['job'])
+                elif kind == 'get':
+                    sha = str(message.get('sha') or '')
+                    if self.blobs.has(sha):
+                        connection.send({'type': 'blob', 'sha': sha}, blob=self.blobs.path(sha))
+                    else:
+                        connection.send({'type': 'missing', 'sha': sha})
+        except ConnectionError:
+            self.log("⚠️ Connexion au coordinateur perdue")
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            connection.close()
+            for build_id in list(self.builds):  # Plus personne pour recevoir les résultats
+                self._cancel(build_id)
+
+    def _cancel(self, build_id):
+        cancel_event, processes = self.builds.get(build_id, (None, []))
+        if cancel_event is not None:
+            cancel_event.set()
+        for process in processes:
+            threading.Thread(target=kill_process_tree, args=(process, self.log), daemon=True).start()
+
+    async def _heartbeat(self, connection):
+        """Déclare périodiquement la charge de la machine au coordinateur"""
+        import asyncio
+
+        while True:
+            try:
+                loadavg = os.getloadavg()[0]
+            except (AttributeError, OSError):
+                loadavg = None
+            connection.send({'type': 'load', 'running': len(self.builds), 'loadavg': loadavg,
+                             'cpus': os.cpu_count(), 'memory': get_available_memory()})
+            await asyncio.sleep(CLUSTER_HEARTBEAT_SECONDS)
+
+    def run_job(self, connection, message, cancel_event):
+        """Exécute un build reçu (thread dédié) et renvoie son résultat"""
+        build_id = message['job']
+
+        def send(payload):
+            connection.send_threadsafe(dict(payload, job=build_id))
+
+        def log(line):
+            send({'type': 'log', 'line': line})
+
+        def on_start(process):
+            self.builds[build_id][1].append(process)
+            if cancel_event.is_set():  # Annulé pendant le démarrage
+                self._cancel(build_id)
+
+        artifacts = []
+        try:
+            args = list(message['args'])
+            name = sanitize_app_name(args[args.index('--name') + 1] if '--name' in args else f"job-{build_id}")
+            cwd = self.work_dir / name
+            cwd.mkdir(parents=True, exist_ok=True)
+            icon = message.get('icon')
+            if icon:
+                if not BlobStore.valid(icon.get('sha')) or str(icon.get('ext')).lower() not in CLUSTER_ICON_EXTENSIONS:
+                    raise ValueError("icône reçue invalide (empreinte ou extension)")
+                # Icône déclinée localement: le format attendu dépend de la plateforme du worker
+                source = self.blobs.materialize(icon['sha'], cwd / f".source_icon{icon['ext']}")
+                args[icon['position']] = os.path.abspath(prepare_icon(str(source), log=log))
+            cmd = [self.pake_executable] + args
+            log(f"🖧 Build exécuté par {self.name}: {format_command(cmd)}")
+            result = run_cached_build(
+                cmd, self.toolchain, log=log, cwd=str(cwd),
+                use_cache=self.use_build_cache and message.get('use_cache', True),
+                should_stop=cancel_event.is_set, on_start=on_start,
+                on_progress=lambda state: send({'type': 'progress', 'state': state}),
+                on_sample=lambda sample: send({'type': 'sample', 'sample': sample}))
+            for path in result.get('artifacts', []):
+                artifacts.append({'name': os.path.basename(path), 'sha': self.blobs.add_file(path),
+                                  'size': os.path.getsize(path)})
+            payload = {key: result.get(key) for key in CLUSTER_RESULT_KEYS}
+        except Exception as e:
+            log(f"❌ Exception: {e}")
+            payload = {'returncode': -1, 'stopped': cancel_event.is_set(), 'killed': None, 'duration': 0.0,
+                       'output_tail': [str(e)], 'cached': False, 'record': {}}
+        send({'type': 'result', 'result': payload, 'artifacts': artifacts})
+        self.builds.pop(build_id, None)
+
+
+def run_worker(address, workers=None, output_dir=None, pake_executable=None, use_build_cache=True):
+    """Lance un worker du cluster jusqu'à Ctrl+C"""
+    import asyncio
+
+    try:
+        host, port = parse_address(address, SERVICE_DEFAULT_HOST, CLUSTER_DEFAULT_PORT)
+    except ValueError:
+        console_log(f"❌ Adresse du coordinateur invalide: {address} (attendu: HÔTE:PORT)")
+        return 2
+    toolchain = probe_toolchain(log=console_log)
+    if not report_toolchain(toolchain, log=console_log):
+        console_log("⚠️ === Certains prérequis manquent ou sont trop anciens ===")
+    if not pake_executable:
+        if toolchain['pake']['status'] != 'ok':
+            return 2
+        pake_executable = toolchain['pake']['path']
+    settings = read_config_file()
+    worker = ClusterWorker(host, port, capacity=workers, pake_executable=pake_executable, toolchain=toolchain,
+                           work_dir=output_dir, use_build_cache=use_build_cache,
+                           token=settings.get('cluster_token'))
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        console_log("👋 Arrêt du worker demandé")
+    return 0
+
+
 class PakeGUI:
     def __init__(self, root):
         self.root = root
@@ -45,20 +4565,56 @@ class PakeGUI:
         self.hide_title_var = tk.BooleanVar()
         self.always_on_top_var = tk.BooleanVar()
         self.auto_favicon_var = tk.BooleanVar(value=FAVICON_SUPPORT)  # Activer seulement si dépendances disponibles
+        self.use_build_cache_var = tk.BooleanVar(value=True)
+        self.profile_search_var = tk.StringVar()
+        self.profile_matches = []  # (nom, domaine) affichés dans la liste des profils
+        self.preset_search_var = tk.StringVar()
+        self.preset_matches = []  # Identifiants des presets affichés dans la recherche
+        
+        self.priority_var = tk.IntVar(value=0)
+        
+        # File de builds: plusieurs applications construites en parallèle
+        self.build_queue = BuildQueue(self.run_job, on_change=lambda job: self.call_in_ui(self.on_job_change, job))
+        self.reported_jobs = set()  # Jobs terminés déjà signalés à l'utilisateur
+        self.queue_summary_shown = False
+        
+        # Favicon résolu pendant la saisie de l'URL: le build n'a plus à l'attendre
+        self.favicon_prefetcher = FaviconPrefetcher(log=self.log)
+        self.favicon_prefetch_after = None
+        self.url_var.trace_add('write', self.schedule_favicon_prefetch)
         
-        # Variables pour contrôle de processus
-        self.current_process = None
-        self.is_building = False
+        # Journal: files thread-safe vidées périodiquement par la boucle Tk
+        self.log_queue = queue.SimpleQueue()
+        self.ui_queue = queue.SimpleQueue()
+        self.log_history = self.open_log_history()
         
         # Configuration par défaut
-        self.config_file = Path("pake_gui_config.json")
+        self.config_file = CONFIG_FILE
+        self.settings = {}  # Réglages de pake_gui_config.json (hors formulaire)
+        self.profiles = None  # Magasin des profils d'applications
         self.pake_executable = None
+        self.toolchain = {}  # Résultat des sondes de prérequis
         
         self.load_config()
+        
+        # Chien de garde de la boucle Tk: mesure les gels et capture la pile responsable
+        self.watchdog = None
+        self.diagnostics_window = None
+        if self.settings.get('ui_watchdog', True):
+            self.watchdog = LagWatchdog(self.root.after, log=self.log,
+                                        stall_ms=float(self.settings.get('ui_stall_ms', WATCHDOG_STALL_MS)))
+            self.root.after_idle(self.watchdog.start)  # Mesure à partir de l'entrée dans mainloop
+            
         self.setup_ui()
+        self.refresh_profiles()
+        self.drain_queues()
+        self.refresh_jobs_tick()
         
         # Vérifier les prérequis au démarrage
         self.root.after(1000, self.check_prerequisites)
+        # Charger l'index des presets en arrière-plan dès l'affichage de la fenêtre: boutons des
+        # presets mis en avant, et première frappe de recherche instantanée
+        self.root.after_idle(lambda: threading.Thread(target=self.preload_presets, daemon=True).start())
         
     def setup_ui(self):
         """Configure l'interface utilisateur"""
@@ -74,9 +4630,29 @@ class PakeGUI:
           # Couleurs personnalisées
         style.configure('Title.TLabel', font=('Arial', 14, 'bold'), foreground='#2E86AB')
         style.configure('Accent.TButton', font=('Arial', 10, 'bold'))
+        # Panneau des profils enregistrés, à droite
+        profiles_frame = ttk.LabelFrame(self.root, text="📚 Profils", padding="8")
+        profiles_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 12), pady=12)
+        ttk.Entry(profiles_frame, textvariable=self.profile_search_var, width=30).pack(fill=tk.X)
+        self.profile_search_var.trace_add('write', self.refresh_profiles)
+        self.profiles_count_label = ttk.Label(profiles_frame, text="")
+        self.profiles_count_label.pack(anchor=tk.W, pady=(4, 4))
+        self.profiles_list = tk.Listbox(profiles_frame, width=34, activestyle='none')
+        self.profiles_list.pack(fill=tk.BOTH, expand=True)
+        self.profiles_list.bind('<Double-Button-1>', self.load_selected_profile)
+        self.profiles_list.bind('<Return>', self.load_selected_profile)
+        profiles_buttons = ttk.Frame(profiles_frame)
+        profiles_buttons.pack(fill=tk.X, pady=(6, 0))
+        ttk.Button(profiles_buttons, text="📂 Charger", command=self.load_selected_profile).pack(
+            side=tk.LEFT, expand=True, fill=tk.X)
+        ttk.Button(profiles_buttons, text="🗑️ Supprimer", command=self.delete_selected_profile).pack(
+            side=tk.LEFT, expand=True, fill=tk.X, padx=(5, 0))
+        if self.profiles is None:
+            profiles_frame.pack_forget()
+            
           # Frame principal direct sans scrollbar pour éviter les ascenseurs
         main_frame = ttk.Frame(self.root, padding="12")
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Configuration du grid
         main_frame.columnconfigure(1, weight=1)
@@ -159,30 +4735,36 @@ class PakeGUI:
             row=0, column=1, sticky=tk.W, padx=(0, 25))
         ttk.Checkbutton(options_grid, text="📌 Toujours au premier plan", variable=self.always_on_top_var).grid(
             row=1, column=0, sticky=tk.W, padx=(0, 25), pady=(8, 0))
+        ttk.Checkbutton(options_grid, text="♻️ Réutiliser un build identique (cache)",
+                        variable=self.use_build_cache_var).grid(
+            row=1, column=1, sticky=tk.W, padx=(0, 25), pady=(8, 0))
         
         # Section presets
         presets_frame = ttk.LabelFrame(main_frame, text="🌟 Sites populaires", padding="10")
         presets_frame.grid(row=row, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 15))
         row += 1
         
-        # Boutons presets en grille
-        presets = [
-            ("YouTube", "https://www.youtube.com", "🎥"),
-            ("Gmail", "https://mail.google.com", "📧"),
-            ("GitHub", "https://github.com", "🐙"),
-            ("Twitter/X", "https://twitter.com", "🐦"),
-            ("WhatsApp Web", "https://web.whatsapp.com", "💬"),
-            ("ChatGPT", "https://chat.openai.com", "🤖"),
-            ("Discord", "https://discord.com/app", "🎮"),
-            ("Spotify", "https://open.spotify.com", "🎵"),
-            ("Netflix", "https://www.netflix.com", "🎬")
-        ]
-        
-        for i, (name, url, emoji) in enumerate(presets):
-            btn = ttk.Button(presets_frame, text=f"{emoji} {name}", 
-                           command=lambda n=name, u=url: self.load_preset(n, u))
-            btn.grid(row=i//3, column=i%3, padx=5, pady=3, sticky=(tk.W, tk.E))
-            presets_frame.columnconfigure(i%3, weight=1)
+        # Boutons presets en grille: entrées « featured » du catalogue, ajoutées à son chargement
+        self.featured_frame = ttk.Frame(presets_frame)
+        self.featured_frame.grid(row=0, column=0, columnspan=3, sticky=(tk.W, tk.E))
+        for column in range(3):
+            self.featured_frame.columnconfigure(column, weight=1)
+            presets_frame.columnconfigure(column, weight=1)
+            
+        # Recherche instantanée dans le catalogue complet (chargé à la première frappe)
+        search_row = ttk.Frame(presets_frame)
+        search_row.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(8, 0))
+        ttk.Label(search_row, text="🔎 Autres sites:").pack(side=tk.LEFT, padx=(0, 8))
+        preset_entry = ttk.Entry(search_row, textvariable=self.preset_search_var, font=('Arial', 12))
+        preset_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        preset_entry.bind('<Return>', lambda event: self.load_selected_preset(index=0))
+        preset_entry.bind('<Down>', lambda event: self.focus_preset_results())
+        self.preset_search_var.trace_add('write', self.search_presets)
+        self.preset_results = tk.Listbox(presets_frame, height=5, activestyle='none')
+        self.preset_results.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(4, 0))
+        self.preset_results.bind('<Double-Button-1>', lambda event: self.load_selected_preset())
+        self.preset_results.bind('<Return>', lambda event: self.load_selected_preset())
+        self.preset_results.grid_remove()
         
         # Boutons d'action principaux
         action_frame = ttk.Frame(main_frame)
@@ -190,20 +4772,48 @@ class PakeGUI:
         row += 1
         
         ttk.Button(action_frame, text="🔍 Vérifier prérequis", 
-                  command=self.check_prerequisites).pack(side=tk.LEFT, padx=(0, 10))
+                  command=lambda: self.check_prerequisites(use_cache=False)).pack(side=tk.LEFT, padx=(0, 10))
         
         self.create_button = ttk.Button(action_frame, text="🚀 Créer l'application", 
                   command=self.create_app, style="Accent.TButton")
         self.create_button.pack(side=tk.LEFT, padx=(0, 10))
         
-        self.stop_button = ttk.Button(action_frame, text="⏹️ Arrêter", 
-                  command=self.stop_build, state='disabled')
-        self.stop_button.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(action_frame, text="Priorité:").pack(side=tk.LEFT)
+        ttk.Spinbox(action_frame, from_=-5, to=5, width=4, textvariable=self.priority_var).pack(
+            side=tk.LEFT, padx=(5, 10))
         
         ttk.Button(action_frame, text="📋 Générer commande", 
                   command=self.show_command).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(action_frame, text="💾 Sauvegarder config", 
-                  command=self.save_config).pack(side=tk.LEFT)
+        ttk.Button(action_frame, text="💾 Sauvegarder profil", 
+                  command=self.save_config).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(action_frame, text="🩺 Diagnostics", 
+                  command=self.show_diagnostics).pack(side=tk.LEFT)
+        
+        # File de builds
+        jobs_frame = ttk.LabelFrame(main_frame, text=f"📋 File de builds "
+                                    f"({self.build_queue.max_workers} en parallèle max)", padding="8")
+        jobs_frame.grid(row=row, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 8))
+        jobs_frame.columnconfigure(0, weight=1)
+        row += 1
+        
+        columns = ('app', 'priority', 'status', 'progress', 'resources', 'elapsed')
+        self.jobs_tree = ttk.Treeview(jobs_frame, columns=columns, show='headings', height=4)
+        for column, heading, width in zip(columns, ("Application", "Priorité", "État", "Progression",
+                                                    "CPU / RAM", "Durée"),
+                                          (220, 70, 120, 300, 140, 90)):
+            self.jobs_tree.heading(column, text=heading)
+            self.jobs_tree.column(column, width=width, stretch=column in ('app', 'progress'))
+        self.jobs_tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.jobs_tree.bind('<<TreeviewSelect>>', lambda event: self.update_progress())
+        
+        jobs_buttons = ttk.Frame(jobs_frame)
+        jobs_buttons.grid(row=0, column=1, sticky=tk.N, padx=(8, 0))
+        ttk.Button(jobs_buttons, text="⬆️ Monter", command=lambda: self.move_jobs(-1)).pack(fill=tk.X)
+        ttk.Button(jobs_buttons, text="⬇️ Descendre", command=lambda: self.move_jobs(1)).pack(fill=tk.X, pady=3)
+        self.stop_button = ttk.Button(jobs_buttons, text="⏹️ Annuler", command=self.stop_build, state='disabled')
+        self.stop_button.pack(fill=tk.X)
+        ttk.Button(jobs_buttons, text="🧹 Retirer terminés",
+                   command=self.build_queue.clear_finished).pack(fill=tk.X, pady=(3, 0))
         
         # Zone de log - réduite pour éviter les ascenseurs
         log_frame = ttk.LabelFrame(main_frame, text="📄 Journal d'activité", padding="8")
@@ -213,17 +4823,107 @@ class PakeGUI:
         main_frame.rowconfigure(row, weight=1)        
         self.log_text = scrolledtext.ScrolledText(log_frame, height=8, wrap=tk.WORD, font=('Consolas', 11))
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        # Barre de progression
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+        # Barre de progression et phase en cours
+        self.progress = ttk.Progressbar(main_frame, mode='determinate', maximum=100)
         self.progress.grid(row=row+1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.progress_label = ttk.Label(main_frame, text="")
+        self.progress_label.grid(row=row+2, column=0, columnspan=3, sticky=tk.W)
         
         self.log("✅ Interface initialisée avec succès")
         
-    def load_preset(self, name, url):
+    def load_preset(self, name, url, entry=None):
         """Charge un preset de site populaire"""
         self.url_var.set(url)
         self.name_var.set(name)
         self.log(f"📝 Preset chargé: {name}")
+        # Recherche et vérification (SHA-256) de l'icône hors du thread Tk
+        threading.Thread(target=self.find_preset_icon, args=(url, entry), daemon=True).start()
+        
+    def find_preset_icon(self, url, entry):
+        """Cherche l'icône préchargée du preset dans le catalogue (thread d'arrière-plan)"""
+        # Icône préchargée dans le catalogue: aucun accès réseau au moment du build
+        icon_path = None
+        try:
+            catalog = get_preset_catalog()
+            if entry is None:
+                entry_id = catalog.find_domain(url)
+                entry = catalog.entry(entry_id) if entry_id is not None else None
+            icon_path = catalog.icon_path(entry) if entry else None
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️ Catalogue de presets illisible: {e}")
+        self.call_in_ui(self.apply_preset_icon, url, icon_path)
+        
+    def apply_preset_icon(self, url, icon_path):
+        """Applique l'icône trouvée par find_preset_icon (thread Tk)"""
+        if self.url_var.get() != url:
+            return  # Un autre preset a été choisi entre-temps
+        current = self.icon_path_var.get()
+        if icon_path:
+            self.icon_path_var.set(icon_path)
+            self.log(f"🎨 Icône préchargée du catalogue: {os.path.basename(icon_path)}")
+        elif current and Path(current).parent.name == PRESET_ICON_DIRNAME:
+            self.icon_path_var.set("")  # Icône du preset précédent
+        
+    def preload_presets(self):
+        """Charge l'index du catalogue de presets (thread d'arrière-plan), puis affiche
+        les boutons des presets mis en avant"""
+        try:
+            catalog = get_preset_catalog()
+            featured = [catalog.entry(entry_id) for entry_id in catalog.featured()]
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️ Catalogue de presets illisible: {e}")
+            return
+        self.call_in_ui(self.show_featured_presets, featured)
+        
+    def show_featured_presets(self, entries):
+        """Crée un bouton par preset mis en avant dans le catalogue (thread Tk)"""
+        for i, entry in enumerate(entries):
+            text = f"{entry['emoji']} {entry['name']}" if entry.get('emoji') else entry['name']
+            btn = ttk.Button(self.featured_frame, text=text,
+                             command=lambda e=entry: self.load_preset(e['name'], e['url'], e))
+            btn.grid(row=i//3, column=i%3, padx=5, pady=3, sticky=(tk.W, tk.E))
+        if self.preset_search_var.get().strip():
+            self.search_presets()  # Saisie faite pendant le chargement de l'index
+            
+    def search_presets(self, *args):
+        """Affiche les presets du catalogue correspondant à la saisie"""
+        text = self.preset_search_var.get()
+        self.preset_matches = []
+        self.preset_results.delete(0, tk.END)
+        try:
+            catalog = get_preset_catalog()
+            if text.strip() and catalog.try_load() is None:
+                # Index en construction par preload_presets: ne pas bloquer le thread Tk
+                self.preset_results.insert(tk.END, "⏳ chargement…")
+                self.preset_results.grid()
+                return
+            self.preset_matches = catalog.search(text) if text.strip() else []
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️ Catalogue de presets illisible: {e}")
+        for entry_id in self.preset_matches:
+            self.preset_results.insert(tk.END, f"{catalog.name(entry_id)}  —  {catalog.domain(entry_id)}")
+        if self.preset_matches:
+            self.preset_results.grid()
+        else:
+            self.preset_results.grid_remove()
+            
+    def focus_preset_results(self):
+        if self.preset_matches:
+            self.preset_results.focus_set()
+            self.preset_results.selection_clear(0, tk.END)
+            self.preset_results.selection_set(0)
+            self.preset_results.activate(0)
+            
+    def load_selected_preset(self, index=None):
+        """Charge le preset sélectionné (ou le premier résultat) dans le formulaire"""
+        if index is None:
+            selection = self.preset_results.curselection()
+            index = selection[0] if selection else 0
+        if index >= len(self.preset_matches):
+            return
+        entry = get_preset_catalog().entry(self.preset_matches[index])
+        self.load_preset(entry['name'], entry['url'], entry)
+        self.preset_search_var.set("")
         
     def browse_icon(self):
         """Ouvre un dialogue pour sélectionner une icône"""
@@ -235,6 +4935,8 @@ class PakeGUI:
         if filename:
             self.icon_path_var.set(filename)
             self.log(f"🎨 Icône sélectionnée: {os.path.basename(filename)}")
+            # Préparer les tailles d'icône dès maintenant: le build les trouvera en cache
+            threading.Thread(target=prepare_icon, args=(filename,), kwargs={'log': self.log}, daemon=True).start()
             
     def clear_icon(self):
         """Efface le chemin de l'icône"""
@@ -242,171 +4944,80 @@ class PakeGUI:
         self.log("🗑️ Icône effacée")
         
     def log(self, message):
-        """Ajoute un message au journal avec timestamp"""
-        import datetime
+        """Ajoute un message au journal avec timestamp (appelable depuis n'importe quel thread)"""
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        full_message = f"[{timestamp}] {message}"
-        self.log_text.insert(tk.END, f"{full_message}\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        self.log_queue.put(f"[{timestamp}] {message}")
         
-    def find_pake_executable(self):
-        """Trouve l'exécutable Pake sur le système avec détection avancée"""
-        self.log("🔍 Recherche de l'exécutable Pake...")
+    def call_in_ui(self, func, *args):
+        """Exécute func dans le thread Tk lors du prochain vidage de la file"""
+        self.ui_queue.put((func, args))
         
-        # 1. Essayer d'abord la commande directe dans le PATH
-        try:
-            result = subprocess.run(['pake', '--version'], capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                self.log("✅ Pake trouvé dans le PATH système")
-                return 'pake'
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            pass
+    def drain_queues(self):
+        """Vide les files de journal et d'actions UI par lots (minuterie Tk)"""
+        self.flush_log()
+        while True:
+            try:
+                func, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                self.log(f"⚠️ Erreur d'interface: {e}")
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self.drain_queues)
         
-        # 2. Chercher avec shutil.which (plus fiable)
-        pake_path = shutil.which('pake')
-        if pake_path:
-            self.log(f"✅ Pake trouvé via which: {pake_path}")
-            return pake_path
-          # 3. Obtenir le dossier global npm et chercher dedans
-        try:
-            result = subprocess.run(['npm', 'root', '-g'], capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                npm_global = result.stdout.strip()
-                self.log(f"📂 Dossier npm global: {npm_global}")
-                
-                # Chercher dans .bin avec toutes les variantes possibles
-                bin_paths = [
-                    os.path.join(npm_global, '.bin', 'pake.cmd'),
-                    os.path.join(npm_global, '.bin', 'pake.CMD'),  # Windows majuscules
-                    os.path.join(npm_global, '.bin', 'pake'),
-                    os.path.join(npm_global, '.bin', 'pake.exe'),
-                    os.path.join(npm_global, '.bin', 'pake.EXE'),
-                ]
+    def flush_log(self):
+        """Écrit les messages en attente dans l'historique disque et dans le widget"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not messages:
+            return
+            
+        # Historique complet sur disque
+        if self.log_history is not None:
+            try:
+                self.log_history.write("\n".join(messages) + "\n")
+                self.log_history.flush()
+            except OSError:
+                self.log_history = None
                 
-                for bin_path in bin_paths:
-                    if os.path.exists(bin_path):
-                        self.log(f"✅ Pake trouvé: {bin_path}")
-                        return bin_path
-                        
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            self.log("⚠️ npm non trouvé ou timeout")
-          # 4. Chercher dans les chemins Windows typiques
-        windows_paths = [
-            os.path.expanduser('~\\AppData\\Roaming\\npm\\pake.cmd'),
-            os.path.expanduser('~\\AppData\\Roaming\\npm\\pake.CMD'),  # Majuscules
-            os.path.expanduser('~\\AppData\\Roaming\\npm\\pake.exe'),
-            os.path.expanduser('~\\AppData\\Roaming\\npm\\pake.EXE'),
-            os.path.expanduser('~\\AppData\\Roaming\\npm\\pake'),
-            'C:\\Program Files\\nodejs\\pake.cmd',
-            'C:\\Program Files\\nodejs\\pake.CMD',
-            'C:\\Program Files\\nodejs\\pake.exe',
-            'C:\\Program Files\\nodejs\\pake.EXE',
-            'C:\\Program Files\\nodejs\\pake',
-            'C:\\Program Files (x86)\\nodejs\\pake.cmd',
-            'C:\\Program Files (x86)\\nodejs\\pake.CMD',
-            'C:\\Program Files (x86)\\nodejs\\pake.exe',
-            'C:\\Program Files (x86)\\nodejs\\pake.EXE',
-            'C:\\Program Files (x86)\\nodejs\\pake',
-        ]
+        # Widget borné: seules les LOG_MAX_LINES dernières lignes restent visibles
+        self.log_text.insert(tk.END, "\n".join(messages[-LOG_MAX_LINES:]) + "\n")
+        line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        if line_count > LOG_MAX_LINES:
+            self.log_text.delete('1.0', f'{line_count - LOG_MAX_LINES + 1}.0')
+        self.log_text.see(tk.END)
         
-        self.log("🔍 Recherche dans les chemins Windows...")
-        for path in windows_paths:
-            if os.path.exists(path):
-                self.log(f"✅ Pake trouvé: {path}")
-                return path
-          # 5. Chercher dans le PATH étendu manuellement
-        path_env = os.environ.get('PATH', '')
-        for path_dir in path_env.split(os.pathsep):
-            if path_dir.strip():
-                for exe_name in ['pake.cmd', 'pake.CMD', 'pake.exe', 'pake.EXE', 'pake']:
-                    full_path = os.path.join(path_dir.strip(), exe_name)
-                    if os.path.exists(full_path):
-                        self.log(f"✅ Pake trouvé dans PATH: {full_path}")
-                        return full_path
-                        
-        self.log("❌ Pake non trouvé sur le système")
-        return None
+    def open_log_history(self):
+        """Ouvre le fichier d'historique complet du journal pour cette session"""
+        try:
+            LOG_HISTORY_DIR.mkdir(exist_ok=True)
+            filename = datetime.datetime.now().strftime("pake_gui_%Y%m%d_%H%M%S.log")
+            return open(LOG_HISTORY_DIR / filename, 'a', encoding='utf-8')
+        except OSError as e:
+            print(f"⚠️ Historique du journal désactivé: {e}")
+            return None
+            
+    def find_pake_executable(self):
+        """Trouve l'exécutable Pake sur le système avec détection avancée"""
+        return find_pake_executable(log=self.log)
         
-    def check_prerequisites(self):
+    def check_prerequisites(self, use_cache=True):
         """Vérifie si Node.js, Rust et Pake sont installés"""
         self.log("🔍 === Vérification des prérequis ===")
         
         def check():
-            all_ok = True
+            with trace_span('check_prerequisites'):
+                self.toolchain = probe_toolchain(log=self.log, use_cache=use_cache)
+            pake = self.toolchain['pake']
+            self.pake_executable = pake['path'] if pake['status'] == 'ok' else None
             
-            # Vérifier Node.js
-            try:
-                result = subprocess.run(['node', '--version'], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    version = result.stdout.strip()
-                    self.log(f"✅ Node.js installé: {version}")
-                else:
-                    self.log("❌ Node.js: commande échouée")
-                    all_ok = False
-            except (FileNotFoundError, subprocess.TimeoutExpired):
-                self.log("❌ Node.js non installé ou non accessible")
-                self.log("💡 Installez Node.js depuis: https://nodejs.org/")
-                all_ok = False
-                
-            # Vérifier npm
-            try:
-                result = subprocess.run(['npm', '--version'], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    version = result.stdout.strip()
-                    self.log(f"✅ npm installé: {version}")
-                else:
-                    self.log("❌ npm: commande échouée")
-                    all_ok = False
-            except (FileNotFoundError, subprocess.TimeoutExpired):
-                self.log("❌ npm non installé ou non accessible")
-                all_ok = False
-                
-            # Vérifier Rust
-            try:
-                result = subprocess.run(['rustc', '--version'], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    version = result.stdout.strip()
-                    self.log(f"✅ Rust installé: {version}")
-                else:
-                    self.log("❌ Rust: commande échouée")
-                    all_ok = False
-            except (FileNotFoundError, subprocess.TimeoutExpired):
-                self.log("❌ Rust non installé ou non accessible")
-                self.log("💡 Installez Rust depuis: https://rustup.rs/")
-                all_ok = False
-                  
-            # Vérifier Pake avec détection avancée
-            pake_path = self.find_pake_executable()
-            if pake_path:
-                try:
-                    # Tester la commande Pake
-                    result = subprocess.run([pake_path, '--version'], capture_output=True, text=True, timeout=10)
-                    if result.returncode == 0:
-                        version = result.stdout.strip()
-                        self.log(f"✅ Pake installé: {version}")
-                        self.log(f"📍 Chemin utilisé: {pake_path}")
-                        self.pake_executable = pake_path
-                    else:
-                        self.log(f"❌ Pake: commande échouée (code: {result.returncode})")
-                        if result.stderr:
-                            self.log(f"❌ Erreur: {result.stderr.strip()}")
-                        self.pake_executable = None
-                        all_ok = False
-                except (subprocess.TimeoutExpired, Exception) as e:
-                    self.log(f"❌ Erreur lors du test de Pake: {e}")
-                    self.pake_executable = None
-                    all_ok = False
-            else:
-                self.log("❌ Pake non installé ou non trouvé")
-                self.log("💡 Installez Pake avec: npm install -g pake-cli")
-                self.log("💡 Ou redémarrez ce programme après installation")
-                self.log("💡 Assurez-vous que le PATH npm global est configuré")
-                self.pake_executable = None
-                all_ok = False
-                
             # Résumé final
-            if all_ok:
+            if report_toolchain(self.toolchain, log=self.log):
                 self.log("🎉 === Tous les prérequis sont installés! ===")
             else:
                 self.log("⚠️ === Certains prérequis manquent ===")
@@ -415,64 +5026,61 @@ class PakeGUI:
         # Lancer la vérification dans un thread
         threading.Thread(target=check, daemon=True).start()
         
-    def generate_command(self):
-        """Génère la commande Pake avec l'exécutable détecté"""
-        if not self.url_var.get().strip():
-            return None, "URL manquante"
-            
+    def get_config(self):
+        """Retourne la configuration courante du formulaire"""
+        return {
+            'url': self.url_var.get(),
+            'name': self.name_var.get(),
+            'width': self.width_var.get(),
+            'height': self.height_var.get(),
+            'icon_path': self.icon_path_var.get(),
+            'fullscreen': self.fullscreen_var.get(),
+            'hide_title': self.hide_title_var.get(),
+            'always_on_top': self.always_on_top_var.get(),
+            'auto_favicon': self.auto_favicon_var.get(),
+            'use_build_cache': self.use_build_cache_var.get()
+        }
+        
+    def schedule_favicon_prefetch(self, *args):
+        """Précharge le favicon quand la saisie de l'URL marque une pause"""
+        if self.favicon_prefetch_after is not None:
+            self.root.after_cancel(self.favicon_prefetch_after)
+        self.favicon_prefetch_after = self.root.after(FAVICON_PREFETCH_DEBOUNCE_MS, self.prefetch_favicon)
+        
+    def prefetch_favicon(self):
+        """Lance la résolution du favicon de l'URL saisie (thread Tk, résolution en arrière-plan)"""
+        self.favicon_prefetch_after = None
+        if not FAVICON_SUPPORT or not self.auto_favicon_var.get() or self.icon_path_var.get():
+            return
         url = self.url_var.get().strip()
-        name = self.name_var.get().strip() or "MonApp"
-        
-        # Nettoyer le nom (supprimer caractères spéciaux)
-        name = re.sub(r'[^\w\s-]', '', name).strip()
-        name = re.sub(r'\s+', '_', name)
-        
-        # Utiliser l'exécutable Pake détecté ou fallback
-        pake_cmd = self.pake_executable or 'pake'
-        cmd = [pake_cmd, url, '--name', name]
-        
-        # Ajouter les options
-        if self.width_var.get() and self.width_var.get().isdigit():
-            cmd.extend(['--width', self.width_var.get()])
-            
-        if self.height_var.get() and self.height_var.get().isdigit():
-            cmd.extend(['--height', self.height_var.get()])        # Gestion de l'icône avec téléchargement automatique du favicon
-        icon_path = self.icon_path_var.get()
-        if icon_path and os.path.exists(icon_path):
-            # Utiliser l'icône spécifiée par l'utilisateur
-            cmd.extend(['--icon', icon_path])
-        elif self.auto_favicon_var.get():
-            # Tenter de télécharger le favicon automatiquement si l'option est activée
-            self.log("🎨 Aucune icône spécifiée, tentative de téléchargement du favicon...")
-            favicon_path = self.download_favicon(url)
-            if favicon_path and os.path.exists(favicon_path):
-                cmd.extend(['--icon', favicon_path])
-                self.log(f"✅ Favicon utilisé comme icône: {os.path.basename(favicon_path)}")
-            else:
-                self.log("⚠️ Favicon non trouvé, icône par défaut de Pake utilisée")
-        else:
-            self.log("ℹ️ Téléchargement automatique du favicon désactivé, icône par défaut de Pake utilisée")
-        if self.fullscreen_var.get():
-            cmd.append('--fullscreen')
-            
-        if self.hide_title_var.get():
-            cmd.append('--hide-title-bar')
-            
-        if self.always_on_top_var.get():
-            cmd.append('--always-on-top')
-            cmd.append('--always-on-top')
-            
-        return cmd, None
+        host = urlparse(FaviconPrefetcher.normalize(url)).hostname or ''
+        if '.' not in host or host.endswith('.'):  # Saisie encore incomplète
+            return
+        self.favicon_prefetcher.prefetch(url)
+        
+    def generate_command(self, config=None):
+        """Génère la commande Pake avec l'exécutable détecté (réutilise le favicon préchargé)"""
+        return build_pake_command(config or self.get_config(), self.pake_executable, log=self.log,
+                                  favicon_resolver=self.favicon_prefetcher.resolve)
         
     def show_command(self):
-        """Affiche la commande qui sera exécutée"""
-        cmd, error = self.generate_command()
+        """Affiche la commande qui sera exécutée (générée hors du thread Tk)"""
+        config = self.get_config()
+        
+        def generate():
+            cmd, error = self.generate_command(config)
+            self.call_in_ui(self.show_command_window, cmd, error)
+            
+        threading.Thread(target=generate, daemon=True).start()
+        
+    def show_command_window(self, cmd, error):
+        """Affiche la commande générée dans une fenêtre (thread Tk)"""
         if error:
             messagebox.showerror("Erreur", error)
             return
             
         if cmd:
-            cmd_str = ' '.join(f'"{arg}"' if ' ' in str(arg) else str(arg) for arg in cmd)
+            cmd_str = format_command(cmd)
             
             # Créer une fenêtre pour afficher la commande
             cmd_window = tk.Toplevel(self.root)
@@ -500,277 +5108,433 @@ class PakeGUI:
         else:
             messagebox.showerror("Erreur", "Impossible de générer la commande")
             
+    def show_diagnostics(self):
+        """Fenêtre de réactivité de l'interface: percentiles des retards et gels récents"""
+        if self.watchdog is None:
+            messagebox.showinfo("Diagnostics", "Le chien de garde de l'interface est désactivé "
+                                "(ui_watchdog dans pake_gui_config.json).")
+            return
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+            
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics de l'interface")
+        window.geometry("820x520")
+        window.transient(self.root)
+        self.diagnostics_window = window
+        
+        summary_var = tk.StringVar()
+        ttk.Label(window, textvariable=summary_var, font=('Consolas', 9)).pack(anchor=tk.W, padx=10, pady=(10, 5))
+        
+        columns = ('time', 'duration', 'culprit')
+        stalls_tree = ttk.Treeview(window, columns=columns, show='headings', height=8)
+        for column, heading, width in zip(columns, ("Heure", "Durée", "Fonction bloquante"), (150, 80, 560)):
+            stalls_tree.heading(column, text=heading)
+            stalls_tree.column(column, width=width, stretch=column == 'culprit')
+        stalls_tree.pack(fill=tk.X, padx=10)
+        
+        stack_text = scrolledtext.ScrolledText(window, height=12, wrap=tk.NONE, font=('Consolas', 9))
+        stack_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        stalls = []
+        
+        def show_stacks(event=None):
+            selection = stalls_tree.selection()
+            stack_text.config(state='normal')
+            stack_text.delete('1.0', tk.END)
+            if selection:
+                for stack in stalls[int(selection[0])]['stacks']:
+                    stack_text.insert(tk.END, f"— {stack['samples']} échantillon(s)\n" +
+                                      "\n".join(stack['frames']) + "\n\n")
+            stack_text.config(state='disabled')
+            
+        def refresh():
+            if not window.winfo_exists():
+                return
+            stats = self.watchdog.stats()
+            summary_var.set(f"Retard des ticks ({stats['interval_ms']} ms): p50 {stats['p50_ms']} ms · "
+                            f"p95 {stats['p95_ms']} ms · p99 {stats['p99_ms']} ms · max {stats['max_ms']} ms · "
+                            f"{stats['stalls']} gel(s) ≥ {stats['stall_ms']} ms")
+            recent = self.watchdog.recent_stalls()
+            if recent != stalls:
+                stalls[:] = recent
+                stalls_tree.delete(*stalls_tree.get_children())
+                for index, stall in reversed(list(enumerate(stalls))):
+                    stalls_tree.insert('', tk.END, iid=str(index), values=(
+                        stall['time'].replace('T', ' '), f"{stall['duration_ms']:.0f} ms",
+                        stall['culprit'] or "pile non capturée"))
+                show_stacks()
+            window.after(1000, refresh)
+            
+        stalls_tree.bind('<<TreeviewSelect>>', show_stacks)
+        refresh()
+        
     def create_app(self):
-        """Lance la création de l'application"""
-        cmd, error = self.generate_command()
-        if error:
-            messagebox.showerror("Erreur", error)
+        """Ajoute l'application du formulaire à la file de builds.
+
+        La commande est générée par le job lui-même: le favicon, souvent déjà
+        préchargé, est résolu hors du thread Tk.
+        """
+        # Lire les options Tk ici: le thread de build ne doit pas toucher à Tk
+        config = self.get_config()
+        if not config['url'].strip():
+            messagebox.showerror("Erreur", "URL manquante")
             return
             
         if not self.pake_executable:
             messagebox.showerror("Erreur", "Pake n'est pas installé ou non trouvé!\nVeuillez vérifier les prérequis.")
             return
             
-        # Activer l'état de construction
-        self.is_building = True
-        self.create_button.config(state='disabled')
-        self.stop_button.config(state='normal')
+        # Prévenir avant un long build voué à l'échec
+        too_old = [f"{r['label']} {r['version']} (minimum: {r['minimum']})"
+                   for r in self.toolchain.values() if r['status'] == 'too_old']
+        if too_old and not messagebox.askyesno("Prérequis trop anciens",
+                "Versions trop anciennes détectées:\n• " + "\n• ".join(too_old) +
+                "\n\nLe build risque d'échouer. Continuer quand même?"):
+            return
             
-        def run_pake():
-            try:
-                self.progress.start(10)
-                self.log("🚀 === Démarrage de la création ===")
-                cmd_str = ' '.join(f'"{arg}"' if ' ' in str(arg) else str(arg) for arg in cmd)
-                self.log(f"📝 Commande: {cmd_str}")
-                self.log(f"📍 Exécutable: {self.pake_executable}")
-                
-                # Changer vers le répertoire de travail si nécessaire
-                cwd = os.getcwd()
-                self.log(f"📂 Répertoire de travail: {cwd}")
-                
-                # Exécuter Pake
-                self.current_process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    universal_newlines=True,
-                    cwd=cwd
-                )                
-                # Lire la sortie en temps réel
-                output_lines = []
-                for line in self.current_process.stdout:
-                    if not self.is_building:  # Vérifier si l'arrêt a été demandé
-                        break
-                    line = line.strip()
-                    if line:
-                        output_lines.append(line)
-                        self.log(f"📦 {line}")
-                        
-                self.current_process.wait()
-                
-                self.log(f"🏁 Processus terminé avec le code: {self.current_process.returncode}")
-                
-                if self.current_process.returncode == 0 and self.is_building:
-                    self.log("🎉 === APPLICATION CRÉÉE AVEC SUCCÈS! ===")
-                    self.log("📁 Vérifiez le dossier courant pour les fichiers générés")
-                    messagebox.showinfo("Succès", 
-                        "🎉 L'application a été créée avec succès!\n\n"
-                        "Vérifiez le dossier courant pour:\n"
-                        "• Le fichier d'installation (.msi, .deb, .dmg)\n"
-                        "• Les fichiers de l'application")
-                elif self.is_building:  # Seulement afficher l'erreur si pas d'arrêt manuel
-                    self.log(f"❌ === ERREUR LORS DE LA CRÉATION ===")
-                    error_msg = "Une erreur s'est produite lors de la création."
-                    if output_lines:
-                        error_msg += f"\n\nDernières lignes de sortie:\n" + "\n".join(output_lines[-5:])
-                    messagebox.showerror("Erreur", error_msg)
-                    
-            except Exception as e:
-                if self.is_building:  # Seulement afficher l'erreur si pas d'arrêt manuel
-                    self.log(f"❌ Exception: {str(e)}")
-                    messagebox.showerror("Erreur", f"Erreur lors de l'exécution:\n{str(e)}")
-            finally:
-                self.is_building = False
-                self.current_process = None
-                self.progress.stop()
-                self.create_button.config(state='normal')
-                self.stop_button.config(state='disabled')
-                
-        # Sauvegarder la config avant de commencer
-        self.save_config()
+        name = sanitize_app_name(config['name'].strip())
+        if any(job.name == name for job in self.build_queue.active()):
+            messagebox.showerror("Erreur", f"« {name} » est déjà dans la file de builds")
+            return
+        try:
+            priority = int(self.priority_var.get())
+        except (tk.TclError, ValueError):
+            priority = 0
+            
+        # Sauvegarder le profil avant de commencer
+        self.save_config(used=True)
         
-        # Lancer dans un thread séparé
-        threading.Thread(target=run_pake, daemon=True).start()
+        job = self.build_queue.submit(config, None, priority)
+        self.log(f"📋 {job.name} ajouté à la file (priorité {priority})")
         
-    def stop_build(self):
-        """Arrête le processus de création en cours"""
-        if self.current_process and self.is_building:
-            try:
-                self.current_process.terminate()
-                self.log("⏹️ Arrêt du processus demandé...")
+    def run_job(self, job):
+        """Exécute un job de la file (thread de la file, sans accès à Tk)"""
+        log = lambda message: self.log(f"[{job.name}] {message}")
+        cwd = BATCH_OUTPUT_DIR / job.name
+        cwd.mkdir(parents=True, exist_ok=True)
+        log("🚀 === Démarrage de la création ===")
+        if job.cmd is None:
+            job.cmd, error = self.generate_command(job.config)
+            if error:
+                raise ValueError(error)
+        log(f"📝 Commande: {format_command(job.cmd)}")
+        log(f"📂 Répertoire de travail: {cwd}")
+        
+        def on_start(process):
+            job.process = process
+            if job.cancel_event.is_set():  # Annulé pendant le démarrage (ou fenêtre fermée)
+                kill_process_tree(process, log)
                 
-                # Attendre un peu pour la terminaison propre
-                try:
-                    self.current_process.wait(timeout=3)
-                    self.log("✅ Processus arrêté proprement")
-                except subprocess.TimeoutExpired:
-                    # Forcer l'arrêt si nécessaire
-                    self.current_process.kill()
-                    self.log("🛑 Processus forcé à s'arrêter")
-                    
-            except Exception as e:
-                self.log(f"⚠️ Erreur lors de l'arrêt: {e}")
-            finally:
-                self.is_building = False
-                self.current_process = None
-                self.progress.stop()
-                self.create_button.config(state='normal')
-                self.stop_button.config(state='disabled')
-                self.log("🔄 Interface prête pour une nouvelle création")
+        def on_progress(state):
+            job.progress = state
+            
+        def on_sample(sample):
+            job.resources = sample
+            
+        result = run_cached_build(
+            job.cmd,
+            self.toolchain,
+            log=log,
+            cwd=str(cwd),
+            use_cache=job.config.get('use_build_cache', True),
+            should_stop=job.cancel_event.is_set,
+            on_start=on_start,
+            on_progress=on_progress,
+            on_sample=on_sample
+        )
+        log(f"🏁 Processus terminé avec le code: {result['returncode']}")
+        return result
+        
+    def on_job_change(self, job):
+        """Réagit au changement d'état d'un job (thread Tk)"""
+        self.refresh_jobs()
+        if job is None or not job.done or job.id in self.reported_jobs:
+            return
+        self.reported_jobs.add(job.id)
+        cwd = BATCH_OUTPUT_DIR / job.name
+        if job.status in ('succeeded', 'cached'):
+            self.log(f"🎉 === {job.name}: APPLICATION CRÉÉE AVEC SUCCÈS! ===")
+            self.log(f"📁 Fichiers générés dans {cwd}")
+        elif job.status == 'cancelled':
+            self.log(f"⏹️ {job.name}: build annulé")
         else:
+            self.log(f"❌ === {job.name}: ERREUR LORS DE LA CRÉATION ===")
+            error_msg = f"Une erreur s'est produite lors de la création de « {job.name} »."
+            result = job.result or {}
+            if result.get('output_tail'):
+                error_msg += f"\n\nDernières lignes de sortie:\n" + "\n".join(result['output_tail'])
+            elif job.error:
+                error_msg += f"\n\n{job.error}"
+            if result.get('log_file'):
+                error_msg += f"\n\nJournal complet: {result['log_file']}"
+            messagebox.showerror("Erreur", error_msg)
+        if not self.build_queue.active():
+            succeeded = [other for other in self.build_queue.jobs if other.status in ('succeeded', 'cached')]
+            if succeeded and not self.queue_summary_shown:
+                messagebox.showinfo("Succès",
+                    f"🎉 {len(succeeded)} application(s) créée(s) avec succès!\n\n"
+                    f"Vérifiez le dossier {BATCH_OUTPUT_DIR} pour:\n"
+                    "• Le fichier d'installation (.msi, .deb, .dmg)\n"
+                    "• Les fichiers de l'application")
+                self.queue_summary_shown = True
+            self.log("🔄 File vide, prête pour de nouvelles créations")
+        else:
+            self.queue_summary_shown = False
+            
+    def refresh_jobs(self):
+        """Met à jour le tableau de la file de builds"""
+        known = set(self.jobs_tree.get_children())
+        wanted = []
+        for job in self.build_queue.jobs:
+            item = str(job.id)
+            wanted.append(item)
+            progress = ""
+            if job.status == 'running' and job.progress:
+                progress = f"{job.progress['label']} — {int(job.progress['fraction'] * 100)}%"
+            elif job.error and job.status == 'failed':
+                progress = job.error
+            resources = ""
+            if job.status == 'running' and job.resources:
+                resources = f"{job.resources['cpu_percent']:.0f}% / {job.resources['rss'] / 1024 ** 2:.0f} Mo"
+            elif job.result and job.result.get('peak_rss'):
+                resources = f"pic {job.result['peak_rss'] / 1024 ** 2:.0f} Mo"
+            values = (job.name, job.priority, JOB_STATUS_LABELS[job.status], progress, resources,
+                      format_duration(job.elapsed()) if job.started else "")
+            if item in known:
+                self.jobs_tree.item(item, values=values)
+            else:
+                self.jobs_tree.insert('', tk.END, iid=item, values=values)
+        for item in known.difference(wanted):
+            self.jobs_tree.delete(item)
+        for index, item in enumerate(wanted):
+            self.jobs_tree.move(item, '', index)
+        self.stop_button.config(state='normal' if self.build_queue.active() else 'disabled')
+        self.update_progress()
+        
+    def refresh_jobs_tick(self):
+        """Rafraîchit durées et progression des jobs en cours chaque seconde"""
+        if any(job.status == 'running' for job in self.build_queue.jobs):
+            self.refresh_jobs()
+        self.root.after(1000, self.refresh_jobs_tick)
+        
+    def selected_jobs(self):
+        return [self.build_queue.get(int(item)) for item in self.jobs_tree.selection()
+                if self.build_queue.get(int(item))]
+        
+    def move_jobs(self, offset):
+        """Monte ou descend les jobs en attente sélectionnés"""
+        jobs = self.selected_jobs()
+        for job in (reversed(jobs) if offset > 0 else jobs):
+            self.build_queue.move(job.id, offset)
+            
+    def update_progress(self):
+        """Affiche la phase, le pourcentage et le temps restant du job suivi (thread Tk)"""
+        running = [job for job in self.selected_jobs() if job.status == 'running']
+        running = running or [job for job in self.build_queue.jobs if job.status == 'running']
+        state = running[0].progress if running else None
+        if not state:
+            self.progress.config(value=0)
+            self.progress_label.config(text=f"{running[0].name}: Préparation" if running else "")
+            return
+        percent = int(state['fraction'] * 100)
+        self.progress.config(value=percent)
+        text = f"{running[0].name}: {state['label']} — {percent}%"
+        if state['phase'] == 'compile' and state['expected_crates']:
+            text += f" ({state['crates']}/{state['expected_crates']} crates)"
+        if state['eta'] is not None:
+            text += f" — reste ~{format_duration(state['eta'])}"
+        self.progress_label.config(text=text)
+        
+    def stop_build(self):
+        """Annule les jobs sélectionnés, ou tous les builds en cours sans sélection"""
+        jobs = [job for job in self.selected_jobs() if not job.done]
+        jobs = jobs or [job for job in self.build_queue.jobs if job.status == 'running']
+        if not jobs:
             self.log("ℹ️ Aucun processus en cours à arrêter")
+            return
+        for job in jobs:
+            self.build_queue.cancel(job.id, log=lambda message, name=job.name: self.log(f"[{name}] {message}"))
             
-    def save_config(self):
-        """Sauvegarde la configuration actuelle"""
-        config = {
-            'url': self.url_var.get(),
-            'name': self.name_var.get(),
-            'width': self.width_var.get(),
-            'height': self.height_var.get(),
-            'icon_path': self.icon_path_var.get(),
-            'fullscreen': self.fullscreen_var.get(),
-            'hide_title': self.hide_title_var.get(),
-            'always_on_top': self.always_on_top_var.get(),
-            'auto_favicon': self.auto_favicon_var.get()
-        }
+    def close(self):
+        """Arrête les builds, sauvegarde la configuration et vide le journal avant la fermeture"""
+        try:
+            if self.build_queue.active():
+                print("⏹️ Fermeture: arrêt des builds en cours...")
+                self.build_queue.shutdown(log=print)
+            self.save_config()
+        finally:
+            if self.watchdog is not None:
+                self.watchdog.stop()
+            self.flush_log()
+            if self.log_history is not None:
+                self.log_history.close()
+                
+    def save_config(self, used=False):
+        """Enregistre le formulaire comme profil, sans réécrire les autres profils"""
+        config = self.get_config()
+        name = config['name'].strip()
+        if not name or self.profiles is None:
+            return
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-            self.log("💾 Configuration sauvegardée")
+            self.profiles.save(config, used=used)
+            if self.settings.get('last_profile') != name:
+                update_config_file('last_profile', name, self.config_file)
+                self.settings['last_profile'] = name
+            self.log(f"💾 Profil « {name} » sauvegardé")
+            self.refresh_profiles()
         except Exception as e:
-            self.log(f"⚠️ Impossible de sauvegarder la config: {e}")
+            self.log(f"⚠️ Impossible de sauvegarder le profil: {e}")
             
     def load_config(self):
-        """Charge la configuration sauvegardée"""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)                # Charger les valeurs sauvegardées
-                self.url_var.set(config.get('url', ''))
-                self.name_var.set(config.get('name', ''))
-                self.width_var.set(config.get('width', '1200'))
-                self.height_var.set(config.get('height', '800'))
-                self.icon_path_var.set(config.get('icon_path', ''))
-                self.fullscreen_var.set(config.get('fullscreen', False))
-                self.hide_title_var.set(config.get('hide_title', False))
-                self.always_on_top_var.set(config.get('always_on_top', False))
-                self.auto_favicon_var.set(config.get('auto_favicon', True))
-                
-                print("✅ Configuration chargée depuis pake_gui_config.json")
-                
-            except Exception as e:
-                print(f"⚠️ Erreur lors du chargement de la config: {e}")
-                
-    def download_favicon(self, url):
-        """Télécharge automatiquement le favicon d'un site web"""
-        if not FAVICON_SUPPORT:
-            self.log("❌ Téléchargement de favicon non disponible - modules manquants")
-            self.log("💡 Installez avec: pip install requests pillow")
-            return None
-            
+        """Charge les réglages et le dernier profil utilisé"""
+        self.settings = read_config_file(self.config_file)
         try:
-            self.log(f"🔍 Recherche du favicon pour {url}")
-            
-            # Nettoyer et valider l'URL
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            parsed_url = urlparse(url)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            self.profiles = get_profile_store()
+        except Exception as e:
+            self.profiles = None
+            print(f"⚠️ Profils indisponibles: {e}")
             
-            # Liste des emplacements possibles du favicon
-            favicon_urls = [
-                urljoin(base_url, '/favicon.ico'),
-                urljoin(base_url, '/apple-touch-icon.png'),
-                urljoin(base_url, '/apple-touch-icon-precomposed.png'),
-                urljoin(base_url, '/favicon.png'),
-                urljoin(base_url, '/favicon.svg'),
-            ]
+        # Les versions précédentes gardaient l'unique application dans pake_gui_config.json
+        config = None
+        if self.profiles is not None:
+            config = self.profiles.get(self.settings.get('last_profile') or '')
+            if config is None and self.settings.get('name') and self.profiles.count() == 0:
+                self.profiles.save({key: self.settings[key] for key in PROFILE_KEYS if key in self.settings})
+                config = self.profiles.get(self.settings['name'])
+        self.apply_profile(config or self.settings)
+        if config:
+            print(f"✅ Profil « {config.get('name')} » chargé")
             
-            # Essayer de récupérer le favicon depuis la page HTML
-            try:
-                response = requests.get(url, timeout=10, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
-                if response.status_code == 200:
-                    html_content = response.text
-                    # Chercher les balises link rel="icon" ou rel="shortcut icon"
-                    import re
-                    icon_patterns = [
-                        r'<link[^>]*rel=["\'](?:shortcut )?icon["\'][^>]*href=["\']([^"\']+)["\'][^>]*>',
-                        r'<link[^>]*href=["\']([^"\']+)["\'][^>]*rel=["\'](?:shortcut )?icon["\'][^>]*>',
-                        r'<link[^>]*rel=["\']apple-touch-icon["\'][^>]*href=["\']([^"\']+)["\'][^>]*>',
-                    ]
-                    
-                    for pattern in icon_patterns:
-                        matches = re.findall(pattern, html_content, re.IGNORECASE)
-                        for match in matches:
-                            favicon_url = urljoin(base_url, match)
-                            if favicon_url not in favicon_urls:
-                                favicon_urls.insert(0, favicon_url)
-            except:
-                pass
+    def apply_profile(self, config):
+        """Remplit le formulaire avec une configuration (format de get_config)"""
+        self.url_var.set(config.get('url', ''))
+        self.name_var.set(config.get('name', ''))
+        self.width_var.set(config.get('width', '1200'))
+        self.height_var.set(config.get('height', '800'))
+        self.icon_path_var.set(config.get('icon_path', ''))
+        self.fullscreen_var.set(config.get('fullscreen', False))
+        self.hide_title_var.set(config.get('hide_title', False))
+        self.always_on_top_var.set(config.get('always_on_top', False))
+        self.auto_favicon_var.set(config.get('auto_favicon', True))
+        self.use_build_cache_var.set(config.get('use_build_cache', True))
+        
+    def refresh_profiles(self, *args):
+        """Met à jour la liste des profils selon la recherche"""
+        if self.profiles is None or not hasattr(self, 'profiles_list'):
+            return
+        self.profile_matches = self.profiles.search(self.profile_search_var.get())
+        self.profiles_list.delete(0, tk.END)
+        for name, domain in self.profile_matches:
+            self.profiles_list.insert(tk.END, f"{name}  —  {domain}" if domain else name)
+        self.profiles_count_label.config(
+            text=f"{len(self.profile_matches)} / {self.profiles.count()} profil(s)")
             
-            # Essayer de télécharger le favicon
-            for favicon_url in favicon_urls:
-                try:
-                    self.log(f"🔗 Tentative: {favicon_url}")
-                    response = requests.get(favicon_url, timeout=10, headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    })
-                    
-                    if response.status_code == 200 and len(response.content) > 100:
-                        # Créer un dossier pour les favicons s'il n'existe pas
-                        favicon_dir = Path("favicons")
-                        favicon_dir.mkdir(exist_ok=True)
-                        
-                        # Déterminer l'extension du fichier
-                        content_type = response.headers.get('content-type', '').lower()
-                        if 'png' in content_type:
-                            ext = '.png'
-                        elif 'svg' in content_type:
-                            ext = '.svg'
-                        elif 'jpeg' in content_type or 'jpg' in content_type:
-                            ext = '.jpg'
-                        elif 'gif' in content_type:
-                            ext = '.gif'
-                        else:
-                            ext = '.ico'
-                        
-                        # Nom du fichier basé sur le domaine
-                        domain = parsed_url.netloc.replace('www.', '').replace(':', '_')
-                        favicon_path = favicon_dir / f"{domain}_favicon{ext}"
-                        
-                        # Sauvegarder le favicon
-                        with open(favicon_path, 'wb') as f:
-                            f.write(response.content)
-                        
-                        # Vérifier que c'est bien une image valide
-                        try:
-                            if ext != '.svg':  # SVG n'est pas supporté par PIL
-                                with Image.open(favicon_path) as img:
-                                    # Convertir en PNG si nécessaire
-                                    if ext != '.png':
-                                        png_path = favicon_path.with_suffix('.png')
-                                        img.save(png_path, 'PNG')
-                                        favicon_path.unlink()  # Supprimer l'original
-                                        favicon_path = png_path
-                        except Exception as img_error:
-                            self.log(f"⚠️ Erreur de validation image: {img_error}")
-                            if favicon_path.exists():
-                                favicon_path.unlink()
-                            continue
-                        
-                        self.log(f"✅ Favicon téléchargé: {favicon_path}")
-                        return str(favicon_path.absolute())
-                        
-                except requests.RequestException as e:
-                    self.log(f"⚠️ Échec {favicon_url}: {e}")
-                    continue
-                except Exception as e:
-                    self.log(f"⚠️ Erreur inattendue: {e}")
-                    continue
+    def selected_profile(self):
+        selection = self.profiles_list.curselection()
+        return self.profile_matches[selection[0]][0] if selection else None
+        
+    def load_selected_profile(self, event=None):
+        """Charge le profil sélectionné dans le formulaire"""
+        name = self.selected_profile()
+        config = self.profiles.get(name) if name else None
+        if config:
+            self.apply_profile(config)
+            self.log(f"📂 Profil chargé: {name}")
             
-            self.log("❌ Aucun favicon trouvé")
-            return None
+    def delete_selected_profile(self):
+        """Supprime le profil sélectionné après confirmation"""
+        name = self.selected_profile()
+        if name and messagebox.askyesno("Supprimer le profil", f"Supprimer le profil « {name} » ?"):
+            self.profiles.delete(name)
+            self.log(f"🗑️ Profil supprimé: {name}")
+            self.refresh_profiles()
             
-        except Exception as e:
-            self.log(f"❌ Erreur lors du téléchargement du favicon: {e}")
-            return None
+    def download_favicon(self, url):
+        """Télécharge automatiquement le favicon d'un site web"""
+        return download_favicon(url, log=self.log)
+
 
-def main():
+def parse_arguments(argv=None):
+    """Analyse les arguments de la ligne de commande"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Pake GUI - Transformateur de sites web en applications")
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help="Construit sans interface toutes les applications d'un manifeste JSON")
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help="Nombre de builds parallèles (défaut: selon cœurs et mémoire libre)")
+    parser.add_argument('--output-dir', metavar='DIR',
+                        help=f"Dossier de sortie du mode batch (défaut: {BATCH_OUTPUT_DIR})")
+    parser.add_argument('--no-build-cache', action='store_true',
+                        help="Reconstruit même si un build identique est en cache")
+    parser.add_argument('--rust-cache', choices=['report', 'prune'],
+                        help="Affiche l'occupation du cache Rust partagé, ou l'élague")
+    parser.add_argument('--prefetch-preset-icons', action='store_true',
+                        help="Télécharge le favicon des presets du catalogue pour les utiliser hors ligne")
+    parser.add_argument('--serve', nargs='?', const=str(SERVICE_DEFAULT_PORT), metavar='[HÔTE:]PORT',
+                        help=f"Lance le service HTTP/JSON de build (défaut: {SERVICE_DEFAULT_HOST}:{SERVICE_DEFAULT_PORT})")
+    parser.add_argument('--coordinator', nargs='?', const=str(CLUSTER_DEFAULT_PORT), metavar='[HÔTE:]PORT',
+                        help="Répartit les builds de --batch ou --serve sur les workers du cluster "
+                             f"(écoute des workers, défaut: {SERVICE_DEFAULT_HOST}:{CLUSTER_DEFAULT_PORT})")
+    parser.add_argument('--worker', metavar='HÔTE:PORT',
+                        help="Lance un worker du cluster connecté au coordinateur indiqué")
+    parser.add_argument('--pake', metavar='EXÉCUTABLE',
+                        help="Exécutable Pake des modes batch et service (défaut: détecté)")
+    parser.add_argument('--trace', metavar='FICHIER.json',
+                        help="Trace les étapes du pipeline et l'écrit à la sortie au format Chrome/Perfetto")
+    parser.add_argument('--profile', nargs='?', const='', metavar='DOSSIER',
+                        help=f"Profile CPU (cProfile) et mémoire (tracemalloc); rapports dans {PROFILE_DIR}/<date> "
+                             "par défaut")
+    parser.add_argument('--history-report', action='store_true',
+                        help="Affiche les durées de build par application (p50/p95) et les régressions")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Point d'entrée principal de l'application"""
+    args = parse_arguments(argv)
+    if args.trace or args.profile is not None:
+        profile_dir = None
+        if args.profile is not None:
+            profile_dir = args.profile or PROFILE_DIR / datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        start_diagnostics(args.trace, profile_dir)
+    
+    if args.prefetch_preset_icons:
+        sys.exit(prefetch_preset_icons(read_config_file().get('preset_catalog')))
+    if args.history_report:
+        sys.exit(report_build_history())
+    if args.rust_cache:
+        sys.exit(report_rust_cache(prune=args.rust_cache == 'prune'))
+        
+    # Modes sans interface
+    if args.worker:
+        sys.exit(run_worker(args.worker, workers=args.workers, output_dir=args.output_dir,
+                            pake_executable=args.pake, use_build_cache=not args.no_build_cache))
+    coordinator = None
+    if args.coordinator:
+        if not (args.batch or args.serve):
+            print("❌ --coordinator s'utilise avec --batch ou --serve")
+            sys.exit(2)
+        try:
+            coordinator = ClusterCoordinator.from_settings(read_config_file(), args.coordinator)
+            coordinator.start()
+        except (OSError, ValueError) as e:
+            print(f"❌ Coordinateur impossible à démarrer sur {args.coordinator}: {e}")
+            sys.exit(2)
+    if args.batch:
+        try:
+            sys.exit(run_batch(args.batch, workers=args.workers, output_dir=args.output_dir,
+                               pake_executable=args.pake, use_build_cache=not args.no_build_cache,
+                               coordinator=coordinator))
+        except KeyboardInterrupt:
+            console_log("👋 Batch interrompu, builds arrêtés")
+            sys.exit(130)
+    if args.serve:
+        sys.exit(run_service(args.serve, workers=args.workers, output_dir=args.output_dir, pake_executable=args.pake,
+                             use_build_cache=not args.no_build_cache, coordinator=coordinator))
+        
     # Configuration de l'application
     root = tk.Tk()
     
@@ -798,7 +5562,7 @@ def main():
     # Gérer la fermeture propre
     def on_closing():
         try:
-            app.save_config()
+            app.close()
         except:
             pass
         root.destroy()
@@ -814,6 +5578,7 @@ def main():
         root.mainloop()
     except KeyboardInterrupt:
         print("\n👋 Arrêt demandé par l'utilisateur")
+        app.close()
     except Exception as e:
         print(f"❌ Erreur fatale: {e}")
         